@@ -56,5 +56,4 @@ class VisitScheduleAdmin(SimpleHistoryAdmin):
 
     @staticmethod
     def populate_visit_schedule(request, queryset) -> None:
-        VisitSchedule.objects.update(active=False)
         site_visit_schedules.to_model(VisitSchedule)
@@ -9,3 +9,8 @@ class AppConfig(DjangoAppConfig):
     verbose_name = "Edc Visit Schedules"
     validate_models = True
     include_in_administration_section = True
+
+    def ready(self):
+        from .system_checks import register_system_checks
+
+        register_system_checks()
@@ -1,18 +1,41 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Iterable
+
+from django.db.models import BooleanField, Case, Q, Value, When
 
 from .exceptions import SiteVisitScheduleError, VisitScheduleBaselineError
+from .registry_snapshot import BaselineTimepoints
 from .site_visit_schedules import site_visit_schedules
 
 if TYPE_CHECKING:
     from decimal import Decimal
 
+    from django.db.models import QuerySet
+
     from .schedule import Schedule
     from .visit_schedule import VisitSchedule
 
 
-__all__ = ["Baseline"]
+__all__ = [
+    "Baseline",
+    "annotate_is_baseline",
+    "get_baseline_flags",
+    "is_baseline_expression",
+]
+
+
+def get_appointment(instance: Any) -> Any:
+    """Returns the appointment of a visit or CRF model instance,
+    or the instance itself if neither applies.
+    """
+    try:
+        return instance.appointment
+    except AttributeError:
+        try:
+            return instance.subject_visit.appointment
+        except AttributeError:
+            return instance
 
 
 class Baseline:
@@ -25,13 +48,7 @@ class Baseline:
         schedule_name: str | None = None,
     ):
         if instance:
-            try:
-                instance = instance.appointment
-            except AttributeError:
-                try:
-                    instance = instance.subject_visit.appointment
-                except AttributeError:
-                    pass
+            instance = get_appointment(instance)
             self.visit_schedule_name = instance.visit_schedule_name
             self.schedule_name = instance.schedule_name
             self.visit_code_sequence = instance.visit_code_sequence
@@ -43,13 +60,14 @@ class Baseline:
             self.timepoint = timepoint
             if self.timepoint is None:
                 raise VisitScheduleBaselineError("timepoint may not be None")
-        if not any([x == self.timepoint for x in self.timepoints.values()]):
+        baseline_timepoint, timepoints = self.baseline_timepoints
+        if self.timepoint not in timepoints:
             raise VisitScheduleBaselineError(
                 f"Unknown timepoint. For schedule {self.visit_schedule}.{self.schedule}. "
                 f"Got {self.timepoint} not in {self.timepoints}"
             )
         self.value: bool = (
-            self.timepoint == self.baseline_timepoint and self.visit_code_sequence == 0
+            self.timepoint == baseline_timepoint and self.visit_code_sequence == 0
         )
 
     @property
@@ -78,6 +96,21 @@ class Baseline:
     def timepoints(self) -> dict:
         return self.schedule.visits.timepoints
 
+    @property
+    def baseline_timepoints(self) -> BaselineTimepoints:
+        """Returns the baseline timepoint and the set of timepoints
+        of this schedule as precomputed in the registry snapshot.
+        """
+        self.have_required_attrs_or_raise()
+        baseline_timepoints = site_visit_schedules.snapshot.get_baseline_timepoints(
+            self.visit_schedule_name, self.schedule_name
+        )
+        if baseline_timepoints is None:
+            baseline_timepoints = BaselineTimepoints(
+                self.baseline_timepoint, frozenset(self.timepoints.values())
+            )
+        return baseline_timepoints
+
     def have_required_attrs_or_raise(self):
         data = {
             k: getattr(self, k, None) is None
@@ -94,3 +127,69 @@ class Baseline:
                 "Missing value(s). Unable to determine if baseline. "
                 f"Got `None` for {[k for k, v in data.items() if v is True]}."
             )
+
+
+def get_baseline_flags(objs: Iterable[Any]) -> list[bool]:
+    """Returns a list of booleans, one per appointment, visit or
+    CRF model instance, True if baseline.
+
+    Evaluated in memory against the registry snapshot. The related
+    appointment is accessed for visit and CRF model instances, so
+    use `select_related` when passing a queryset of these.
+
+    Raises VisitScheduleBaselineError as `Baseline` does.
+    """
+    table = site_visit_schedules.snapshot.baseline_timepoints
+    flags = []
+    for obj in objs:
+        appointment = get_appointment(obj)
+        baseline_timepoints = table.get(
+            (appointment.visit_schedule_name, appointment.schedule_name)
+        )
+        if (
+            baseline_timepoints
+            and appointment.timepoint in baseline_timepoints.timepoints
+            and appointment.visit_code_sequence is not None
+        ):
+            flags.append(
+                appointment.timepoint == baseline_timepoints.baseline_timepoint
+                and appointment.visit_code_sequence == 0
+            )
+        else:
+            # let Baseline raise with the usual message
+            flags.append(Baseline(instance=appointment).value)
+    return flags
+
+
+def is_baseline_expression(lookup_prefix: str | None = None) -> Case:
+    """Returns a `Case` expression that evaluates to True for
+    baseline rows.
+
+    One `When` per registered schedule is built from the registry
+    snapshot. Set `lookup_prefix` to reach the appointment fields
+    from another model, e.g. "appointment__" for a visit model or
+    "subject_visit__appointment__" for a CRF.
+    """
+    lookup_prefix = lookup_prefix or ""
+    cases = []
+    table = site_visit_schedules.snapshot.baseline_timepoints
+    for (visit_schedule_name, schedule_name), baseline_timepoints in table.items():
+        opts = {
+            f"{lookup_prefix}visit_schedule_name": visit_schedule_name,
+            f"{lookup_prefix}schedule_name": schedule_name,
+            f"{lookup_prefix}timepoint": baseline_timepoints.baseline_timepoint,
+            f"{lookup_prefix}visit_code_sequence": 0,
+        }
+        cases.append(When(Q(**opts), then=Value(True)))
+    return Case(*cases, default=Value(False), output_field=BooleanField())
+
+
+def annotate_is_baseline(
+    queryset: QuerySet, lookup_prefix: str | None = None, name: str | None = None
+) -> QuerySet:
+    """Returns the queryset annotated with `is_baseline`, or `name`
+    if given, computed in SQL.
+
+    See `is_baseline_expression`.
+    """
+    return queryset.annotate(**{name or "is_baseline": is_baseline_expression(lookup_prefix)})
@@ -0,0 +1,745 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Iterable, Type
+
+from django.apps import apps as django_apps
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Max, Model, ProtectedError
+from edc_appointment.constants import COMPLETE_APPT, IN_PROGRESS_APPT
+from edc_appointment.creators import AppointmentsCreator
+from edc_appointment.managers import AppointmentDeleteError
+from edc_consent.exceptions import (
+    ConsentDefinitionDoesNotExist,
+    ConsentDefinitionNotConfiguredForUpdate,
+    NotConsentedError,
+    SiteConsentError,
+)
+from edc_consent.site_consents import site_consents
+from edc_registration.utils import (
+    RegisteredSubjectDoesNotExist,
+    get_registered_subject_model_cls,
+)
+from edc_sites.exceptions import InvalidSiteForSubjectError
+from edc_sites.site import sites as site_sites
+from edc_sites.utils import get_site_model_cls
+from edc_utils import formatted_date, formatted_datetime, get_utcnow, to_utc
+
+from .bulk_utils import bulk_create, bulk_update, chunked
+from .constants import OFF_SCHEDULE, ON_SCHEDULE
+from .exceptions import InvalidOffscheduleDate, NotOnScheduleError, SubjectScheduleError
+from .subject_schedule_cache import invalidate_subject_schedule_cache
+
+if TYPE_CHECKING:
+    from django.db import models
+    from edc_appointment.models import Appointment
+    from edc_consent.consent_definition import ConsentDefinition
+
+    from .models import OffSchedule, OnSchedule, SubjectScheduleHistory
+    from .schedule import Schedule
+    from .visit_schedule import VisitSchedule
+
+
+__all__ = ["BulkScheduleResult", "BulkSubjectSchedule"]
+
+
+@dataclass
+class BulkScheduleResult:
+    """The per-subject outcome of a bulk schedule operation.
+
+    `failed` maps each subject_identifier that could not be
+    processed to the exception raised for it.
+    """
+
+    succeeded: list[str] = field(default_factory=list)
+    failed: dict[str, Exception] = field(default_factory=dict)
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(succeeded={len(self.succeeded)}, "
+            f"failed={len(self.failed)})"
+        )
+
+
+class BulkSubjectSchedule:
+    """A class that puts many subjects on to or takes many subjects
+    off a schedule using set-based queries.
+
+    Follows the same rules as SubjectSchedule. A subject that
+    fails validation is reported in the result and does not
+    abort the batch.
+
+    This class is instantiated by the Schedule class.
+    """
+
+    history_model = "edc_visit_schedule.subjectschedulehistory"
+    appointments_creator_cls = AppointmentsCreator
+    batch_size: int = 500
+
+    def __init__(
+        self,
+        visit_schedule: VisitSchedule = None,
+        schedule: Schedule = None,
+        batch_size: int | None = None,
+    ):
+        self.visit_schedule: VisitSchedule = visit_schedule
+        self.schedule: Schedule = schedule
+        self.schedule_name: str = schedule.name
+        self.visit_schedule_name: str = visit_schedule.name
+        self.onschedule_model: str = schedule.onschedule_model
+        self.offschedule_model: str = schedule.offschedule_model
+        self.appointment_model: str = schedule.appointment_model
+        self.batch_size = batch_size or self.batch_size
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(visit_schedule={self.visit_schedule},"
+            f"schedule={self.schedule})"
+        )
+
+    @property
+    def onschedule_model_cls(self) -> Type[OnSchedule]:
+        return django_apps.get_model(self.onschedule_model)
+
+    @property
+    def offschedule_model_cls(self) -> Type[OffSchedule]:
+        return django_apps.get_model(self.offschedule_model)
+
+    @property
+    def history_model_cls(self) -> Type[SubjectScheduleHistory]:
+        return django_apps.get_model(self.history_model)
+
+    @property
+    def appointment_model_cls(self) -> Type[Appointment]:
+        return django_apps.get_model(self.appointment_model)
+
+    def put_on_schedule(
+        self,
+        items: Iterable[tuple[str, datetime | None]],
+        skip_baseline: bool | None = None,
+        skip_get_current_site: bool | None = None,
+    ) -> BulkScheduleResult:
+        """Puts each subject in `items`, a sequence of
+        (subject_identifier, onschedule_datetime), on-schedule.
+
+        See SubjectSchedule.put_on_schedule.
+
+        Registered subjects, consents, existing onschedule and
+        history instances are read in a few queries per batch.
+        New onschedule and history instances are bulk created.
+        Appointments are created per subject.
+        """
+        result = BulkScheduleResult()
+        onschedule_datetimes = self.get_datetimes(items, result)
+        site_ids = self.get_site_ids(onschedule_datetimes, result, skip_get_current_site)
+        existing = self.get_existing(self.onschedule_model_cls, list(site_ids))
+        consented = self.get_consented(
+            [s for s in site_ids if s not in existing], onschedule_datetimes, site_ids, result
+        )
+        created = self.create_onschedules(consented, onschedule_datetimes, site_ids, result)
+        schedule_statuses = self.get_or_create_histories(
+            [s for s in site_ids if s in existing or s in created],
+            onschedule_datetimes,
+            site_ids,
+        )
+        self.invalidate_cache(schedule_statuses)
+        for subject_identifier, schedule_status in schedule_statuses.items():
+            if schedule_status == ON_SCHEDULE:
+                try:
+                    with transaction.atomic():
+                        self.create_appointments(
+                            subject_identifier,
+                            onschedule_datetimes[subject_identifier],
+                            site_ids[subject_identifier],
+                            skip_baseline=skip_baseline,
+                            skip_get_current_site=skip_get_current_site,
+                        )
+                except Exception as e:
+                    result.failed[subject_identifier] = e
+                    continue
+            result.succeeded.append(subject_identifier)
+        return result
+
+    @staticmethod
+    def get_datetimes(
+        items: Iterable[tuple[str, datetime | None]], result: BulkScheduleResult
+    ) -> dict[str, datetime]:
+        """Returns a dictionary of {subject_identifier: datetime}.
+
+        A subject listed more than once is failed.
+        """
+        datetimes = {}
+        for subject_identifier, dt in items:
+            if subject_identifier in datetimes:
+                result.failed[subject_identifier] = SubjectScheduleError(
+                    f"Subject listed more than once. Got '{subject_identifier}'."
+                )
+            else:
+                datetimes[subject_identifier] = dt or get_utcnow()
+        for subject_identifier in result.failed:
+            datetimes.pop(subject_identifier, None)
+        return datetimes
+
+    def get_site_ids(
+        self,
+        subject_identifiers: Iterable[str],
+        result: BulkScheduleResult,
+        skip_get_current_site: bool | None = None,
+    ) -> dict[str, int]:
+        """Returns a dictionary of {subject_identifier: site_id}.
+
+        See edc_sites.utils.valid_site_for_subject_or_raise.
+        """
+        model_cls = get_registered_subject_model_cls()
+        current_site_id = (
+            None if skip_get_current_site else get_site_model_cls().objects.get_current().id
+        )
+        site_ids = {}
+        for chunk in chunked(subject_identifiers, self.batch_size):
+            registered = dict(
+                model_cls.objects.filter(subject_identifier__in=chunk).values_list(
+                    "subject_identifier", "site_id"
+                )
+            )
+            for subject_identifier in chunk:
+                if subject_identifier not in registered:
+                    result.failed[subject_identifier] = RegisteredSubjectDoesNotExist(
+                        "Unknown subject. "
+                        f"Searched `{model_cls._meta.label_lower}`. "
+                        f"Got {dict(subject_identifier=subject_identifier)}."
+                    )
+                elif not registered[subject_identifier]:
+                    result.failed[subject_identifier] = InvalidSiteForSubjectError(
+                        "Site not defined for registered subject! "
+                        f"Subject identifier=`{subject_identifier}`. "
+                    )
+                elif current_site_id and registered[subject_identifier] != current_site_id:
+                    result.failed[subject_identifier] = InvalidSiteForSubjectError(
+                        "Invalid site for subject. "
+                        f"Subject identifier=`{subject_identifier}`. "
+                        f"Expected site_id=`{registered[subject_identifier]}`. "
+                        f"Got site_id=`{current_site_id}`"
+                    )
+                else:
+                    site_ids[subject_identifier] = registered[subject_identifier]
+        return site_ids
+
+    def get_existing(self, model_cls: Type[models.Model], subject_identifiers: list[str]):
+        """Returns the subset of subject identifiers with an
+        instance of `model_cls`.
+        """
+        existing = set()
+        for chunk in chunked(subject_identifiers, self.batch_size):
+            existing.update(
+                model_cls.objects.filter(subject_identifier__in=chunk).values_list(
+                    "subject_identifier", flat=True
+                )
+            )
+        return existing
+
+    def get_consented(
+        self,
+        subject_identifiers: list[str],
+        onschedule_datetimes: dict[str, datetime],
+        site_ids: dict[str, int],
+        result: BulkScheduleResult,
+    ) -> list[str]:
+        """Returns the subject identifiers with a consent valid for
+        their onschedule datetime.
+
+        Subjects are grouped by consent definition and each group is
+        read in one query per batch. See
+        SiteConsents.get_consent_or_raise.
+        """
+        consented = []
+        groups = self.group_by_consent_definition(
+            subject_identifiers, onschedule_datetimes, site_ids, result
+        )
+        updates_groups: dict[str, tuple[ConsentDefinition, list[str]]] = {}
+        for cdef, group in groups.values():
+            consent_datetimes = self.get_consent_datetimes(cdef, group)
+            for subject_identifier in group:
+                onschedule_datetime = to_utc(onschedule_datetimes[subject_identifier])
+                consent_datetime = consent_datetimes.get(subject_identifier)
+                if not consent_datetime:
+                    result.failed[subject_identifier] = self.not_consented_error(
+                        subject_identifier, onschedule_datetime
+                    )
+                elif onschedule_datetime >= consent_datetime:
+                    consented.append(subject_identifier)
+                elif not cdef.updates:
+                    result.failed[subject_identifier] = (
+                        ConsentDefinitionNotConfiguredForUpdate(
+                            f"Consent not configured to update any previous versions. "
+                            f"Got '{cdef.version}'. "
+                            f"Has subject '{subject_identifier}' completed version "
+                            f"'{cdef.version}' of consent on or after "
+                            f"report_datetime='{formatted_date(onschedule_datetime)}'?"
+                        )
+                    )
+                elif (
+                    not cdef.start <= onschedule_datetime <= cdef.end
+                    and cdef.updates.start <= onschedule_datetime <= cdef.updates.end
+                ):
+                    # use the consent of the previous version (updated_by)
+                    updates_groups.setdefault(cdef.updates.name, (cdef.updates, []))[1].append(
+                        subject_identifier
+                    )
+                else:
+                    consented.append(subject_identifier)
+        for cdef, group in updates_groups.values():
+            consent_datetimes = self.get_consent_datetimes(cdef, group)
+            for subject_identifier in group:
+                if subject_identifier in consent_datetimes:
+                    consented.append(subject_identifier)
+                else:
+                    result.failed[subject_identifier] = self.not_consented_error(
+                        subject_identifier, onschedule_datetimes[subject_identifier]
+                    )
+        return consented
+
+    def group_by_consent_definition(
+        self,
+        subject_identifiers: list[str],
+        onschedule_datetimes: dict[str, datetime],
+        site_ids: dict[str, int],
+        result: BulkScheduleResult,
+    ) -> dict[str, tuple[ConsentDefinition, list[str]]]:
+        """Returns a dictionary of
+        {cdef.name: (cdef, [subject_identifier, ...])} using the
+        consent definition valid for each subject's site and
+        onschedule datetime.
+        """
+        groups: dict[str, tuple[ConsentDefinition, list[str]]] = {}
+        for subject_identifier in subject_identifiers:
+            single_site = site_sites.get(site_ids[subject_identifier])
+            try:
+                site_consents.filter_cdefs_by_site_or_raise(
+                    single_site, self.schedule.consent_definitions, []
+                )
+                cdef = site_consents.get_consent_definition(
+                    report_datetime=onschedule_datetimes[subject_identifier], site=single_site
+                )
+            except (ConsentDefinitionDoesNotExist, SiteConsentError) as e:
+                result.failed[subject_identifier] = e
+            else:
+                groups.setdefault(cdef.name, (cdef, []))[1].append(subject_identifier)
+        return groups
+
+    def get_consent_datetimes(
+        self, cdef: ConsentDefinition, subject_identifiers: list[str]
+    ) -> dict[str, datetime]:
+        """Returns a dictionary of {subject_identifier: consent_datetime}
+        for subjects with a consent for this consent definition.
+        """
+        consent_datetimes = {}
+        for chunk in chunked(subject_identifiers, self.batch_size):
+            consent_datetimes.update(
+                cdef.model_cls.objects.filter(
+                    subject_identifier__in=chunk, version=cdef.version
+                ).values_list("subject_identifier", "consent_datetime")
+            )
+        return consent_datetimes
+
+    def not_consented_error(
+        self, subject_identifier: str, onschedule_datetime: datetime
+    ) -> NotConsentedError:
+        dte = formatted_datetime(onschedule_datetime)
+        return NotConsentedError(
+            f"Consent not found. Has subject '{subject_identifier}' "
+            f"completed a consent before {dte}? Possible consent definitions are "
+            f"{self.schedule.consent_definitions}."
+        )
+
+    def create_onschedules(
+        self,
+        subject_identifiers: list[str],
+        onschedule_datetimes: dict[str, datetime],
+        site_ids: dict[str, int],
+        result: BulkScheduleResult,
+    ) -> set[str]:
+        """Bulk creates onschedule model instances and returns the
+        subject identifiers created.
+
+        The onschedule datetime is validated against the model field
+        validators, as `full_clean` would, before the insert.
+
+        A bulk insert does not call `save` or send the post_save
+        signal. If the onschedule model overrides `save` beyond the
+        mixins accounted for here, or the bulk insert fails, for
+        example on a subject put on-schedule concurrently, instances
+        are saved one at a time instead.
+        """
+        objs = [
+            self.onschedule_model_cls(
+                subject_identifier=subject_identifier,
+                onschedule_datetime=onschedule_datetimes[subject_identifier],
+                report_datetime=onschedule_datetimes[subject_identifier],
+                site_id=site_ids[subject_identifier],
+            )
+            for subject_identifier in subject_identifiers
+        ]
+        self.validate_datetimes(
+            self.onschedule_model_cls,
+            "onschedule_datetime",
+            {obj.subject_identifier: obj.onschedule_datetime for obj in objs},
+            result,
+        )
+        objs = [obj for obj in objs if obj.subject_identifier not in result.failed]
+        if self.onschedule_model_overrides_save:
+            return self.create_onschedules_one_by_one(objs, result)
+        try:
+            with transaction.atomic():
+                bulk_create(self.onschedule_model_cls, objs, self.batch_size)
+        except IntegrityError:
+            for obj in objs:
+                obj.pk = None
+            return self.create_onschedules_one_by_one(objs, result)
+        return {obj.subject_identifier for obj in objs}
+
+    @staticmethod
+    def create_onschedules_one_by_one(
+        objs: list[OnSchedule], result: BulkScheduleResult
+    ) -> set[str]:
+        created = set()
+        for obj in objs:
+            try:
+                with transaction.atomic():
+                    obj.save()
+            except IntegrityError as e:
+                result.failed[obj.subject_identifier] = e
+            else:
+                created.add(obj.subject_identifier)
+        return created
+
+    @property
+    def onschedule_model_overrides_save(self) -> bool:
+        """Returns True if a class of the onschedule model, other
+        than the model mixins whose `save` is accounted for in
+        `create_onschedules`, defines `save`.
+        """
+        from django_audit_fields.models import AuditModelMixin
+        from edc_sites.model_mixins import SiteModelMixin
+
+        from .model_mixins import OnScheduleModelMixin
+
+        return any(
+            "save" in vars(cls)
+            for cls in self.onschedule_model_cls.__mro__
+            if cls not in [OnScheduleModelMixin, SiteModelMixin, AuditModelMixin, Model]
+        )
+
+    def get_or_create_histories(
+        self,
+        subject_identifiers: list[str],
+        onschedule_datetimes: dict[str, datetime],
+        site_ids: dict[str, int],
+    ) -> dict[str, str]:
+        """Returns a dictionary of {subject_identifier: schedule_status}
+        after bulk creating any missing history instances.
+        """
+        schedule_statuses = {}
+        for chunk in chunked(subject_identifiers, self.batch_size):
+            schedule_statuses.update(
+                self.history_model_cls.objects.filter(
+                    subject_identifier__in=chunk,
+                    schedule_name=self.schedule_name,
+                    visit_schedule_name=self.visit_schedule_name,
+                ).values_list("subject_identifier", "schedule_status")
+            )
+        objs = [
+            self.history_model_cls(
+                subject_identifier=subject_identifier,
+                onschedule_model=self.onschedule_model,
+                offschedule_model=self.offschedule_model,
+                schedule_name=self.schedule_name,
+                visit_schedule_name=self.visit_schedule_name,
+                onschedule_datetime=onschedule_datetimes[subject_identifier],
+                schedule_status=ON_SCHEDULE,
+                site_id=site_ids[subject_identifier],
+            )
+            for subject_identifier in subject_identifiers
+            if subject_identifier not in schedule_statuses
+        ]
+        bulk_create(self.history_model_cls, objs, self.batch_size)
+        schedule_statuses.update({obj.subject_identifier: ON_SCHEDULE for obj in objs})
+        return {s: schedule_statuses[s] for s in subject_identifiers}
+
+    def create_appointments(
+        self,
+        subject_identifier: str,
+        onschedule_datetime: datetime,
+        site_id: int,
+        skip_baseline: bool | None = None,
+        skip_get_current_site: bool | None = None,
+    ) -> None:
+        creator = self.appointments_creator_cls(
+            report_datetime=onschedule_datetime,
+            subject_identifier=subject_identifier,
+            schedule=self.schedule,
+            visit_schedule=self.visit_schedule,
+            appointment_model=self.appointment_model,
+            site_id=site_id,
+            skip_baseline=skip_baseline,
+        )
+        creator.create_appointments(
+            onschedule_datetime, skip_get_current_site=skip_get_current_site
+        )
+
+    def take_off_schedule(
+        self, items: Iterable[tuple[str, datetime | None]]
+    ) -> BulkScheduleResult:
+        """Takes each subject in `items`, a sequence of
+        (subject_identifier, offschedule_datetime), off-schedule.
+
+        See SubjectSchedule.take_off_schedule.
+
+        The offschedule datetime of every subject is validated
+        against the history and visit report datetimes in a few
+        aggregate queries. For each batch, offschedule instances are
+        bulk created, history instances and in-progress appointments
+        bulk updated and future appointments deleted in chunks.
+
+        If a batch fails to write, the batch is rolled back and each
+        subject is taken off-schedule one at a time instead.
+        """
+        result = BulkScheduleResult()
+        offschedule_datetimes = self.get_datetimes(items, result)
+        self.validate_datetimes(
+            self.offschedule_model_cls, "offschedule_datetime", offschedule_datetimes, result
+        )
+        site_ids = self.get_site_ids(offschedule_datetimes, result, skip_get_current_site=True)
+        history_objs = self.get_history_objs_or_fail(offschedule_datetimes, site_ids, result)
+        self.validate_last_visit_report_datetimes(offschedule_datetimes, history_objs, result)
+        for chunk in chunked(
+            [s for s in history_objs if s not in result.failed], self.batch_size
+        ):
+            try:
+                with transaction.atomic():
+                    self.take_off_schedule_for_chunk(
+                        chunk, offschedule_datetimes, site_ids, history_objs
+                    )
+            except (IntegrityError, ProtectedError, AppointmentDeleteError):
+                self.take_off_schedule_one_by_one(chunk, offschedule_datetimes, result)
+            else:
+                result.succeeded.extend(chunk)
+            finally:
+                self.invalidate_cache(chunk)
+        return result
+
+    def invalidate_cache(self, subject_identifiers: Iterable[str]) -> None:
+        """Discards the subjects' cached intervals on this schedule.
+
+        Bulk writes do not send the post_save signals that
+        otherwise invalidate `subject_schedule_cache`.
+        """
+        for subject_identifier in subject_identifiers:
+            invalidate_subject_schedule_cache(subject_identifier, self.onschedule_model)
+
+    @staticmethod
+    def validate_datetimes(
+        model_cls: Type[Model],
+        field_name: str,
+        datetimes: dict[str, datetime],
+        result: BulkScheduleResult,
+    ) -> None:
+        """Fails subjects with a datetime that would not pass the
+        validators of the model field.
+        """
+        model_field = model_cls._meta.get_field(field_name)
+        for subject_identifier, dt in datetimes.items():
+            try:
+                model_field.run_validators(dt)
+            except ValidationError as e:
+                result.failed[subject_identifier] = e
+
+    def get_history_objs_or_fail(
+        self,
+        offschedule_datetimes: dict[str, datetime],
+        site_ids: dict[str, int],
+        result: BulkScheduleResult,
+    ) -> dict[str, SubjectScheduleHistory]:
+        """Returns a dictionary of {subject_identifier: history_obj}
+        for subjects on this schedule on or before their offschedule
+        datetime.
+        """
+        history_objs = {}
+        subject_identifiers = [s for s in site_ids if s not in result.failed]
+        for chunk in chunked(subject_identifiers, self.batch_size):
+            history_objs.update(
+                {
+                    obj.subject_identifier: obj
+                    for obj in self.history_model_cls.objects.filter(
+                        subject_identifier__in=chunk,
+                        schedule_name=self.schedule_name,
+                        visit_schedule_name=self.visit_schedule_name,
+                    )
+                }
+            )
+        for subject_identifier in subject_identifiers:
+            offschedule_datetime = offschedule_datetimes[subject_identifier]
+            if not (history_obj := history_objs.get(subject_identifier)):
+                result.failed[subject_identifier] = NotOnScheduleError(
+                    "Failed to take subject off schedule. "
+                    f"Subject has not been put on schedule "
+                    f"'{self.visit_schedule_name}.{self.schedule_name}'. "
+                    f"Got '{subject_identifier}'."
+                )
+            elif history_obj.onschedule_datetime > offschedule_datetime:
+                result.failed[subject_identifier] = InvalidOffscheduleDate(
+                    "Failed to take subject off schedule. "
+                    "Offschedule date cannot precede onschedule date. "
+                    f"Subject was put on schedule {self.visit_schedule_name}."
+                    f"{self.schedule_name} on {history_obj.onschedule_datetime}. "
+                    f"Got {offschedule_datetime}."
+                )
+        return {s: obj for s, obj in history_objs.items() if s not in result.failed}
+
+    def validate_last_visit_report_datetimes(
+        self,
+        offschedule_datetimes: dict[str, datetime],
+        subject_identifiers: Iterable[str],
+        result: BulkScheduleResult,
+    ) -> None:
+        """Fails subjects with a visit reported after their
+        offschedule datetime.
+        """
+        related_visit_model_attr = self.appointment_model_cls.related_visit_model_attr()
+        for chunk in chunked(subject_identifiers, self.batch_size):
+            last_report_datetimes = (
+                self.appointment_model_cls.objects.filter(
+                    subject_identifier__in=chunk,
+                    schedule_name=self.schedule_name,
+                    visit_schedule_name=self.visit_schedule_name,
+                    **{f"{related_visit_model_attr}__isnull": False},
+                )
+                .values("subject_identifier")
+                .annotate(last=Max(f"{related_visit_model_attr}__report_datetime"))
+                .values_list("subject_identifier", "last")
+            )
+            for subject_identifier, last_report_datetime in last_report_datetimes:
+                offschedule_datetime = offschedule_datetimes[subject_identifier]
+                if last_report_datetime > offschedule_datetime:
+                    result.failed[subject_identifier] = InvalidOffscheduleDate(
+                        f"Failed to take subject off schedule. "
+                        f"Visits exist after proposed offschedule date. "
+                        f"Got '{formatted_datetime(offschedule_datetime)}'."
+                    )
+
+    def take_off_schedule_for_chunk(
+        self,
+        subject_identifiers: list[str],
+        offschedule_datetimes: dict[str, datetime],
+        site_ids: dict[str, int],
+        history_objs: dict[str, SubjectScheduleHistory],
+    ) -> None:
+        existing = self.get_existing(self.offschedule_model_cls, subject_identifiers)
+        bulk_create(
+            self.offschedule_model_cls,
+            [
+                self.offschedule_model_cls(
+                    subject_identifier=subject_identifier,
+                    offschedule_datetime=offschedule_datetimes[subject_identifier],
+                    report_datetime=offschedule_datetimes[subject_identifier],
+                    site_id=site_ids[subject_identifier],
+                )
+                for subject_identifier in subject_identifiers
+                if subject_identifier not in existing
+            ],
+            self.batch_size,
+        )
+        objs = [history_objs[s] for s in subject_identifiers]
+        for obj in objs:
+            obj.offschedule_datetime = offschedule_datetimes[obj.subject_identifier]
+            obj.schedule_status = OFF_SCHEDULE
+        bulk_update(
+            self.history_model_cls,
+            objs,
+            ["offschedule_datetime", "schedule_status"],
+            self.batch_size,
+        )
+        self.update_in_progress_appointments(subject_identifiers)
+        self.delete_future_appointments(subject_identifiers, offschedule_datetimes)
+
+    def take_off_schedule_one_by_one(
+        self,
+        subject_identifiers: list[str],
+        offschedule_datetimes: dict[str, datetime],
+        result: BulkScheduleResult,
+    ) -> None:
+        for subject_identifier in subject_identifiers:
+            try:
+                with transaction.atomic():
+                    self.schedule.take_off_schedule(
+                        subject_identifier, offschedule_datetimes[subject_identifier]
+                    )
+            except Exception as e:
+                result.failed[subject_identifier] = e
+            else:
+                result.succeeded.append(subject_identifier)
+
+    def update_in_progress_appointments(self, subject_identifiers: list[str]) -> None:
+        """Updates "in_progress" appointments to "complete".
+
+        See SubjectSchedule._update_in_progress_appointment.
+        """
+        objs = list(
+            self.appointment_model_cls.objects.filter(
+                subject_identifier__in=subject_identifiers,
+                schedule_name=self.schedule_name,
+                visit_schedule_name=self.visit_schedule_name,
+                appt_status=IN_PROGRESS_APPT,
+            )
+        )
+        for obj in objs:
+            obj.appt_status = COMPLETE_APPT
+        bulk_update(self.appointment_model_cls, objs, ["appt_status"], self.batch_size)
+
+    def delete_future_appointments(
+        self, subject_identifiers: list[str], offschedule_datetimes: dict[str, datetime]
+    ) -> None:
+        """Deletes appointments on or after each subject's offschedule
+        datetime.
+
+        As with AppointmentManager.delete_for_subject_after_date,
+        deletes in reverse order stopping at the first appointment
+        with a visit report. Appointments are deleted in chunks
+        through the ORM so delete signals are still sent.
+        """
+        related_visit_model_attr = self.appointment_model_cls.related_visit_model_attr()
+        appointments = (
+            self.appointment_model_cls.objects.filter(
+                subject_identifier__in=subject_identifiers,
+                schedule_name=self.schedule_name,
+                visit_schedule_name=self.visit_schedule_name,
+            )
+            .order_by("subject_identifier", "-timepoint", "-visit_code_sequence")
+            .values_list(
+                "id",
+                "subject_identifier",
+                "appt_datetime",
+                "visit_code_sequence",
+                related_visit_model_attr,
+            )
+        )
+        pks = []
+        stopped = set()
+        for (
+            pk,
+            subject_identifier,
+            appt_datetime,
+            visit_code_sequence,
+            related_visit,
+        ) in appointments:
+            cutoff_datetime = offschedule_datetimes[subject_identifier]
+            if subject_identifier in stopped or appt_datetime < cutoff_datetime:
+                continue
+            if related_visit:
+                stopped.add(subject_identifier)
+            elif appt_datetime > cutoff_datetime or visit_code_sequence:
+                # an appointment on the offschedule datetime may not be deleted
+                pks.append(pk)
+        for chunk in chunked(pks, self.batch_size):
+            self.appointment_model_cls.objects.filter(id__in=chunk).delete()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from itertools import islice
+from typing import TYPE_CHECKING, Iterable, Iterator, Type
+from uuid import uuid4
+
+from django.db.models import UUIDField
+from edc_utils import get_utcnow
+from simple_history.exceptions import NotHistoricalModelError
+from simple_history.utils import (
+    bulk_create_with_history,
+    bulk_update_with_history,
+    get_history_manager_for_model,
+)
+
+if TYPE_CHECKING:
+    from django.db import models
+
+__all__ = ["bulk_create", "bulk_update", "chunked", "is_historical"]
+
+
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def is_historical(model_cls: Type[models.Model]) -> bool:
+    try:
+        get_history_manager_for_model(model_cls)
+    except NotHistoricalModelError:
+        return False
+    return True
+
+
+def bulk_create(model_cls: Type[models.Model], objs: list, batch_size: int) -> list:
+    """Bulk creates model instances and, if the model is tracked
+    by simple_history, their historical records.
+
+    A UUID primary key, e.g. the UUIDAutoField of BaseUuidModel, is
+    set here since the database does not return it.
+    """
+    if isinstance(model_cls._meta.pk, UUIDField):
+        for obj in objs:
+            obj.pk = obj.pk or uuid4()
+    if is_historical(model_cls):
+        return bulk_create_with_history(objs, model_cls, batch_size=batch_size)
+    return model_cls.objects.bulk_create(objs, batch_size=batch_size)
+
+
+def bulk_update(
+    model_cls: Type[models.Model], objs: list, fields: list[str], batch_size: int
+) -> int:
+    """Bulk updates model instances and, if the model is tracked
+    by simple_history, creates their historical records.
+
+    Sets `modified`, if the model has the field, as `save` would.
+    """
+    if objs and any(f.name == "modified" for f in model_cls._meta.get_fields()):
+        modified = get_utcnow()
+        for obj in objs:
+            obj.modified = modified
+        fields = [*fields, "modified"]
+    if is_historical(model_cls):
+        return bulk_update_with_history(objs, model_cls, fields, batch_size=batch_size)
+    return model_cls.objects.bulk_update(objs, fields, batch_size=batch_size)
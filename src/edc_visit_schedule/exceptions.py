@@ -68,3 +68,7 @@ class VisitScheduleBaselineError(Exception):
 
 class VisitScheduleNonCrfModelFormMixinError(Exception):
     pass
+
+
+class WindowExpressionsError(Exception):
+    pass
@@ -1,12 +1,32 @@
-from django.apps import apps as django_apps
-from django.core.exceptions import ObjectDoesNotExist
-from django.core.management.base import BaseCommand
+from __future__ import annotations
 
-from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import NamedTuple
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, models, transaction
+
+from edc_visit_schedule.system_checks import (
+    get_onschedule_model_classes,
+    get_onschedule_not_in_history,
+)
+
+DEFAULT_BATCH_SIZE = 500
+
+
+class Result(NamedTuple):
+    label_lower: str
+    total: int
+    invalid: int
+    deleted: int
 
 
 class Command(BaseCommand):
-    help = "List email recipients for each registered notification"
+    help = (
+        "Find OnSchedule model instances without a SubjectScheduleHistory "
+        "instance and, optionally, delete them"
+    )
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -14,35 +34,116 @@ class Command(BaseCommand):
             action="store_true",
             help="Delete invalid OnSchedule model instances",
         )
+        parser.add_argument(
+            "--batch-size",
+            dest="batch_size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Rows read, and with --delete deleted in one transaction, at a time. "
+            f"Default: {DEFAULT_BATCH_SIZE}",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Check onschedule models in parallel using this many threads. Default: 1",
+        )
 
     def handle(self, *args, **options):
-        allow_delete = False
-        if options["delete"]:
-            allow_delete = True
+        self.delete = options["delete"]
+        self.batch_size = options["batch_size"]
+        if self.batch_size < 1 or options["workers"] < 1:
+            raise CommandError("Expected --batch-size and --workers of at least 1.")
+        self.lock = Lock()
+        if not self.delete:
+            self.write("Checking only")
+        onschedule_model_classes = list(get_onschedule_model_classes().values())
+        if options["workers"] > 1:
+            with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+                results = list(executor.map(self.run_in_thread, onschedule_model_classes))
         else:
-            print("Checking only")
-        subject_schedule_history_cls = django_apps.get_model(
-            "edc_visit_schedule.subjectschedulehistory"
+            results = [self.find_invalid(model_cls) for model_cls in onschedule_model_classes]
+        self.write_summary(results)
+
+    def write(self, msg: str, style_func=None) -> None:
+        with self.lock:
+            self.stdout.write(msg, style_func=style_func)
+
+    def run_in_thread(self, onschedule_model_cls: type[models.Model]) -> Result:
+        try:
+            return self.find_invalid(onschedule_model_cls)
+        finally:
+            # each thread has its own connections
+            connections.close_all()
+
+    def find_invalid(self, onschedule_model_cls: type[models.Model]) -> Result:
+        """Lists the invalid instances of an onschedule model using
+        one anti-join query, streamed in batches.
+
+        If `--delete`, counts the invalid instances instead, then
+        reads and deletes them one batch at a time. See
+        `delete_invalid`.
+        """
+        label_lower = onschedule_model_cls._meta.label_lower
+        total = onschedule_model_cls.objects.count()
+        self.write(f"{label_lower}: checking {total} instance(s) ...")
+        queryset = (
+            get_onschedule_not_in_history(onschedule_model_cls)
+            .order_by()
+            .values_list("pk", "subject_identifier")
         )
-        for visit_schedule in site_visit_schedules.visit_schedules.values():
-            for schedule in visit_schedule.schedules.values():
-                try:
-                    onschedule_model_cls = getattr(schedule, "onschedule_model_cls")
-                except LookupError:
-                    pass
-                else:
-                    for onschedule_obj in onschedule_model_cls.objects.all():
-                        try:
-                            subject_schedule_history_cls.objects.get(
-                                subject_identifier=onschedule_obj.subject_identifier,
-                                onschedule_model=onschedule_model_cls._meta.label_lower,
-                            )
-                        except ObjectDoesNotExist:
-                            msg = (
-                                f"{onschedule_model_cls._meta.label_lower} for "
-                                f"{onschedule_obj.subject_identifier} is invalid."
-                            )
-                            if allow_delete:
-                                msg = f"{msg} deleted."
-                                onschedule_obj.delete()
-                            print(msg)
+        if self.delete:
+            invalid = queryset.count()
+            self.write(f"{label_lower}: found {invalid} invalid of {total}.")
+            deleted = self.delete_invalid(onschedule_model_cls, queryset, invalid)
+        else:
+            invalid = 0
+            for _, subject_identifier in queryset.iterator(chunk_size=self.batch_size):
+                invalid += 1
+                self.write(f"{label_lower} for {subject_identifier} is invalid.")
+            self.write(f"{label_lower}: found {invalid} invalid of {total}.")
+            deleted = 0
+        return Result(label_lower, total, invalid, deleted)
+
+    def delete_invalid(
+        self, onschedule_model_cls: type[models.Model], queryset: models.QuerySet, invalid: int
+    ) -> int:
+        """Reads a batch from the anti-join and deletes it, one
+        transaction per batch, until the anti-join is empty.
+
+        At most `--batch-size` primary keys are held in memory.
+        Deletes using `QuerySet.delete` so that signals and the
+        audit trail (HistoricalRecords) are still updated.
+        """
+        label_lower = onschedule_model_cls._meta.label_lower
+        deleted = 0
+        while batch := list(queryset[: self.batch_size]):
+            for _, subject_identifier in batch:
+                self.write(f"{label_lower} for {subject_identifier} is invalid.")
+            with transaction.atomic():
+                _, counts = onschedule_model_cls.objects.filter(
+                    pk__in=[pk for pk, _ in batch]
+                ).delete()
+            if not (batch_deleted := counts.get(onschedule_model_cls._meta.label, 0)):
+                # nothing was deleted, the next read would return the same rows
+                break
+            deleted += batch_deleted
+            self.write(f"{label_lower}: deleted {deleted}/{invalid}.")
+        return deleted
+
+    def write_summary(self, results: list[Result]) -> None:
+        self.write("Summary:")
+        self.write(f"  {'model':<40}{'total':>10}{'invalid':>10}{'deleted':>10}")
+        for result in results:
+            self.write(
+                f"  {result.label_lower:<40}{result.total:>10}"
+                f"{result.invalid:>10}{result.deleted:>10}"
+            )
+        invalid = sum(result.invalid for result in results)
+        if invalid and not self.delete:
+            self.write(
+                f"Found {invalid} invalid instance(s). Run with --delete to delete.",
+                style_func=self.style.WARNING,
+            )
+        else:
+            self.write("Done.", style_func=self.style.SUCCESS)
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from edc_visit_schedule.models import VisitSchedule
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+
+
+class Command(BaseCommand):
+    help = (
+        "Populate the VisitSchedule model from the registered visit schedules "
+        "if they changed since last populated"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Populate even if the visit schedules are unchanged",
+        )
+
+    def handle(self, *args, **options):
+        if not options["force"] and site_visit_schedules.is_model_current(VisitSchedule):
+            self.stdout.write(
+                "Visit schedules unchanged since last populated. Use --force to populate."
+            )
+            return
+        result = site_visit_schedules.to_model(VisitSchedule)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {result.created}, updated {result.updated}, "
+                f"deactivated {result.deactivated}."
+            )
+        )
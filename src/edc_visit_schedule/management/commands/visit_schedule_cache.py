@@ -0,0 +1,110 @@
+import json
+import os
+import subprocess  # nosec B404
+import sys
+import time
+
+from django.apps import apps as django_apps
+from django.core.management.base import BaseCommand, CommandError
+
+from edc_visit_schedule.registry_cache import (
+    RegistryCacheError,
+    disable_env_var,
+    get_registry_cache_path,
+    get_registry_fingerprint,
+    save_registry,
+)
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the visit schedule registry cache used by autodiscover. "
+        "See settings.EDC_VISIT_SCHEDULE_REGISTRY_CACHE."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Delete the cache file",
+        )
+        parser.add_argument(
+            "--report",
+            action="store_true",
+            help="Compare startup time with and without the cache",
+        )
+        parser.add_argument(
+            "--timing",
+            action="store_true",
+            help="Print the autodiscover timing of this process as JSON (used by --report)",
+        )
+
+    def handle(self, *args, **options):
+        if options["timing"]:
+            self.stdout.write(json.dumps(site_visit_schedules.autodiscover_timing))
+            return
+        path = get_registry_cache_path()
+        if not path:
+            raise CommandError(
+                "Visit schedule cache is not enabled. "
+                "See settings.EDC_VISIT_SCHEDULE_REGISTRY_CACHE."
+            )
+        if options["clear"]:
+            path.unlink(missing_ok=True)
+            self.stdout.write(f"Deleted {path}.")
+            return
+        fingerprint = get_registry_fingerprint(
+            list(django_apps.app_configs), "visit_schedules"
+        )
+        try:
+            save_registry(site_visit_schedules.registry, fingerprint, path)
+        except RegistryCacheError as e:
+            raise CommandError(e)
+        self.stdout.write(
+            f"Wrote {len(site_visit_schedules.registry)} visit schedule(s) to {path}."
+        )
+        if options["report"]:
+            self.report()
+
+    def report(self) -> None:
+        cold = self.time_startup(use_cache=False)
+        cached = self.time_startup(use_cache=True)
+        self.stdout.write("Startup timing (seconds):")
+        self.stdout.write(f"  {'':<8}{'process':>10}{'autodiscover':>14}  source")
+        for label, timing in [("cold", cold), ("cached", cached)]:
+            self.stdout.write(
+                f"  {label:<8}{timing['process']:>10.3f}"
+                f"{timing['seconds']:>14.3f}  {timing['source']}"
+            )
+        if cached["seconds"]:
+            self.stdout.write(
+                f"  autodiscover speedup: {cold['seconds'] / cached['seconds']:.1f}x"
+            )
+
+    def time_startup(self, use_cache: bool) -> dict:
+        """Starts a new process and returns the wall time to
+        start up and the autodiscover timing reported by it.
+        """
+        env = os.environ.copy()
+        if use_cache:
+            env.pop(disable_env_var, None)
+        else:
+            env[disable_env_var] = "1"
+        start = time.perf_counter()
+        result = subprocess.run(  # nosec B603
+            [sys.executable, "-m", "django", "visit_schedule_cache", "--timing"],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        process_seconds = time.perf_counter() - start
+        if result.returncode:
+            raise CommandError(f"Failed to start a process. Got {result.stderr}")
+        timing = json.loads(result.stdout.strip().splitlines()[-1]) or {}
+        return dict(
+            process=process_seconds,
+            seconds=timing.get("seconds", 0.0),
+            source=timing.get("source"),
+        )
@@ -0,0 +1,102 @@
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from edc_utils import get_utcnow
+
+from edc_visit_schedule.system_checks import (
+    get_changed_onschedule_models,
+    get_data_check_counts,
+    get_onschedule_not_in_history_errors,
+    get_subject_schedule_history_errors,
+)
+
+
+class Checkpoint(NamedTuple):
+    modified: datetime
+    counts: dict
+
+
+def get_checkpoint_path() -> Path | None:
+    """Returns the path of the checkpoint file or None.
+
+    Set `settings.EDC_VISIT_SCHEDULE_DATA_CHECKS_CHECKPOINT` to enable.
+    """
+    path = getattr(settings, "EDC_VISIT_SCHEDULE_DATA_CHECKS_CHECKPOINT", None)
+    return Path(path) if path else None
+
+
+def read_checkpoint(path: Path) -> Checkpoint | None:
+    try:
+        data = json.loads(path.read_text())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        raise CommandError(f"Unable to read checkpoint. Got {e}. See {path}.")
+    # a checkpoint without counts re-checks all onschedule models
+    return Checkpoint(datetime.fromisoformat(data["modified"]), data.get("counts", {}))
+
+
+def write_checkpoint(path: Path, modified: datetime, counts: dict) -> None:
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_text(json.dumps(dict(modified=modified.isoformat(), counts=counts)))
+    os.replace(tmp_path, path)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the visit schedule data checks for the onschedule models with "
+        "instances added, modified or deleted since the last clean run. "
+        "See settings.EDC_VISIT_SCHEDULE_DATA_CHECKS_CHECKPOINT."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Check all instances, ignoring the checkpoint",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            dest="checkpoint",
+            default=None,
+            help="Path of the checkpoint file. Overrides the setting",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["checkpoint"]) if options["checkpoint"] else get_checkpoint_path()
+        checkpoint = None
+        if path and not options["full"]:
+            checkpoint = read_checkpoint(path)
+        # rows modified while the checks run are checked again next time
+        started = get_utcnow()
+        counts = get_data_check_counts()
+        onschedule_models = None
+        if checkpoint:
+            # both directions are checked for each changed onschedule model
+            onschedule_models = get_changed_onschedule_models(
+                checkpoint.modified, counts, checkpoint.counts
+            )
+            self.stdout.write(
+                f"Checking onschedule models changed since {checkpoint.modified}: "
+                f"{', '.join(onschedule_models) or 'none'}."
+            )
+        else:
+            self.stdout.write("Checking all instances.")
+        errors = [
+            *get_subject_schedule_history_errors(onschedule_models=onschedule_models),
+            *get_onschedule_not_in_history_errors(onschedule_models=onschedule_models),
+        ]
+        for error in errors:
+            self.stdout.write(self.style.ERROR(str(error)))
+        if errors:
+            # keep the checkpoint so errors are reported until resolved
+            raise CommandError(f"Visit schedule data checks found {len(errors)} error(s).")
+        if path:
+            write_checkpoint(path, started, counts)
+            self.stdout.write(f"Saved checkpoint to {path}.")
+        self.stdout.write(self.style.SUCCESS("Visit schedule data checks passed."))
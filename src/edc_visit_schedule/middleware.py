@@ -0,0 +1,18 @@
+from .subject_schedule_cache import subject_schedule_cache
+
+
+class SubjectScheduleCacheMiddleware:
+    """Caches subject schedule intervals for the duration of a
+    request so that modelform validation and model save do not
+    re-query the onschedule and offschedule models.
+
+    Add "edc_visit_schedule.middleware.SubjectScheduleCacheMiddleware"
+    to settings.MIDDLEWARE.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with subject_schedule_cache():
+            return self.get_response(request)
@@ -0,0 +1,140 @@
+import _socket
+
+import django_audit_fields.fields.hostname_modification_field
+import django_audit_fields.fields.userfield
+import django_audit_fields.fields.uuid_auto_field
+import django_audit_fields.models.audit_model_mixin
+import django_revision.revision_field
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("edc_visit_schedule", "0017_alter_onschedule_managers"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VisitScheduleFingerprint",
+            fields=[
+                (
+                    "revision",
+                    django_revision.revision_field.RevisionField(
+                        blank=True,
+                        editable=False,
+                        help_text="System field. Git repository tag:branch:commit.",
+                        max_length=75,
+                        null=True,
+                        verbose_name="Revision",
+                    ),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(
+                        blank=True,
+                        default=django_audit_fields.models.audit_model_mixin.utcnow,
+                    ),
+                ),
+                (
+                    "modified",
+                    models.DateTimeField(
+                        blank=True,
+                        default=django_audit_fields.models.audit_model_mixin.utcnow,
+                    ),
+                ),
+                (
+                    "user_created",
+                    django_audit_fields.fields.userfield.UserField(
+                        blank=True,
+                        help_text="Updated by admin.save_model",
+                        max_length=50,
+                        verbose_name="user created",
+                    ),
+                ),
+                (
+                    "user_modified",
+                    django_audit_fields.fields.userfield.UserField(
+                        blank=True,
+                        help_text="Updated by admin.save_model",
+                        max_length=50,
+                        verbose_name="user modified",
+                    ),
+                ),
+                (
+                    "hostname_created",
+                    models.CharField(
+                        blank=True,
+                        default=_socket.gethostname,
+                        help_text="System field. (modified on create only)",
+                        max_length=60,
+                        verbose_name="Hostname created",
+                    ),
+                ),
+                (
+                    "hostname_modified",
+                    django_audit_fields.fields.hostname_modification_field.HostnameModificationField(
+                        blank=True,
+                        help_text="System field. (modified on every save)",
+                        max_length=50,
+                        verbose_name="Hostname modified",
+                    ),
+                ),
+                (
+                    "device_created",
+                    models.CharField(blank=True, max_length=10, verbose_name="Device created"),
+                ),
+                (
+                    "device_modified",
+                    models.CharField(
+                        blank=True, max_length=10, verbose_name="Device modified"
+                    ),
+                ),
+                (
+                    "locale_created",
+                    models.CharField(
+                        blank=True,
+                        help_text="Auto-updated by Modeladmin",
+                        max_length=10,
+                        null=True,
+                        verbose_name="Locale created",
+                    ),
+                ),
+                (
+                    "locale_modified",
+                    models.CharField(
+                        blank=True,
+                        help_text="Auto-updated by Modeladmin",
+                        max_length=10,
+                        null=True,
+                        verbose_name="Locale modified",
+                    ),
+                ),
+                (
+                    "id",
+                    django_audit_fields.fields.uuid_auto_field.UUIDAutoField(
+                        blank=True,
+                        editable=False,
+                        help_text="System auto field. UUID primary key.",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("model", models.CharField(max_length=100, unique=True)),
+                ("fingerprint", models.CharField(max_length=64)),
+            ],
+            options={
+                "verbose_name": "Visit Schedule Fingerprint",
+                "verbose_name_plural": "Visit Schedule Fingerprints",
+                "abstract": False,
+                "default_permissions": (
+                    "add",
+                    "change",
+                    "delete",
+                    "view",
+                    "export",
+                    "import",
+                ),
+                "default_manager_name": "objects",
+            },
+        ),
+    ]
@@ -8,4 +8,5 @@ from .visit_schedule import (
     VisitScheduleMethodsModelMixin,
     VisitScheduleModelMixin,
     VisitScheduleModelMixinError,
+    VisitScheduleQuerySet,
 )
@@ -5,3 +5,4 @@ from .visit_schedule_methods_model_mixin import (
     VisitScheduleModelMixinError,
 )
 from .visit_schedule_model_mixins import VisitScheduleModelMixin
+from .visit_schedule_queryset import VisitScheduleQuerySet
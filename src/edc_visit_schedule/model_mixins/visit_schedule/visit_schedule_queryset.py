@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from django.db import models
+
+from ...baseline import annotate_is_baseline
+from ...window_expressions import annotate_window_bounds
+
+
+class VisitScheduleQuerySet(models.QuerySet):
+    """A QuerySet for models declared with VisitScheduleModelMixin,
+    e.g. Appointment and the subject visit model.
+
+    Annotations are computed in SQL from the registered schedules
+    so that listboards and reports may filter and sort on them
+    without accessing `visit` per row.
+
+    The models are declared in other modules so this queryset is
+    not attached to a manager here. Declare on the model with
+    `VisitScheduleQuerySet.as_manager()` or combine with an existing
+    manager, e.g.
+        objects = AppointmentManager.from_queryset(VisitScheduleQuerySet)()
+
+    or wrap an existing model, e.g.
+        VisitScheduleQuerySet(model=Appointment).annotate_window_bounds()
+
+    See README.
+    """
+
+    def annotate_is_baseline(self, lookup_prefix: str | None = None) -> VisitScheduleQuerySet:
+        """Annotates `is_baseline`.
+
+        See `edc_visit_schedule.baseline.is_baseline_expression`.
+        """
+        return annotate_is_baseline(self, lookup_prefix=lookup_prefix)
+
+    def annotate_window_bounds(
+        self,
+        lookup_prefix: str | None = None,
+        timepoint_datetime_field: str | None = None,
+    ) -> VisitScheduleQuerySet:
+        """Annotates `window_lower` and `window_upper`.
+
+        Set `lookup_prefix` to "appointment__" for a visit model.
+
+        See `edc_visit_schedule.window_expressions.WindowExpressions`.
+        """
+        return annotate_window_bounds(
+            self,
+            lookup_prefix=lookup_prefix,
+            timepoint_datetime_field=timepoint_datetime_field,
+        )
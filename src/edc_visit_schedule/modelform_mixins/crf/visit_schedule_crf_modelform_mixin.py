@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 from django import forms
 
 from ...schedule import Schedule
@@ -6,6 +8,7 @@ from ...subject_schedule import (
     NotOnScheduleForDateError,
     SubjectSchedule,
 )
+from ...subject_schedule_cache import ScheduleInterval, get_schedule_interval
 from ...utils import report_datetime_within_onschedule_offschedule_datetimes
 from ...visit_schedule import VisitSchedule
 
@@ -41,6 +44,17 @@ class VisitScheduleCrfModelFormMixin:
     def schedule(self) -> Schedule:
         return self.related_visit.schedule
 
+    @property
+    def schedule_interval(self) -> ScheduleInterval | None:
+        """Returns the subject's onschedule and offschedule datetimes,
+        read once and shared by the schedule validators in `clean`.
+        """
+        if not getattr(self, "_schedule_interval", None):
+            self._schedule_interval = get_schedule_interval(
+                self.schedule, self.get_subject_identifier()
+            )
+        return self._schedule_interval
+
     def is_onschedule_or_raise(self) -> None:
         if self.report_datetime and self.related_visit:
             visit_schedule = self.visit_schedule
@@ -54,6 +68,7 @@ class VisitScheduleCrfModelFormMixin:
                     compare_as_datetimes=(
                         self._meta.model.offschedule_compare_dates_as_datetimes
                     ),
+                    interval=self.schedule_interval,
                 )
             except (NotOnScheduleError, NotOnScheduleForDateError) as e:
                 raise forms.ValidationError(str(e))
@@ -66,4 +81,5 @@ class VisitScheduleCrfModelFormMixin:
                 visit_schedule_name=self.visit_schedule_name,
                 schedule_name=self.schedule_name,
                 exception_cls=forms.ValidationError,
+                interval=self.schedule_interval,
             )
@@ -10,6 +10,7 @@ from ..subject_schedule import (
     NotOnScheduleForDateError,
     SubjectSchedule,
 )
+from ..subject_schedule_cache import ScheduleInterval, get_schedule_interval
 from ..utils import report_datetime_within_onschedule_offschedule_datetimes
 from ..visit_schedule import VisitSchedule
 
@@ -41,28 +42,43 @@ class VisitScheduleNonCrfModelFormMixin:
 
     @property
     def visit_schedule(self) -> VisitSchedule:
-        visit_schedule = getattr(self.instance, "visit_schedule", None)
-        if not visit_schedule:
-            if self.get_by_model_attr:
-                visit_schedule, _ = site_visit_schedules.get_by_model(
+        if not getattr(self, "_visit_schedule", None):
+            visit_schedule = getattr(self.instance, "visit_schedule", None)
+            if not visit_schedule:
+                if self.get_by_model_attr:
+                    visit_schedule, _ = site_visit_schedules.get_by_model(
+                        attr=self.get_by_model_attr, model=self._meta.model._meta.label_lower
+                    )
+                else:
+                    raise VisitScheduleNonCrfModelFormMixinError(
+                        "Unable to determine `visit schedule`. "
+                        f"See model and modelform for {self._meta.model}."
+                    )
+            self._visit_schedule = visit_schedule
+        return self._visit_schedule
+
+    @property
+    def schedule(self) -> Schedule:
+        if not getattr(self, "_schedule", None):
+            try:
+                _, schedule = site_visit_schedules.get_by_model(
                     attr=self.get_by_model_attr, model=self._meta.model._meta.label_lower
                 )
-            else:
-                raise VisitScheduleNonCrfModelFormMixinError(
-                    "Unable to determine `visit schedule`. "
-                    f"See model and modelform for {self._meta.model}."
-                )
-        return visit_schedule
+            except SiteVisitScheduleError:
+                schedule = self.instance.schedule
+            self._schedule = schedule
+        return self._schedule
 
     @property
-    def schedule(self) -> Schedule:
-        try:
-            _, schedule = site_visit_schedules.get_by_model(
-                attr=self.get_by_model_attr, model=self._meta.model._meta.label_lower
+    def schedule_interval(self) -> ScheduleInterval | None:
+        """Returns the subject's onschedule and offschedule datetimes,
+        read once and shared by the schedule validators in `clean`.
+        """
+        if not getattr(self, "_schedule_interval", None):
+            self._schedule_interval = get_schedule_interval(
+                self.schedule, self.get_subject_identifier()
             )
-        except SiteVisitScheduleError:
-            schedule = self.instance.schedule
-        return schedule
+        return self._schedule_interval
 
     def is_onschedule_or_raise(self) -> None:
         if self.report_datetime:
@@ -73,6 +89,7 @@ class VisitScheduleNonCrfModelFormMixin:
                 subject_schedule.onschedule_or_raise(
                     report_datetime=self.report_datetime,
                     compare_as_datetimes=self.offschedule_compare_dates_as_datetimes,
+                    interval=self.schedule_interval,
                 )
             except (NotOnScheduleError, NotOnScheduleForDateError) as e:
                 raise forms.ValidationError(str(e))
@@ -85,4 +102,5 @@ class VisitScheduleNonCrfModelFormMixin:
                 visit_schedule_name=self.visit_schedule_name,
                 schedule_name=self.schedule_name,
                 exception_cls=forms.ValidationError,
+                interval=self.schedule_interval,
             )
@@ -1,8 +1,10 @@
 from .offschedule import OffSchedule
 from .onschedule import OnSchedule
 from .signals import (
+    invalidate_subject_schedule_cache_on_post_save_or_delete,
     offschedule_model_on_post_save,
     put_subject_on_schedule_on_post_save,
 )
 from .subject_schedule_history import SubjectScheduleHistory
 from .visit_schedule import VisitSchedule
+from .visit_schedule_fingerprint import VisitScheduleFingerprint
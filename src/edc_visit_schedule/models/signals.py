@@ -4,6 +4,8 @@ from django.dispatch import receiver
 from ..constants import ON_SCHEDULE
 from ..model_mixins import OffScheduleModelMixin, OnScheduleModelMixin
 from ..site_visit_schedules import SiteVisitScheduleError, site_visit_schedules
+from ..subject_schedule_cache import invalidate_subject_schedule_cache
+from .subject_schedule_history import SubjectScheduleHistory
 
 
 @receiver(post_save, weak=False, dispatch_uid="offschedule_model_on_post_save")
@@ -66,3 +68,14 @@ def put_subject_on_schedule_on_post_save(sender, instance, raw, created, **kwarg
         except AttributeError as e:
             if "put_subject_on_schedule_on_post_save" not in str(e):
                 raise
+
+
+@receiver(post_save, weak=False, dispatch_uid="invalidate_subject_schedule_cache_on_post_save")
+@receiver(
+    post_delete, weak=False, dispatch_uid="invalidate_subject_schedule_cache_on_post_delete"
+)
+def invalidate_subject_schedule_cache_on_post_save_or_delete(sender, instance, **kwargs):
+    if isinstance(
+        instance, (OnScheduleModelMixin, OffScheduleModelMixin, SubjectScheduleHistory)
+    ):
+        invalidate_subject_schedule_cache(instance.subject_identifier)
@@ -25,28 +25,81 @@ class SubjectScheduleModelManager(models.Manager):
             schedule_name=schedule_name,
         )
 
-    def onschedules(self, subject_identifier=None, report_datetime=None):
-        """Returns a list of onschedule model instances for this
-        subject where the schedule_status would be ON_SCHEDULE
-        relative to the report_datetime.
+    def onschedule_rows(self, subject_identifiers: list[str], report_datetime=None):
+        """Returns a queryset of history instances for these subjects
+        where the schedule_status would be ON_SCHEDULE relative to
+        the report_datetime.
         """
-        onschedules = []
         report_datetime = report_datetime or get_utcnow()
-        qs = self.filter(
-            Q(subject_identifier=subject_identifier),
+        return self.filter(
+            Q(subject_identifier__in=subject_identifiers),
             Q(onschedule_datetime__lte=report_datetime),
             (
                 Q(offschedule_datetime__gte=report_datetime)
                 | Q(offschedule_datetime__isnull=True)
             ),
         )
-        for obj in qs:
-            onschedule_model_cls = django_apps.get_model(obj.onschedule_model)
-            onschedules.append(
-                onschedule_model_cls.objects.get(subject_identifier=subject_identifier)
-            )
+
+    def onschedules(self, subject_identifier=None, report_datetime=None):
+        """Returns a list of onschedule model instances for this
+        subject where the schedule_status would be ON_SCHEDULE
+        relative to the report_datetime.
+        """
+        return self.onschedules_for_subjects(
+            [subject_identifier], report_datetime=report_datetime
+        ).get(subject_identifier, [])
+
+    def onschedules_for_subjects(
+        self, subject_identifiers: list[str], report_datetime=None
+    ) -> dict[str, list]:
+        """Returns a dictionary of {subject_identifier: [onschedule model
+        instances]} for many subjects.
+
+        Reads the history instances in one query and the onschedule
+        instances in one query per onschedule model.
+        """
+        rows = list(
+            self.onschedule_rows(
+                subject_identifiers, report_datetime=report_datetime
+            ).values_list("subject_identifier", "onschedule_model")
+        )
+        by_model: dict[str, set[str]] = {}
+        for subject_identifier, onschedule_model in rows:
+            by_model.setdefault(onschedule_model, set()).add(subject_identifier)
+        instances = {}
+        for onschedule_model, subjects in by_model.items():
+            onschedule_model_cls = django_apps.get_model(onschedule_model)
+            for obj in onschedule_model_cls.objects.filter(subject_identifier__in=subjects):
+                instances[(onschedule_model, obj.subject_identifier)] = obj
+        onschedules: dict[str, list] = {}
+        for subject_identifier, onschedule_model in rows:
+            try:
+                obj = instances[(onschedule_model, subject_identifier)]
+            except KeyError:
+                onschedule_model_cls = django_apps.get_model(onschedule_model)
+                raise onschedule_model_cls.DoesNotExist(
+                    f"{onschedule_model_cls.__name__} matching query does not exist. "
+                    f"Got subject_identifier=`{subject_identifier}`."
+                )
+            onschedules.setdefault(subject_identifier, []).append(obj)
         return onschedules
 
+    def onschedule_model_labels(
+        self, subject_identifier=None, report_datetime=None
+    ) -> list[tuple[str, str]]:
+        """Returns a list of (onschedule_model, offschedule_model), in
+        label_lower format, for this subject where the schedule_status
+        would be ON_SCHEDULE relative to the report_datetime.
+
+        Reads the labels stored on the history instances without
+        fetching the onschedule model instances.
+        """
+        return list(
+            self.onschedule_rows(
+                [subject_identifier], report_datetime=report_datetime
+            ).values_list("onschedule_model", "offschedule_model")
+        )
+
 
 class SubjectScheduleHistory(
     NonUniqueSubjectIdentifierFieldMixin,
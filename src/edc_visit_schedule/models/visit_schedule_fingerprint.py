@@ -0,0 +1,21 @@
+from django.db import models
+from edc_model import models as edc_models
+
+
+class VisitScheduleFingerprint(edc_models.BaseUuidModel):
+    """A model used by the system. Records the fingerprint of the
+    registered visit schedules last written to a VisitSchedule model.
+
+    See `site_visit_schedules.to_model` and `populate_visit_schedule`.
+    """
+
+    model = models.CharField(max_length=100, unique=True)
+
+    fingerprint = models.CharField(max_length=64)
+
+    def __str__(self):
+        return f"{self.model}: {self.fingerprint}"
+
+    class Meta(edc_models.BaseUuidModel.Meta):
+        verbose_name = "Visit Schedule Fingerprint"
+        verbose_name_plural = "Visit Schedule Fingerprints"
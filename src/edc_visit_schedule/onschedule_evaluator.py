@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Iterable, Iterator, NamedTuple
+
+from django.conf import settings
+from edc_utils import convert_php_dateformat
+from edc_utils.date import to_local
+
+from .exceptions import NotOnScheduleError, NotOnScheduleForDateError
+
+if TYPE_CHECKING:
+    from .schedule import Schedule
+
+__all__ = ["OnScheduleEvaluator", "OnScheduleViolation"]
+
+
+class OnScheduleViolation(NamedTuple):
+    """An item that failed `onschedule_or_raise`.
+
+    `index` is the position of the item in the input.
+    """
+
+    index: int
+    subject_identifier: str
+    report_datetime: datetime
+    error: NotOnScheduleError | NotOnScheduleForDateError
+
+
+class OnScheduleEvaluator:
+    """A class that answers `SubjectSchedule.onschedule_or_raise` for
+    many (subject_identifier, report_datetime) pairs.
+
+    The onschedule and offschedule datetimes of the schedule are
+    read once, in two queries, into arrays sorted by
+    subject_identifier. Each item is then evaluated with a binary
+    search, without querying the database.
+
+    As with `onschedule_or_raise`, a subject who is on schedule and
+    has not been taken off is on schedule for any report datetime.
+
+    Usage:
+        evaluator = schedule.onschedule_evaluator()
+        mask = evaluator.mask(items)
+        for violation in evaluator.violations(items):
+            ...
+    """
+
+    def __init__(
+        self,
+        schedule: Schedule,
+        subject_identifiers: Iterable[str] | None = None,
+        compare_as_datetimes: bool | None = None,
+    ):
+        self.schedule = schedule
+        self.schedule_name = schedule.name
+        self.compare_as_datetimes = (
+            True if compare_as_datetimes is None else compare_as_datetimes
+        )
+        self.subject_identifiers = (
+            None if subject_identifiers is None else list(subject_identifiers)
+        )
+        self._subjects: list[str] | None = None
+        self._onschedule: list[datetime] = []
+        self._offschedule: list[datetime | None] = []
+        self._onschedule_dates: list[date] = []
+        self._offschedule_dates: list[date | None] = []
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(schedule={self.schedule})"
+
+    def load(self) -> OnScheduleEvaluator:
+        """Reads the onschedule and offschedule datetimes of the
+        schedule, optionally filtered by `subject_identifiers`.
+        """
+        onschedule_qs = self.schedule.onschedule_model_cls.objects.all()
+        offschedule_qs = self.schedule.offschedule_model_cls.objects.all()
+        if self.subject_identifiers is not None:
+            onschedule_qs = onschedule_qs.filter(
+                subject_identifier__in=self.subject_identifiers
+            )
+            offschedule_qs = offschedule_qs.filter(
+                subject_identifier__in=self.subject_identifiers
+            )
+        offschedule_datetimes = dict(
+            offschedule_qs.values_list("subject_identifier", "offschedule_datetime")
+        )
+        self.set_intervals(
+            (
+                subject_identifier,
+                onschedule_datetime,
+                offschedule_datetimes.get(subject_identifier),
+            )
+            for subject_identifier, onschedule_datetime in onschedule_qs.values_list(
+                "subject_identifier", "onschedule_datetime"
+            )
+        )
+        return self
+
+    def set_intervals(
+        self, intervals: Iterable[tuple[str, datetime, datetime | None]]
+    ) -> OnScheduleEvaluator:
+        """Sets the arrays from a sequence of
+        (subject_identifier, onschedule_datetime, offschedule_datetime).
+        """
+        intervals = sorted(intervals, key=lambda interval: interval[0])
+        self._subjects = [interval[0] for interval in intervals]
+        self._onschedule = [interval[1] for interval in intervals]
+        self._offschedule = [interval[2] for interval in intervals]
+        self._onschedule_dates = [dt.date() for dt in self._onschedule]
+        self._offschedule_dates = [dt.date() if dt else None for dt in self._offschedule]
+        return self
+
+    def _position(self, subject_identifier: str) -> int | None:
+        if self._subjects is None:
+            self.load()
+        position = bisect_left(self._subjects, subject_identifier)
+        if position < len(self._subjects) and self._subjects[position] == subject_identifier:
+            return position
+        return None
+
+    def _in_date_range(self, position: int, report_datetime: datetime) -> bool:
+        if self._offschedule[position] is None:
+            return True
+        if self.compare_as_datetimes:
+            return self._onschedule[position] <= report_datetime <= self._offschedule[position]
+        return (
+            self._onschedule_dates[position]
+            <= report_datetime.date()
+            <= self._offschedule_dates[position]
+        )
+
+    def is_onschedule(self, subject_identifier: str, report_datetime: datetime) -> bool:
+        position = self._position(subject_identifier)
+        return position is not None and self._in_date_range(position, report_datetime)
+
+    def get_error(
+        self, subject_identifier: str, report_datetime: datetime
+    ) -> NotOnScheduleError | NotOnScheduleForDateError | None:
+        """Returns the exception `onschedule_or_raise` would raise
+        or None.
+        """
+        position = self._position(subject_identifier)
+        if position is None:
+            return NotOnScheduleError(
+                f"Subject has not been put on a schedule `{self.schedule_name}`. "
+                f"Got subject_identifier=`{subject_identifier}`."
+            )
+        if self._in_date_range(position, report_datetime):
+            return None
+        date_format = convert_php_dateformat(settings.SHORT_DATETIME_FORMAT)
+        formatted_offschedule_datetime = to_local(self._offschedule[position]).strftime(
+            date_format
+        )
+        return NotOnScheduleForDateError(
+            f"Subject not on schedule '{self.schedule_name}' for "
+            f"report date '{to_local(report_datetime).strftime(date_format)}'. "
+            f"Got '{subject_identifier}' was taken "
+            f"off this schedule on '{formatted_offschedule_datetime}'."
+        )
+
+    def evaluate(self, items: Iterable[tuple[str, datetime]]) -> Iterator[bool]:
+        """Yields True for each (subject_identifier, report_datetime)
+        on schedule, otherwise False.
+
+        `items` may be an iterator.
+        """
+        for subject_identifier, report_datetime in items:
+            yield self.is_onschedule(subject_identifier, report_datetime)
+
+    def mask(self, items: Iterable[tuple[str, datetime]]) -> list[bool]:
+        """Returns a list of booleans, one per item in `items`."""
+        return list(self.evaluate(items))
+
+    def violations(
+        self, items: Iterable[tuple[str, datetime]]
+    ) -> Iterator[OnScheduleViolation]:
+        """Yields an OnScheduleViolation for each item in `items`
+        not on schedule.
+        """
+        for index, (subject_identifier, report_datetime) in enumerate(items):
+            if self.is_onschedule(subject_identifier, report_datetime):
+                continue
+            if error := self.get_error(subject_identifier, report_datetime):
+                yield OnScheduleViolation(index, subject_identifier, report_datetime, error)
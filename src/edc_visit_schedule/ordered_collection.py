@@ -1,21 +1,95 @@
-import itertools
+from bisect import bisect_right
 from collections import OrderedDict
 
 
 class OrderedCollection(OrderedDict):
+    """An ordered dictionary kept sorted on `update`.
+
+    A position index (key -> ordinal and an ordinal-ordered list of
+    keys) is maintained on `update` so that `next`, `previous`,
+    `position` and `at` are constant-time. Other mutations discard
+    the index; it is rebuilt on next access.
+
+    `update` inserts new items in place using bisect on the
+    ordering values. Replacing an existing key, or any mutation
+    other than `update`, falls back to re-sorting the whole
+    collection on the next `update`.
+    """
+
     key: str = None  # key name in dictionary key/value pair
     ordering_attr: str = None  # value.attrname to order dictionary on.
 
+    _keys: list | None = None
+    _positions: dict | None = None
+    _ordering_values: list | None = None  # only set while sorted by `update`
+
     def update(self, *args, **kwargs) -> None:
         """Updates and reorders."""
+        items = dict(*args, **kwargs)
+        if self._ordering_values is None or any(
+            k in self or k != getattr(v, self.key) for k, v in items.items()
+        ):
+            super().update(items)
+            self._sort()
+        else:
+            for k, v in items.items():
+                self._insert(k, v)
 
+    def _sort(self) -> None:
         def key_order(v):
             return getattr(v, self.ordering_attr)
 
-        super().update(*args, **kwargs)
         od = self.copy()
         self.clear()
         super().update(**{getattr(v, self.key): v for v in sorted(od.values(), key=key_order)})
+        self._build_index()
+        self._ordering_values = [getattr(v, self.ordering_attr) for v in self.values()]
+
+    def _insert(self, key, value) -> None:
+        """Inserts a new item after any items with an equal
+        ordering value, as a stable sort would.
+        """
+        ordering_value = getattr(value, self.ordering_attr)
+        position = bisect_right(self._ordering_values, ordering_value)
+        super().__setitem__(key, value)
+        self._ordering_values.insert(position, ordering_value)
+        self._keys.insert(position, key)
+        for k in self._keys[position + 1 :]:
+            super().move_to_end(k)
+            self._positions[k] += 1
+        self._positions[key] = position
+
+    def _discard_index(self) -> None:
+        self._keys = None
+        self._ordering_values = None
+
+    def __setitem__(self, key, value) -> None:
+        self._discard_index()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key) -> None:
+        self._discard_index()
+        super().__delitem__(key)
+
+    def clear(self) -> None:
+        self._discard_index()
+        super().clear()
+
+    def pop(self, *args):
+        self._discard_index()
+        return super().pop(*args)
+
+    def popitem(self, *args, **kwargs):
+        self._discard_index()
+        return super().popitem(*args, **kwargs)
+
+    def setdefault(self, *args, **kwargs):
+        self._discard_index()
+        return super().setdefault(*args, **kwargs)
+
+    def move_to_end(self, *args, **kwargs) -> None:
+        self._discard_index()
+        super().move_to_end(*args, **kwargs)
 
     @property
     def first(self):
@@ -29,30 +103,32 @@ class OrderedCollection(OrderedDict):
 
     def previous(self, key):
         """Returns the previous item or None."""
-        if self._iter_keys(key=key, reverse=True) is None:
+        position = self.position(key)
+        if not position:
             return None
-        return self.get(self._iter_keys(key=key, reverse=True))
+        return self[self._keys[position - 1]]
 
     def next(self, key):
         """Returns the next item or None."""
-        if self._iter_keys(key=key) is None:
+        position = self.position(key)
+        if position is None or position + 1 >= len(self._keys):
             return None
-        return self.get(self._iter_keys(key=key))
+        return self[self._keys[position + 1]]
 
-    def _iter_keys(self, key=None, reverse=None):
-        if reverse:
-            seq = reversed(self.keys())
-        else:
-            seq = iter(self.keys())
-        keys = itertools.dropwhile(lambda x: x != key, seq)
-        try:
-            k = next(keys)
-        except StopIteration:
-            pass
-        else:
-            if k != key:
-                raise AssertionError
-        try:
-            return next(keys)
-        except StopIteration:
-            return None
+    def position(self, key) -> int | None:
+        """Returns the ordinal position of the key or None."""
+        if self._keys is None:
+            self._build_index()
+        return self._positions.get(key)
+
+    def at(self, position: int):
+        """Returns the item at the ordinal position or raises
+        an IndexError.
+        """
+        if self._keys is None:
+            self._build_index()
+        return self[self._keys[position]]
+
+    def _build_index(self) -> None:
+        self._keys = list(self.keys())
+        self._positions = {k: i for i, k in enumerate(self._keys)}
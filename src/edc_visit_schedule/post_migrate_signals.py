@@ -12,9 +12,17 @@ def populate_visit_schedule(sender=None, **kwargs):
 
     sys.stdout.write(style.MIGRATE_HEADING("Populating visit schedule:\n"))
     if getattr(settings, "EDC_VISIT_SCHEDULE_POPULATE_VISIT_SCHEDULE", True):
-        VisitSchedule.objects.update(active=False)
-        site_visit_schedules.to_model(VisitSchedule)
-        sys.stdout.write("Done.\n")
+        if site_visit_schedules.is_model_current(VisitSchedule):
+            sys.stdout.write(
+                "  unchanged since last populated. See management command "
+                "`populate_visit_schedule --force`. Done.\n"
+            )
+        else:
+            result = site_visit_schedules.to_model(VisitSchedule)
+            sys.stdout.write(
+                f"  created {result.created}, updated {result.updated}, "
+                f"deactivated {result.deactivated}. Done.\n"
+            )
     else:
         sys.stdout.write(
             "  not populating. See settings."
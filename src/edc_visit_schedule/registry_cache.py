@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle  # nosec B403
+import sys
+from importlib.metadata import PackageNotFoundError, version
+from importlib.util import find_spec
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from django.apps import apps as django_apps
+from django.conf import settings
+from edc_consent.site_consents import site_consents
+
+if TYPE_CHECKING:
+    from .visit_schedule import VisitSchedule
+
+__all__ = [
+    "RegistryCacheError",
+    "get_fingerprint_settings",
+    "get_registry_cache_path",
+    "get_imported_source_files",
+    "get_registry_fingerprint",
+    "get_shared_objects",
+    "load_registry",
+    "registry_cache_enabled",
+    "save_registry",
+]
+
+# bump if the pickled structure of the registry changes
+cache_format_version = "2"
+
+# settings read by this package while building Visit, Schedule and
+# VisitSchedule objects. See `get_fingerprint_settings`.
+fingerprint_settings = (
+    "EDC_FACILITY_DEFAULT_FACILITY_NAME",
+    "SITE_ID",
+    "SUBJECT_LOCATOR_MODEL",
+    "SUBJECT_VISIT_MODEL",
+)
+
+disable_env_var = "EDC_VISIT_SCHEDULE_REGISTRY_CACHE_DISABLED"
+
+
+class RegistryCacheError(Exception):
+    pass
+
+
+def get_registry_cache_path() -> Path | None:
+    """Returns the path of the registry cache file or None.
+
+    Set `settings.EDC_VISIT_SCHEDULE_REGISTRY_CACHE` to enable.
+    """
+    path = getattr(settings, "EDC_VISIT_SCHEDULE_REGISTRY_CACHE", None)
+    return Path(path) if path else None
+
+
+def registry_cache_enabled() -> bool:
+    return bool(get_registry_cache_path()) and not os.environ.get(disable_env_var)
+
+
+def get_fingerprint_settings() -> list[str]:
+    """Returns the names of the settings hashed into the registry
+    fingerprint.
+
+    Settings read by a project's visit schedule modules are not
+    detected. List them in
+    `settings.EDC_VISIT_SCHEDULE_REGISTRY_CACHE_SETTINGS` or the
+    cache is not invalidated when they change.
+    """
+    extra_settings = getattr(settings, "EDC_VISIT_SCHEDULE_REGISTRY_CACHE_SETTINGS", [])
+    return list(dict.fromkeys([*fingerprint_settings, *extra_settings]))
+
+
+def get_registry_fingerprint(apps: list[str], module_name: str) -> str:
+    """Returns a hash of the package versions, the apps that declare
+    a `module_name` module, and the settings used to build the
+    registry; see `get_fingerprint_settings`.
+
+    The source files the registry was built from are compared
+    separately; see `get_source_stats`.
+    """
+    try:
+        package_version = version("edc-visit-schedule")
+    except PackageNotFoundError:
+        package_version = None
+    fingerprint = hashlib.sha256()
+    fingerprint.update(
+        f"{cache_format_version}:{package_version}:{sys.version_info[:3]}".encode()
+    )
+    for app in apps:
+        try:
+            spec = find_spec(f"{app}.{module_name}")
+        except (ModuleNotFoundError, ValueError):
+            spec = None
+        fingerprint.update(f"{app}:{bool(spec)}".encode())
+    for name in get_fingerprint_settings():
+        fingerprint.update(f"{name}={getattr(settings, name, None)!r}".encode())
+    return fingerprint.hexdigest()
+
+
+def get_imported_source_files() -> list[str]:
+    """Returns the source files of all imported modules, except
+    those of the standard library.
+
+    Called once the registry is built so that modules imported by
+    the visit schedule modules, e.g. shared CRF, visit, lab panel
+    or consent declarations in any package, are included.
+    """
+    paths = set()
+    for name, module in list(sys.modules.items()):
+        if name.partition(".")[0] in sys.stdlib_module_names:
+            continue
+        path = getattr(module, "__file__", None)
+        if path and path.endswith(".py"):
+            paths.add(path)
+    return sorted(paths)
+
+
+def get_source_stats(paths: list[str]) -> list[tuple[str, int, int]] | None:
+    """Returns the (path, size, modification time) of each source
+    file, or None if a file no longer exists.
+    """
+    stats = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        stats.append((path, stat.st_size, stat.st_mtime_ns))
+    return stats
+
+
+def get_shared_objects() -> dict[tuple[str, ...], Any]:
+    """Returns a dict of {persistent id: object} of the objects
+    owned by other registries that schedules may refer to.
+
+    These are pickled by name and, when loaded, re-linked to the
+    instances registered in this process.
+    """
+    objs: dict[tuple[str, ...], Any] = {
+        ("consent_definition", name): cdef for name, cdef in site_consents.registry.items()
+    }
+    if django_apps.is_installed("edc_lab"):
+        from edc_lab.site_labs import site_labs
+
+        if site_labs.loaded:
+            for lab_profile in site_labs.lab_profiles.values():
+                for panel_name, panel in lab_profile.panels.items():
+                    objs.setdefault(("panel", lab_profile.name, panel_name), panel)
+    return objs
+
+
+class RegistryPickler(pickle.Pickler):
+    """Pickles objects owned by other registries by name so that,
+    when loaded, schedules refer to the registered instances.
+
+    See `get_shared_objects`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.persistent_ids = {id(obj): pid for pid, obj in get_shared_objects().items()}
+
+    def persistent_id(self, obj):
+        return self.persistent_ids.get(id(obj))
+
+
+class RegistryUnpickler(pickle.Unpickler):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.shared_objects = get_shared_objects()
+
+    def persistent_load(self, pid):
+        try:
+            return self.shared_objects[tuple(pid)]
+        except KeyError:
+            raise pickle.UnpicklingError(f"Object not registered. Got {pid}.")
+
+
+def save_registry(registry: dict[str, VisitSchedule], fingerprint: str, path: Path) -> None:
+    """Writes the registry, its fingerprint and the stats of the
+    source files of all imported modules to the cache file or
+    raises RegistryCacheError.
+
+    Writes to a temporary file first so that concurrently starting
+    workers never read a partly written cache.
+    """
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tmp_path.open("wb") as f:
+            pickler = RegistryPickler(f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickler.dump(fingerprint)
+            pickler.dump(get_source_stats(get_imported_source_files()))
+            pickler.dump(registry)
+        os.replace(tmp_path, path)
+    except (OSError, pickle.PicklingError, AttributeError, TypeError) as e:
+        tmp_path.unlink(missing_ok=True)
+        raise RegistryCacheError(f"Unable to write visit schedule cache {path}. Got {e}")
+
+
+def load_registry(fingerprint: str, path: Path) -> dict[str, VisitSchedule] | None:
+    """Returns the cached registry if the cache file exists, matches
+    the fingerprint and no source file changed since it was written,
+    otherwise returns None.
+
+    Raises RegistryCacheError if the cache file cannot be read.
+    """
+    try:
+        with path.open("rb") as f:
+            unpickler = RegistryUnpickler(f)
+            if unpickler.load() != fingerprint:  # nosec B301
+                return None
+            source_stats = unpickler.load()  # nosec B301
+            if not source_stats or get_source_stats([path for path, _, _ in source_stats]) != [
+                tuple(stat) for stat in source_stats
+            ]:
+                return None
+            return unpickler.load()  # nosec B301
+    except FileNotFoundError:
+        return None
+    except (
+        OSError,
+        EOFError,
+        ImportError,
+        AttributeError,
+        ValueError,
+        pickle.UnpicklingError,
+    ) as e:
+        raise RegistryCacheError(f"Unable to read visit schedule cache {path}. Got {e}")
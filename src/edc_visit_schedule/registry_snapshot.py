@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Mapping, NamedTuple
+
+from .exceptions import SiteVisitScheduleError
+
+if TYPE_CHECKING:
+    from decimal import Decimal
+
+    from .schedule import Schedule
+    from .visit import Visit
+    from .visit_schedule import VisitSchedule
+
+
+__all__ = [
+    "BaselineTimepoints",
+    "RegistrySnapshot",
+    "ScheduleSnapshot",
+    "compile_registry",
+    "compile_schedule",
+]
+
+
+class BaselineTimepoints(NamedTuple):
+    """The baseline timepoint and the set of all timepoints
+    of a schedule.
+    """
+
+    baseline_timepoint: Decimal
+    timepoints: frozenset[Decimal]
+
+
+@dataclass(frozen=True)
+class ScheduleSnapshot:
+    """An immutable, precomputed view of a registered schedule.
+
+    Mappings are read-only proxies and sequences are tuples, so an
+    instance may be shared across threads and forked workers.
+
+    Note: the `Visit` objects are shared with the registry, not copied.
+    """
+
+    visit_schedule_name: str
+    schedule_name: str
+    schedule: Schedule
+    visit_codes: tuple[str, ...]
+    timepoints: tuple[Decimal, ...]
+    visits_by_code: Mapping[str, Visit]
+    next_visit_codes: Mapping[str, str | None]
+    previous_visit_codes: Mapping[str, str | None]
+    baseline_visit_code: str | None
+    required_crf_visit_codes: Mapping[str, tuple[str, ...]]
+    required_requisition_visit_codes: Mapping[str, tuple[str, ...]]
+    visit_codes_by_panel: Mapping[str, tuple[str, ...]]
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}('{self.visit_schedule_name}.{self.schedule_name}')"
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return self.visit_schedule_name, self.schedule_name
+
+    @property
+    def baseline_visit(self) -> Visit | None:
+        return self.visits_by_code.get(self.baseline_visit_code)
+
+    def get_visit(self, visit_code: str) -> Visit | None:
+        return self.visits_by_code.get(visit_code)
+
+    def next_visit(self, visit_code: str) -> Visit | None:
+        return self.visits_by_code.get(self.next_visit_codes.get(visit_code))
+
+    def previous_visit(self, visit_code: str) -> Visit | None:
+        return self.visits_by_code.get(self.previous_visit_codes.get(visit_code))
+
+
+@dataclass(frozen=True)
+class RegistrySnapshot:
+    """An immutable, precomputed view of the registered visit
+    schedules.
+
+    Built by `SiteVisitSchedules.freeze`.
+    """
+
+    schedules: Mapping[tuple[str, str], ScheduleSnapshot]
+    schedule_keys_by_model: Mapping[str, tuple[tuple[str, str], ...]]
+    visits_by_panel: Mapping[str, tuple[tuple[str, str, str], ...]]
+    baseline_timepoints: Mapping[tuple[str, str], BaselineTimepoints]
+
+    def get_schedule(self, visit_schedule_name: str, schedule_name: str) -> ScheduleSnapshot:
+        """Returns a ScheduleSnapshot or raises."""
+        try:
+            return self.schedules[(visit_schedule_name, schedule_name)]
+        except KeyError:
+            raise SiteVisitScheduleError(
+                "Schedule not found in registry snapshot. "
+                f"Got {visit_schedule_name}.{schedule_name}."
+            )
+
+    def get_schedules_for_model(self, model: str) -> tuple[ScheduleSnapshot, ...]:
+        """Returns the schedules that refer to this model, in
+        label_lower format, as an onschedule, offschedule, CRF or
+        requisition model.
+        """
+        return tuple(self.schedules[key] for key in self.schedule_keys_by_model.get(model, ()))
+
+    def get_visits_for_panel(self, panel_name: str) -> tuple[tuple[str, str, str], ...]:
+        """Returns a tuple of (visit_schedule_name, schedule_name, visit_code)
+        for each visit that schedules a requisition for this panel.
+        """
+        return self.visits_by_panel.get(panel_name, ())
+
+    def get_baseline_timepoints(
+        self, visit_schedule_name: str, schedule_name: str
+    ) -> BaselineTimepoints | None:
+        """Returns the BaselineTimepoints of a schedule or None if
+        the schedule is not registered or has no visits.
+        """
+        return self.baseline_timepoints.get((visit_schedule_name, schedule_name))
+
+
+def _freeze_mapping(data: dict[str, list]) -> Mapping[str, tuple]:
+    return MappingProxyType({k: tuple(v) for k, v in data.items()})
+
+
+def compile_schedule(visit_schedule_name: str, schedule: Schedule) -> ScheduleSnapshot:
+    """Returns a ScheduleSnapshot for a schedule."""
+    visits = list(schedule.visits.values())
+    visit_codes = tuple(visit.code for visit in visits)
+    required_crf_visit_codes: dict[str, list[str]] = {}
+    required_requisition_visit_codes: dict[str, list[str]] = {}
+    visit_codes_by_panel: dict[str, list[str]] = {}
+    for visit in visits:
+        for crf in visit.crfs:
+            if crf.required:
+                required_crf_visit_codes.setdefault(crf.model, []).append(visit.code)
+        for requisition in visit.requisitions:
+            if requisition.required:
+                required_requisition_visit_codes.setdefault(requisition.panel.name, []).append(
+                    visit.code
+                )
+        for requisition in visit.all_requisitions:
+            visit_codes_by_panel.setdefault(requisition.panel.name, []).append(visit.code)
+    return ScheduleSnapshot(
+        visit_schedule_name=visit_schedule_name,
+        schedule_name=schedule.name,
+        schedule=schedule,
+        visit_codes=visit_codes,
+        timepoints=tuple(visit.timepoint for visit in visits),
+        visits_by_code=MappingProxyType({visit.code: visit for visit in visits}),
+        next_visit_codes=MappingProxyType(dict(zip(visit_codes, visit_codes[1:] + (None,)))),
+        previous_visit_codes=MappingProxyType(
+            dict(zip(visit_codes, (None,) + visit_codes[:-1]))
+        ),
+        baseline_visit_code=visit_codes[0] if visit_codes else None,
+        required_crf_visit_codes=_freeze_mapping(required_crf_visit_codes),
+        required_requisition_visit_codes=_freeze_mapping(required_requisition_visit_codes),
+        visit_codes_by_panel=_freeze_mapping(visit_codes_by_panel),
+    )
+
+
+def compile_registry(registry: dict[str, VisitSchedule]) -> RegistrySnapshot:
+    """Returns a RegistrySnapshot for a registry of visit schedules."""
+    schedules: dict[tuple[str, str], ScheduleSnapshot] = {}
+    schedule_keys_by_model: dict[str, list[tuple[str, str]]] = {}
+    visits_by_panel: dict[str, list[tuple[str, str, str]]] = {}
+    baseline_timepoints: dict[tuple[str, str], BaselineTimepoints] = {}
+    for visit_schedule in registry.values():
+        for schedule in visit_schedule.schedules.values():
+            snapshot = compile_schedule(visit_schedule.name, schedule)
+            schedules[snapshot.key] = snapshot
+            models = [schedule.onschedule_model, schedule.offschedule_model]
+            for visit in snapshot.visits_by_code.values():
+                models.extend(crf.model for crf in visit.all_crfs)
+                models.extend(requisition.model for requisition in visit.all_requisitions)
+            for model in dict.fromkeys(models):
+                schedule_keys_by_model.setdefault(model, []).append(snapshot.key)
+            for panel_name, visit_codes in snapshot.visit_codes_by_panel.items():
+                visits_by_panel.setdefault(panel_name, []).extend(
+                    (*snapshot.key, visit_code) for visit_code in visit_codes
+                )
+            if snapshot.timepoints:
+                baseline_timepoints[snapshot.key] = BaselineTimepoints(
+                    snapshot.timepoints[0], frozenset(snapshot.timepoints)
+                )
+    return RegistrySnapshot(
+        schedules=MappingProxyType(schedules),
+        schedule_keys_by_model=_freeze_mapping(schedule_keys_by_model),
+        visits_by_panel=_freeze_mapping(visits_by_panel),
+        baseline_timepoints=MappingProxyType(baseline_timepoints),
+    )
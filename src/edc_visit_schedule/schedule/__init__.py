@@ -1,2 +1,2 @@
 from .schedule import AlreadyRegisteredVisit, Schedule
-from .visit_collection import VisitCollection
+from .visit_collection import SubjectVisitCollection, VisitCollection
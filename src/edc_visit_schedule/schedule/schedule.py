@@ -1,10 +1,9 @@
 from __future__ import annotations
 
 import re
-from copy import deepcopy
 from datetime import datetime
 from decimal import Decimal
-from typing import TYPE_CHECKING, Type
+from typing import TYPE_CHECKING, Iterable, Mapping, Type
 
 from django.apps import apps as django_apps
 from edc_consent.consent_definition import ConsentDefinition
@@ -16,12 +15,20 @@ from edc_sites import site_sites
 from edc_sites.single_site import SingleSite
 from edc_utils import formatted_date
 
-from ..exceptions import NotOnScheduleError, NotOnScheduleForDateError
+from ..bulk_subject_schedule import BulkScheduleResult, BulkSubjectSchedule
+from ..exceptions import (
+    NotOnScheduleError,
+    NotOnScheduleForDateError,
+    RegistryNotLoaded,
+)
+from ..onschedule_evaluator import OnScheduleEvaluator
+from ..registry_snapshot import ScheduleSnapshot, compile_schedule
 from ..site_visit_schedules import site_visit_schedules
 from ..subject_schedule import SubjectSchedule
 from ..visit import Visit
-from .visit_collection import VisitCollection
+from .visit_collection import SubjectVisitCollection, VisitCollection
 from .window import Window
+from .window_table import VisitWindow, compile_window_table
 
 if TYPE_CHECKING:
     from edc_appointment.models import Appointment
@@ -63,7 +70,9 @@ class Schedule:
     name_regex = r"[a-z0-9\_\-]+$"
     visit_cls = Visit
     visit_collection_cls: Type[VisitCollection] = VisitCollection
+    subject_visit_collection_cls: Type[SubjectVisitCollection] = SubjectVisitCollection
     window_cls = Window
+    unique_visit_attrs = ("code", "title", "timepoint", "rbase")
 
     def __init__(
         self,
@@ -95,6 +104,11 @@ class Schedule:
         elif isinstance(base_timepoint, (int,)):
             base_timepoint = Decimal(str(base_timepoint) + ".0")
         self._visits = self.visit_collection_cls()
+        self._window_table: Mapping[str, VisitWindow] | None = None
+        self._snapshot: ScheduleSnapshot | None = None
+        self._unique_visit_values: dict[str, set] = {
+            attr: set() for attr in self.unique_visit_attrs
+        }
         self.base_timepoint = base_timepoint or Decimal("0.0")
         self.verbose_name = verbose_name or name
         self.sequence = sequence or name
@@ -112,6 +126,12 @@ class Schedule:
     def __repr__(self):
         return f"Schedule({self.name})"
 
+    def __getstate__(self):
+        # compiled tables are read-only mappings; rebuilt on first access
+        state = self.__dict__.copy()
+        state.update(_window_table=None, _snapshot=None)
+        return state
+
     def __str__(self):
         return self.name
 
@@ -148,10 +168,14 @@ class Schedule:
         subject_identifier: str = None,
         report_datetime: datetime = None,
         site_id: int = None,
-    ) -> VisitCollection:
-        """Returns a deep copy of visits collection filtered for a
+    ) -> SubjectVisitCollection:
+        """Returns a view of the visits collection filtered for a
         given consented subject.
 
+        The view shares the schedule's visits and only records
+        the visit codes excluded for this subject. See
+        SubjectVisitCollection.
+
         If not consented, returns an empty visit collection.
 
         Check if the consent definition `extended_by` attribute is
@@ -159,12 +183,12 @@ class Schedule:
         consent definition's `timepoints` are EXCLUDED if the subject
         has NOT completed the consent definition extension model.
         """
-        visits = self.visit_collection_cls()
+        visits = self.subject_visit_collection_cls(self.visit_collection_cls())
         cdef = self.get_consent_definition(
             report_datetime=report_datetime, site=site_sites.get(site_id)
         )
         if cdef.get_consent_for(subject_identifier=subject_identifier, site_id=site_id):
-            visits = deepcopy(self.visits)
+            visits = self.subject_visit_collection_cls(self.visits)
             if cdef.extended_by:
                 visits = cdef.extended_by.update_visit_collection(
                     visits,
@@ -186,8 +210,9 @@ class Schedule:
                 f"See {visit}. Got visit.timepoint={visit.timepoint}."
             )
 
-        for attr in ["code", "title", "timepoint", "rbase"]:
-            if getattr(visit, attr) in [getattr(v, attr) for v in self.visits.values()]:
+        unique_visit_values = self.get_unique_visit_values()
+        for attr in self.unique_visit_attrs:
+            if getattr(visit, attr) in unique_visit_values[attr]:
                 raise AlreadyRegisteredVisit(
                     f"Visit already registered. Got visit={visit} "
                     f"(offending attr='{attr}'). "
@@ -201,21 +226,57 @@ class Schedule:
             )
         visit.base_timepoint = self.base_timepoint
         self.visits.update({visit.code: visit})
+        self._window_table = None
+        self._snapshot = None
+        for attr in self.unique_visit_attrs:
+            unique_visit_values[attr].add(getattr(visit, attr))
+        site_visit_schedules.discard_snapshot()
         return visit
 
+    def get_unique_visit_values(self) -> dict[str, set]:
+        """Returns a dictionary of {attr: set of values} of the
+        visits in this schedule for each attr in `unique_visit_attrs`.
+
+        Rebuilt if the visit collection was changed other than
+        through `add_visit`.
+        """
+        if len(self._unique_visit_values.get("code", ())) != len(self.visits):
+            self._unique_visit_values = {
+                attr: {getattr(v, attr) for v in self.visits.values()}
+                for attr in self.unique_visit_attrs
+            }
+        return self._unique_visit_values
+
     @property
     def field_value(self) -> str:
         return self.name
 
+    @property
+    def snapshot(self) -> ScheduleSnapshot:
+        """Returns the compiled snapshot of this schedule.
+
+        Read from the registry snapshot if this schedule is
+        registered, otherwise compiled from this schedule once and
+        kept until a visit is added.
+        """
+        try:
+            snapshots = site_visit_schedules.snapshot.get_schedules_for_model(
+                self.onschedule_model
+            )
+        except RegistryNotLoaded:
+            snapshots = ()
+        for snapshot in snapshots:
+            if snapshot.schedule is self:
+                return snapshot
+        if self._snapshot is None:
+            self._snapshot = compile_schedule(None, self)
+        return self._snapshot
+
     def crf_required_at(self, label_lower: str) -> list[str]:
         """Returns a list of visit codes where the CRF is required
         by default.
         """
-        visit_codes = []
-        for visit_code, visit in self.visits.items():
-            if label_lower in [form.model for form in visit.crfs if form.required]:
-                visit_codes.append(visit_code)
-        return visit_codes
+        return list(self.snapshot.required_crf_visit_codes.get(label_lower, ()))
 
     def requisition_required_at(self, requisition_panel) -> list[str]:
         """Returns a list of visit codes where the requisition is
@@ -223,13 +284,9 @@ class Schedule:
 
         A requisition is found by its panel.
         """
-        visit_codes = []
-        for visit_code, visit in self.visits.items():
-            if requisition_panel in [
-                form.panel for form in visit.requisitions if form.required
-            ]:
-                visit_codes.append(visit_code)
-        return visit_codes
+        return list(
+            self.snapshot.required_requisition_visit_codes.get(requisition_panel.name, ())
+        )
 
     def subject(self, subject_identifier: str) -> SubjectSchedule:
         """Returns a SubjectSchedule instance for this subject.
@@ -269,6 +326,31 @@ class Schedule:
             skip_get_current_site=skip_get_current_site,
         )
 
+    def bulk(self, batch_size: int | None = None) -> BulkSubjectSchedule:
+        """Returns a BulkSubjectSchedule instance for this schedule."""
+        visit_schedule, _ = site_visit_schedules.get_by_onschedule_model(self.onschedule_model)
+        return BulkSubjectSchedule(
+            visit_schedule=visit_schedule, schedule=self, batch_size=batch_size
+        )
+
+    def put_on_schedule_bulk(
+        self,
+        items: Iterable[tuple[str, datetime | None]],
+        skip_baseline: bool | None = None,
+        skip_get_current_site: bool | None = None,
+        batch_size: int | None = None,
+    ) -> BulkScheduleResult:
+        """Puts many subjects onto this schedule given a sequence of
+        (subject_identifier, onschedule_datetime).
+
+        Wrapper of method BulkSubjectSchedule.put_on_schedule.
+        """
+        return self.bulk(batch_size=batch_size).put_on_schedule(
+            items,
+            skip_baseline=skip_baseline,
+            skip_get_current_site=skip_get_current_site,
+        )
+
     def refresh_schedule(self, subject_identifier: str) -> None:
         self.subject(subject_identifier).refresh_appointments()
 
@@ -278,6 +360,18 @@ class Schedule:
         """Wrapper of method SubjectSchedule.take_off_schedule."""
         self.subject(subject_identifier).take_off_schedule(offschedule_datetime)
 
+    def take_off_schedule_bulk(
+        self,
+        items: Iterable[tuple[str, datetime | None]],
+        batch_size: int | None = None,
+    ) -> BulkScheduleResult:
+        """Takes many subjects off this schedule given a sequence of
+        (subject_identifier, offschedule_datetime).
+
+        Wrapper of method BulkSubjectSchedule.take_off_schedule.
+        """
+        return self.bulk(batch_size=batch_size).take_off_schedule(items)
+
     def is_onschedule(self, subject_identifier: str, report_datetime: datetime) -> bool:
         try:
             self.subject(subject_identifier).onschedule_or_raise(
@@ -287,8 +381,38 @@ class Schedule:
             return False
         return True
 
+    def onschedule_evaluator(
+        self,
+        subject_identifiers: Iterable[str] | None = None,
+        compare_as_datetimes: bool | None = None,
+    ) -> OnScheduleEvaluator:
+        """Returns an OnScheduleEvaluator for many
+        (subject_identifier, report_datetime) pairs.
+
+        See also `is_onschedule`.
+        """
+        return OnScheduleEvaluator(
+            self,
+            subject_identifiers=subject_identifiers,
+            compare_as_datetimes=compare_as_datetimes,
+        )
+
+    @property
+    def window_table(self) -> Mapping[str, VisitWindow]:
+        """Returns a read-only mapping of {visit_code: VisitWindow}
+        for the visits in this schedule.
+
+        Rebuilt if the visit collection was changed other than
+        through `add_visit`.
+        """
+        if self._window_table is None or len(self._window_table) != len(self.visits):
+            self._window_table = compile_window_table(self.visits)
+        return self._window_table
+
     def datetime_in_window(self, **kwargs):
-        return self.window_cls(name=self.name, visits=self.visits, **kwargs).datetime_in_window
+        return self.window_cls(
+            name=self.name, visits=self.visits, window_table=self.window_table, **kwargs
+        ).datetime_in_window
 
     @property
     def onschedule_model_cls(self) -> Type[OnSchedule]:
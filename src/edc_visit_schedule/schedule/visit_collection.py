@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+from collections.abc import Mapping
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterator
+
+from edc_utils import to_utc
 
 from ..ordered_collection import OrderedCollection
 
@@ -29,32 +32,10 @@ class VisitCollection(OrderedCollection):
     def timepoint_dates(self, dt: datetime) -> dict:
         """Returns an ordered dictionary of visit dates calculated
         relative to the first visit.
+
+        Does not set `timepoint_datetime` on the visits.
         """
-        timepoint_dates = {}
-        for visit in self.values():
-            try:
-                timepoint_datetime = dt + visit.rbase
-            except TypeError as e:
-                raise VisitCollectionError(
-                    f"Invalid visit.rbase. visit.rbase={visit.rbase}. "
-                    f"See {repr(visit)}. Got {e}."
-                )
-            else:
-                visit.timepoint_datetime = timepoint_datetime
-            timepoint_dates.update({visit: visit.timepoint_datetime})
-
-        last_dte = None
-        for dte in timepoint_dates.values():
-            if not last_dte:
-                last_dte = dte
-                continue
-            if dte and last_dte and not dte > last_dte:
-                raise VisitCollectionError(
-                    "Wait! timepoint datetimes are not in sequence. "
-                    f"Check visit.rbase in your visit collection. See {self}."
-                )
-
-        return timepoint_dates
+        return get_timepoint_dates(self.values(), dt, self)
 
     @property
     def timepoints(self) -> dict:
@@ -62,3 +43,120 @@ class VisitCollection(OrderedCollection):
         for visit in self.values():
             timepoints.update({visit: visit.timepoint})
         return timepoints
+
+
+class SubjectVisitCollection(Mapping):
+    """A read-only view of a schedule's VisitCollection for a
+    subject.
+
+    Visits are shared with the schedule, not copied. Removing a
+    visit with `del` only records the visit code as excluded for
+    this view.
+    """
+
+    def __init__(self, visits: VisitCollection):
+        self._visits = visits
+        self._excluded: set[str] = set()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({list(self)})"
+
+    def __getitem__(self, visit_code: str) -> Visit:
+        if visit_code in self._excluded:
+            raise KeyError(visit_code)
+        return self._visits[visit_code]
+
+    def __delitem__(self, visit_code: str) -> None:
+        if visit_code not in self:
+            raise KeyError(visit_code)
+        self._excluded.add(visit_code)
+
+    def __iter__(self) -> Iterator[str]:
+        if not self._excluded:
+            return iter(self._visits)
+        return (code for code in self._visits if code not in self._excluded)
+
+    def __len__(self) -> int:
+        return len(self._visits) - len(self._excluded)
+
+    def __contains__(self, visit_code) -> bool:
+        return visit_code in self._visits and visit_code not in self._excluded
+
+    def get(self, visit_code: str) -> Visit:
+        """Return a visit for the given visit_code or raise"""
+        try:
+            return self[visit_code]
+        except KeyError:
+            raise VisitCollectionError(
+                f"Unknown visit. Check the visit schedule. Got visit_code={visit_code}"
+            )
+
+    @property
+    def excluded(self) -> frozenset[str]:
+        """Returns the visit codes excluded for this subject."""
+        return frozenset(self._excluded)
+
+    @property
+    def first(self) -> Visit:
+        """Returns the first visit."""
+        return self[next(iter(self))]
+
+    @property
+    def last(self) -> Visit:
+        """Returns the last visit."""
+        return self[next(code for code in reversed(self._visits) if code in self)]
+
+    def next(self, visit_code: str) -> Visit | None:
+        """Returns the next visit or None."""
+        visit = self._visits.next(visit_code)
+        while visit is not None and visit.code in self._excluded:
+            visit = self._visits.next(visit.code)
+        return visit
+
+    def previous(self, visit_code: str) -> Visit | None:
+        """Returns the previous visit or None."""
+        visit = self._visits.previous(visit_code)
+        while visit is not None and visit.code in self._excluded:
+            visit = self._visits.previous(visit.code)
+        return visit
+
+    def timepoint_dates(self, dt: datetime) -> dict:
+        """Returns an ordered dictionary of visit dates calculated
+        relative to the first visit.
+        """
+        return get_timepoint_dates(self.values(), dt, self)
+
+    @property
+    def timepoints(self) -> dict:
+        return {visit: visit.timepoint for visit in self.values()}
+
+
+def get_timepoint_dates(visits, dt: datetime, collection=None) -> dict[Visit, datetime]:
+    """Returns an ordered dictionary of {visit: timepoint_datetime}
+    for `visits` calculated relative to `dt`, or raises.
+
+    Does not change the visits.
+    """
+    timepoint_dates = {}
+    for visit in visits:
+        try:
+            timepoint_datetime = dt + visit.rbase
+        except TypeError as e:
+            raise VisitCollectionError(
+                f"Invalid visit.rbase. visit.rbase={visit.rbase}. "
+                f"See {repr(visit)}. Got {e}."
+            )
+        timepoint_dates.update({visit: to_utc(timepoint_datetime)})
+
+    last_dte = None
+    for dte in timepoint_dates.values():
+        if not last_dte:
+            last_dte = dte
+            continue
+        if dte and last_dte and not dte > last_dte:
+            raise VisitCollectionError(
+                "Wait! timepoint datetimes are not in sequence. "
+                f"Check visit.rbase in your visit collection. See {collection or visits}."
+            )
+
+    return timepoint_dates
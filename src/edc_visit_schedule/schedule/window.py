@@ -9,7 +9,7 @@ from ..exceptions import (
     ScheduleError,
     UnScheduledVisitWindowError,
 )
-from .visit_collection import VisitCollectionError
+from .window_table import VisitWindow, compile_window_table
 
 enforce_window_period_enabled = getattr(
     settings, "EDC_VISIT_SCHEDULE_ENFORCE_WINDOW_PERIOD", True
@@ -17,6 +17,13 @@ enforce_window_period_enabled = getattr(
 
 
 class Window:
+    """Validates a datetime against the window period of a visit.
+
+    Bounds are calculated from the schedule's window table (see
+    `Schedule.window_table`). If not given, the table is compiled
+    from `visits`.
+    """
+
     def __init__(
         self,
         name=None,
@@ -26,9 +33,13 @@ class Window:
         visit_code=None,
         visit_code_sequence=None,
         baseline_timepoint_datetime=None,
+        window_table=None,
     ):
         self.name = name
         self.visits = visits
+        self.window_table = (
+            compile_window_table(visits) if window_table is None else window_table
+        )
         self.timepoint_datetime = to_utc(timepoint_datetime)
         self.dt = to_utc(dt)
         self.visit_code = visit_code
@@ -40,11 +51,7 @@ class Window:
         if enforce_window_period_enabled:
             if not self.dt:
                 raise UnScheduledVisitWindowError("Invalid datetime")
-            try:
-                self.visits.get(self.visit_code)
-            except VisitCollectionError as e:
-                raise ScheduleError(e)
-            if self.is_scheduled_visit or not self.visits.next(self.visit_code):
+            if self.is_scheduled_visit or not self.visit_window.next_code:
                 self.raise_for_scheduled_not_in_window()
             else:
                 self.raise_for_unscheduled_not_in_window()
@@ -54,16 +61,17 @@ class Window:
     def is_scheduled_visit(self):
         return self.visit_code_sequence == 0 or self.visit_code_sequence is None
 
+    @property
+    def visit_window(self) -> VisitWindow:
+        try:
+            return self.window_table[self.visit_code]
+        except KeyError:
+            raise ScheduleError(
+                "Unknown visit. Check the visit schedule. " f"Got visit_code={self.visit_code}"
+            )
+
     def get_window_gap_days(self) -> int:
-        days = 0
-        visit = self.visits.get(self.visit_code)
-        next_visit = self.visits.next(self.visit_code)
-        if visit.add_window_gap_to_lower and next_visit:
-            days = abs(
-                (self.timepoint_datetime + visit.rupper)
-                - (self.timepoint_datetime - next_visit.rlower)
-            ).days
-        return days
+        return self.visit_window.get_window_gap_days(self.timepoint_datetime)
 
     def raise_for_scheduled_not_in_window(self):
         """Returns the datetime if it falls within the
@@ -73,16 +81,16 @@ class Window:
         In this case, `visit` is the object from schedule and
         not a model instance.
         """
-        visit = self.visits.get(self.visit_code)
-        visit.timepoint_datetime = self.timepoint_datetime
-        gap_days = self.get_window_gap_days()
-        lower = floor_secs(to_utc(visit.dates.lower) - relativedelta(days=gap_days))
-        upper = floor_secs(to_utc(visit.dates.upper))
+        visit_window = self.visit_window
+        dates_lower, dates_upper = visit_window.get_window(self.timepoint_datetime)
+        gap_days = visit_window.get_window_gap_days(self.timepoint_datetime)
+        lower = floor_secs(to_utc(dates_lower) - relativedelta(days=gap_days))
+        upper = floor_secs(to_utc(dates_upper))
         if not (lower <= floor_secs(to_utc(self.dt)) <= upper):
-            lower_date = to_local(visit.dates.lower).strftime(
+            lower_date = to_local(dates_lower).strftime(
                 convert_php_dateformat(settings.SHORT_DATETIME_FORMAT)
             )
-            upper_date = to_local(visit.dates.upper).strftime(
+            upper_date = to_local(dates_upper).strftime(
                 convert_php_dateformat(settings.SHORT_DATETIME_FORMAT)
             )
             dt = to_local(self.dt).strftime(
@@ -108,15 +116,10 @@ class Window:
         In this case, `visit` is the object from schedule and
         not a model instance.
         """
-        next_visit = self.visits.next(self.visit_code)
-        next_timepoint_datetime = self.visits.timepoint_dates(
-            dt=self.baseline_timepoint_datetime
-        ).get(next_visit)
-        if not (
-            floor_secs(to_utc(self.dt))
-            < floor_secs(to_utc(next_timepoint_datetime - next_visit.rlower))
-        ):
-            dt_lower = formatted_date(next_timepoint_datetime - next_visit.rlower)
+        visit_window = self.visit_window
+        next_lower = visit_window.get_next_lower(self.baseline_timepoint_datetime)
+        if not (floor_secs(to_utc(self.dt)) < floor_secs(to_utc(next_lower))):
+            dt_lower = formatted_date(next_lower)
             dt = formatted_date(self.dt)
             raise UnScheduledVisitWindowError(
                 _(
@@ -128,7 +131,7 @@ class Window:
                     "Got `%(visit_code)s`@`%(dt)s`. "
                 )
                 % dict(
-                    next_visit_code=next_visit.code,
+                    next_visit_code=visit_window.next_code,
                     dt_lower=dt_lower,
                     visit_code=self.visit_code,
                     dt=dt,
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Mapping
+
+from edc_utils import to_utc
+
+from .visit_collection import VisitCollectionError
+
+if TYPE_CHECKING:
+    from dateutil.relativedelta import relativedelta
+
+    from ..visit import Visit, WindowBounds, WindowPeriod
+
+
+__all__ = ["VisitWindow", "compile_window_table"]
+
+
+@dataclass(frozen=True, slots=True)
+class VisitWindow:
+    """The relative window offsets of a visit in a schedule.
+
+    Bounds are calculated from a given timepoint datetime without
+    setting `timepoint_datetime` on the shared `Visit` object.
+    """
+
+    code: str
+    rbase: relativedelta
+    rlower: relativedelta
+    rupper: relativedelta
+    rlower_late: relativedelta
+    rupper_late: relativedelta
+    window_period: WindowPeriod
+    late_window_period: WindowPeriod
+    add_window_gap_to_lower: bool
+    next_code: str | None
+    next_rbase: relativedelta | None
+    next_rlower: relativedelta | None
+
+    def get_window(self, timepoint_datetime: datetime) -> WindowBounds:
+        """Returns the lower and upper datetimes in UTC, as
+        `visit.dates.lower` and `visit.dates.upper`.
+        """
+        return self.window_period.get_window(dt=to_utc(timepoint_datetime))
+
+    def get_late_window(self, timepoint_datetime: datetime) -> WindowBounds:
+        """Returns the late lower and upper datetimes in UTC, as
+        `visit.late_dates.lower` and `visit.late_dates.upper`.
+        """
+        return self.late_window_period.get_window(dt=to_utc(timepoint_datetime))
+
+    def get_window_gap_days(self, timepoint_datetime: datetime) -> int:
+        """Returns the days between the upper bound of this visit
+        and the lower bound of the next, if the gap is added to
+        the lower bound of this visit, otherwise 0.
+        """
+        if self.add_window_gap_to_lower and self.next_code:
+            return abs(
+                (timepoint_datetime + self.rupper) - (timepoint_datetime - self.next_rlower)
+            ).days
+        return 0
+
+    def get_next_lower(self, baseline_timepoint_datetime: datetime) -> datetime:
+        """Returns the lower bound of the next visit relative to
+        the baseline timepoint datetime.
+        """
+        try:
+            next_timepoint_datetime = to_utc(baseline_timepoint_datetime + self.next_rbase)
+        except TypeError as e:
+            raise VisitCollectionError(
+                f"Invalid visit.rbase. visit.rbase={self.next_rbase}. "
+                f"See visit {self.next_code}. Got {e}."
+            )
+        return next_timepoint_datetime - self.next_rlower
+
+
+def compile_window_table(visits: Mapping[str, Visit]) -> Mapping[str, VisitWindow]:
+    """Returns a read-only mapping of {visit_code: VisitWindow}
+    for an ordered collection of visits.
+    """
+    ordered_visits = list(visits.values())
+    next_visits = ordered_visits[1:] + [None]
+    return MappingProxyType(
+        {
+            visit.code: VisitWindow(
+                code=visit.code,
+                rbase=visit.rbase,
+                rlower=visit.rlower,
+                rupper=visit.rupper,
+                rlower_late=visit.rlower_late,
+                rupper_late=visit.rupper_late,
+                window_period=visit.dates.window_period,
+                late_window_period=visit.late_dates.window_period,
+                add_window_gap_to_lower=visit.add_window_gap_to_lower,
+                next_code=getattr(next_visit, "code", None),
+                next_rbase=getattr(next_visit, "rbase", None),
+                next_rlower=getattr(next_visit, "rlower", None),
+            )
+            for visit, next_visit in zip(ordered_visits, next_visits)
+        }
+    )
@@ -1,18 +1,24 @@
 from __future__ import annotations
 
 import copy
+import hashlib
+import json
 import sys
-from typing import TYPE_CHECKING, Tuple
+import time
+from typing import TYPE_CHECKING, Iterator, NamedTuple, Tuple
 
 from django.apps import apps as django_apps
-from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
 from django.utils.module_loading import import_module, module_has_submodule
+from edc_utils import get_utcnow
 
+from .bulk_utils import bulk_create, bulk_update
 from .exceptions import (
     AlreadyRegisteredVisitSchedule,
     RegistryNotLoaded,
     SiteVisitScheduleError,
 )
+from .registry_snapshot import RegistrySnapshot, compile_registry
 
 if TYPE_CHECKING:
     from edc_sites.single_site import SingleSite
@@ -22,7 +28,24 @@ if TYPE_CHECKING:
     from .visit_schedule import VisitSchedule
 
 
-__all__ = ["site_visit_schedules"]
+__all__ = ["ToModelResult", "site_visit_schedules"]
+
+BULK_BATCH_SIZE = 500
+
+# Schedule attrs indexed by `get_by_model`. Values are in "label_lower" format.
+indexed_model_attrs: tuple[str, ...] = (
+    "onschedule_model",
+    "offschedule_model",
+    "loss_to_followup_model",
+)
+
+
+class ToModelResult(NamedTuple):
+    """The number of VisitSchedule model rows written by `to_model`."""
+
+    created: int
+    updated: int
+    deactivated: int
 
 
 class SiteVisitSchedules:
@@ -34,6 +57,12 @@ class SiteVisitSchedules:
     def __init__(self):
         self._registry: dict = {}
         self._all_post_consent_models: dict[str, str] | None = None
+        self._model_index: dict[str, dict[str, list[tuple[VisitSchedule, Schedule]]]] = {}
+        self._model_index_registry: dict | None = None
+        self._snapshot: RegistrySnapshot | None = None
+        self._snapshot_registry: dict | None = None
+        self._cached_visit_schedules: dict[str, VisitSchedule] = {}
+        self.autodiscover_timing: dict | None = None
         self.loaded: bool = False
 
     @property
@@ -52,19 +81,70 @@ class SiteVisitSchedules:
                 f"Visit schedule {visit_schedule} has no schedules. "
                 f"Add one before registering."
             )
-        if visit_schedule.name not in self.registry:
+        cached = self._cached_visit_schedules.pop(visit_schedule.name, None)
+        if cached and cached is self.registry.get(visit_schedule.name):
+            # the module was imported after the registry was loaded
+            # from the cache, replace the cached copy
+            self.registry.update({visit_schedule.name: visit_schedule})
+            self.discard_model_index()
+        elif visit_schedule.name not in self.registry:
             self.registry.update({visit_schedule.name: visit_schedule})
         else:
             raise AlreadyRegisteredVisitSchedule(
                 f"Visit Schedule {visit_schedule} is already registered."
             )
         self._all_post_consent_models = None
+        self._snapshot = None
+        self._update_model_index(visit_schedule)
         self.get_offstudy_model()
 
+    def is_registered(self, visit_schedule: VisitSchedule) -> bool:
+        """Returns True if this visit schedule instance, not just
+        its name, is in the registry.
+        """
+        return self._registry.get(visit_schedule.name) is visit_schedule
+
     @property
     def visit_schedules(self) -> dict[str, VisitSchedule]:
         return self.registry
 
+    def freeze(self) -> RegistrySnapshot:
+        """Compiles the registry into an immutable snapshot of
+        precomputed lookup tables and returns it.
+
+        Called once `autodiscover` has finished. Registering another
+        visit schedule discards the snapshot; it is compiled again on
+        next access to `snapshot`.
+        """
+        self._snapshot = compile_registry(self.registry)
+        self._snapshot_registry = self._registry
+        return self._snapshot
+
+    def discard_snapshot(self) -> None:
+        """Discards the compiled snapshot, if any.
+
+        Called when a registered schedule is changed in place.
+        """
+        self._snapshot = None
+
+    def discard_model_index(self) -> None:
+        """Discards the reverse model index; it is rebuilt on next
+        lookup by `get_by_model`.
+
+        Called when a schedule is added to a registered visit
+        schedule.
+        """
+        self._model_index_registry = None
+
+    @property
+    def snapshot(self) -> RegistrySnapshot:
+        """Returns the compiled registry snapshot, compiling it first
+        if the registry changed since the last `freeze`.
+        """
+        if self._snapshot is None or self._snapshot_registry is not self.registry:
+            self.freeze()
+        return self._snapshot
+
     def get_visit_schedule(self, visit_schedule_name=None) -> VisitSchedule:
         """Returns a visit schedule instance or raises."""
         try:
@@ -127,6 +207,38 @@ class SiteVisitSchedules:
     def get_by_model(
         self, attr: str = None, model: str = None
     ) -> Tuple[VisitSchedule, Schedule]:
+        """Returns a tuple of (visit_schedule, schedule) for the
+        given schedule attr and model.
+
+        Lookups on the attrs in `indexed_model_attrs` are answered
+        from the reverse index built by `register`.
+        """
+        if attr not in indexed_model_attrs:
+            return self._get_by_model_from_registry(attr=attr, model=model)
+        registry = self.registry
+        if self._model_index_registry is not registry:
+            self._rebuild_model_index()
+        ret = self._model_index[attr].get(model) or []
+        if not ret:
+            raise SiteVisitScheduleError(
+                f"Schedule not found. No schedule exists for {attr}={model}."
+            )
+        elif len(ret) > 1:
+            raise SiteVisitScheduleError(
+                f"Schedule is ambiguous. More than one schedule exists for "
+                f"{attr}={model}. Got {[list(item) for item in ret]}"
+            )
+        visit_schedule, schedule = ret[0]
+        return visit_schedule, schedule
+
+    def _get_by_model_from_registry(
+        self, attr: str = None, model: str = None
+    ) -> Tuple[VisitSchedule, Schedule]:
+        """Returns a tuple of (visit_schedule, schedule) by scanning
+        every schedule in the registry.
+
+        Used for schedule attrs not in `indexed_model_attrs`.
+        """
         ret = []
         for visit_schedule in self.visit_schedules.values():
             for schedule in visit_schedule.schedules.values():
@@ -150,6 +262,39 @@ class SiteVisitSchedules:
         visit_schedule, schedule = ret[0]
         return visit_schedule, schedule
 
+    def _update_model_index(self, visit_schedule: VisitSchedule) -> None:
+        """Adds the schedules of a newly registered visit schedule
+        to the reverse model index.
+
+        The whole index is rebuilt if the registry dictionary was
+        replaced since the index was last built (e.g. in tests).
+        """
+        if self._model_index_registry is not self._registry:
+            self._rebuild_model_index()
+        else:
+            self._index_visit_schedule(visit_schedule)
+
+    def _rebuild_model_index(self) -> None:
+        self._model_index = {attr: {} for attr in indexed_model_attrs}
+        for visit_schedule in self._registry.values():
+            self._index_visit_schedule(visit_schedule)
+        self._model_index_registry = self._registry
+
+    def _index_visit_schedule(self, visit_schedule: VisitSchedule) -> None:
+        """Maps each indexed model of each schedule to its
+        (visit_schedule, schedule).
+
+        A model used by more than one schedule is kept as a list
+        of all matches so that `get_by_model` can report it as
+        ambiguous without scanning the registry.
+        """
+        for schedule in visit_schedule.schedules.values():
+            for attr in indexed_model_attrs:
+                if model_name := getattr(schedule, attr, None):
+                    self._model_index[attr].setdefault(model_name, []).append(
+                        (visit_schedule, schedule)
+                    )
+
     def get_by_offstudy_model(self, offstudy_model: str = None) -> list[VisitSchedule]:
         """Returns a list of visit_schedules for the given
         offstudy model.
@@ -225,10 +370,16 @@ class SiteVisitSchedules:
         return self._all_post_consent_models
 
     @staticmethod
-    def to_model(model_cls: VisitScheduleModel) -> None:
+    def to_model(model_cls: VisitScheduleModel) -> ToModelResult:
         """Updates the VisitSchedule model with the current visit
         schedule, schedule and visits.
 
+        Existing rows are read once and compared with the registry.
+        Only new, changed and deactivated rows are written, in bulk,
+        so history is only written for rows that changed. The
+        fingerprint of the registry is then saved; see
+        `is_model_current`.
+
         Note: The VisitSchedule model is just for reference and does
         not replace information gathered from -this- class.
 
@@ -239,11 +390,44 @@ class SiteVisitSchedules:
         an existing schedule, you may need to change it manually via
         the database client.
         """
-        model_cls.objects.update(active=False)
-        for visit_schedule in site_visit_schedules.visit_schedules.values():
+        existing = {
+            (obj.visit_schedule_name, obj.schedule_name, obj.timepoint): obj
+            for obj in model_cls.objects.all()
+        }
+        created, updated = [], []
+        for opts in site_visit_schedules.get_model_rows():
+            obj = existing.pop(
+                (opts["visit_schedule_name"], opts["schedule_name"], opts["timepoint"]), None
+            )
+            if obj is None:
+                created.append(model_cls(**opts))
+            elif any(getattr(obj, fld) != value for fld, value in opts.items()):
+                for fld, value in opts.items():
+                    setattr(obj, fld, value)
+                updated.append(obj)
+        deactivated = [obj for obj in existing.values() if obj.active]
+        for obj in deactivated:
+            obj.active = False
+        if created or updated or deactivated:
+            with transaction.atomic():
+                bulk_update(
+                    model_cls,
+                    updated + deactivated,
+                    ["visit_code", "visit_name", "visit_title", "active"],
+                    batch_size=BULK_BATCH_SIZE,
+                )
+                bulk_create(model_cls, created, batch_size=BULK_BATCH_SIZE)
+        site_visit_schedules.save_model_fingerprint(model_cls)
+        return ToModelResult(len(created), len(updated), len(deactivated))
+
+    def get_model_rows(self) -> Iterator[dict]:
+        """Yields the field values of a VisitSchedule model row for
+        each registered visit.
+        """
+        for visit_schedule in self.visit_schedules.values():
             for schedule in visit_schedule.schedules.values():
                 for visit in schedule.visits.values():
-                    opts = dict(
+                    yield dict(
                         visit_schedule_name=visit_schedule.name,
                         schedule_name=schedule.name,
                         visit_code=visit.code,
@@ -252,30 +436,84 @@ class SiteVisitSchedules:
                         timepoint=visit.timepoint,
                         active=True,
                     )
-                    try:
-                        obj = model_cls.objects.get(
-                            visit_schedule_name=visit_schedule.name,
-                            schedule_name=schedule.name,
-                            timepoint=visit.timepoint,
-                        )
-                    except ObjectDoesNotExist:
-                        model_cls.objects.create(**opts)
-                    else:
-                        for fld, value in opts.items():
-                            setattr(obj, fld, value)
-                        obj.save()
+
+    def get_model_fingerprint(self) -> str:
+        """Returns a hash of the content written to the VisitSchedule
+        model by `to_model`.
+
+        Stable across processes; changes only if a visit schedule,
+        schedule, visit code, name, title or timepoint changes.
+        """
+        rows = sorted(
+            json.dumps(row, default=str, sort_keys=True) for row in self.get_model_rows()
+        )
+        return hashlib.sha256("\n".join(rows).encode()).hexdigest()
+
+    def save_model_fingerprint(self, model_cls: VisitScheduleModel) -> None:
+        fingerprint_model_cls = django_apps.get_model(
+            "edc_visit_schedule.visitschedulefingerprint"
+        )
+        opts = dict(fingerprint=self.get_model_fingerprint(), modified=get_utcnow())
+        label_lower = model_cls._meta.label_lower
+        if not fingerprint_model_cls.objects.filter(model=label_lower).update(**opts):
+            fingerprint_model_cls.objects.create(model=label_lower, **opts)
+
+    def is_model_current(self, model_cls: VisitScheduleModel) -> bool:
+        """Returns True if `to_model` last synced the model with the
+        currently registered visit schedules.
+        """
+        return (
+            django_apps.get_model("edc_visit_schedule.visitschedulefingerprint")
+            .objects.filter(
+                model=model_cls._meta.label_lower, fingerprint=self.get_model_fingerprint()
+            )
+            .exists()
+        )
 
     def autodiscover(self, module_name=None, apps=None, verbose=None) -> None:
         """Autodiscovers classes in the visit_schedules.py file of
         any INSTALLED_APP.
+
+        If `settings.EDC_VISIT_SCHEDULE_REGISTRY_CACHE` is set, the
+        registry is loaded from the cache file instead, if the cache
+        fingerprint matches the settings and no source file of any
+        module imported when the cache was written has changed. On
+        a cache miss, the registry is built from the modules and
+        written to the cache file.
+
+        A `visit_schedules` module imported after the registry was
+        loaded from the cache replaces the cached copy of its visit
+        schedule when it registers. Until then, `Schedule` objects
+        imported directly from other modules are not the instances
+        in the registry.
         """
+        from .registry_cache import get_registry_fingerprint, registry_cache_enabled
+
+        start = time.perf_counter()
         self.loaded = True
-        before_import_registry = None
         module_name = module_name or "visit_schedules"
         verbose = True if verbose is None else verbose
+        apps = list(apps or django_apps.app_configs)
         if verbose:
             sys.stdout.write(f" * checking site for module '{module_name}' ...\n")
-        for app in apps or django_apps.app_configs:
+        fingerprint = None
+        if registry_cache_enabled() and not self._registry:
+            fingerprint = get_registry_fingerprint(apps, module_name)
+            if self._load_registry_cache(fingerprint, verbose=verbose):
+                self.autodiscover_timing = dict(
+                    source="cache", seconds=time.perf_counter() - start
+                )
+                return
+        self._import_modules(apps, module_name, verbose=verbose)
+        self.freeze()
+        self.autodiscover_timing = dict(source="modules", seconds=time.perf_counter() - start)
+        if fingerprint and self._registry:
+            self._save_registry_cache(fingerprint, verbose=verbose)
+
+    @staticmethod
+    def _import_modules(apps: list[str], module_name: str, verbose: bool | None = None):
+        before_import_registry = None
+        for app in apps:
             try:
                 mod = import_module(app)
                 try:
@@ -292,5 +530,44 @@ class SiteVisitSchedules:
             except ModuleNotFoundError:
                 pass
 
+    def _load_registry_cache(self, fingerprint: str, verbose: bool | None = None) -> bool:
+        """Loads and freezes the registry from the cache file, if
+        the fingerprint matches, and returns True.
+        """
+        from .registry_cache import (
+            RegistryCacheError,
+            get_registry_cache_path,
+            load_registry,
+        )
+
+        path = get_registry_cache_path()
+        try:
+            registry = load_registry(fingerprint, path)
+        except RegistryCacheError as e:
+            if verbose:
+                sys.stdout.write(f"   - {e}\n")
+            return False
+        if not registry:
+            return False
+        self._registry = registry
+        self._cached_visit_schedules = dict(registry)
+        self.freeze()
+        if verbose:
+            sys.stdout.write(f"   - loaded visit schedules from cache '{path}'\n")
+        return True
+
+    def _save_registry_cache(self, fingerprint: str, verbose: bool | None = None) -> None:
+        from .registry_cache import (
+            RegistryCacheError,
+            get_registry_cache_path,
+            save_registry,
+        )
+
+        try:
+            save_registry(self._registry, fingerprint, get_registry_cache_path())
+        except RegistryCacheError as e:
+            if verbose:
+                sys.stdout.write(f"   - {e}\n")
+
 
 site_visit_schedules = SiteVisitSchedules()
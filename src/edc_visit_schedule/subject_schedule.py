@@ -23,6 +23,7 @@ from .exceptions import (
     OnScheduleFirstAppointmentDateError,
     UnknownSubjectError,
 )
+from .subject_schedule_cache import ScheduleInterval, get_schedule_interval
 
 if TYPE_CHECKING:
     from edc_appointment.models import Appointment
@@ -355,30 +356,37 @@ class SubjectSchedule:
             )
         return onschedule_obj
 
-    def onschedule_or_raise(self, report_datetime=None, compare_as_datetimes=None):
+    def onschedule_or_raise(
+        self,
+        report_datetime=None,
+        compare_as_datetimes=None,
+        interval: ScheduleInterval | None = None,
+    ):
         """Raise an exception if subject is not on the schedule during
         the given date.
+
+        Pass `interval` if already fetched by the caller. See also
+        subject_schedule_cache.
         """
         compare_as_datetimes = True if compare_as_datetimes is None else compare_as_datetimes
 
-        onschedule_obj = self.onschedule_obj
-
-        try:
-            offschedule_datetime = self.offschedule_model_cls.objects.values_list(
-                "offschedule_datetime", flat=True
-            ).get(subject_identifier=self.subject_identifier)
-        except ObjectDoesNotExist:
-            offschedule_datetime = None
+        interval = interval or get_schedule_interval(self.schedule, self.subject_identifier)
+        if not interval:
+            raise NotOnScheduleError(
+                f"Subject has not been put on a schedule `{self.schedule_name}`. "
+                f"Got subject_identifier=`{self.subject_identifier}`."
+            )
+        onschedule_datetime, offschedule_datetime = interval
 
         if compare_as_datetimes:
             in_date_range = (
-                onschedule_obj.onschedule_datetime
+                onschedule_datetime
                 <= report_datetime
                 <= (offschedule_datetime or get_utcnow())
             )
         else:
             in_date_range = (
-                onschedule_obj.onschedule_datetime.date()
+                onschedule_datetime.date()
                 <= report_datetime.date()
                 <= (offschedule_datetime or get_utcnow()).date()
             )
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import TYPE_CHECKING, Iterator, NamedTuple
+
+from django.db.models import OuterRef, Subquery
+
+if TYPE_CHECKING:
+    from .schedule import Schedule
+
+__all__ = [
+    "ScheduleInterval",
+    "get_schedule_interval",
+    "invalidate_subject_schedule_cache",
+    "subject_schedule_cache",
+]
+
+# {subject_identifier: {onschedule_model: ScheduleInterval | None}}
+_cache: ContextVar[dict[str, dict[str, ScheduleInterval | None]] | None] = ContextVar(
+    "subject_schedule_cache", default=None
+)
+
+
+class ScheduleInterval(NamedTuple):
+    """The onschedule and offschedule datetimes of a subject
+    on a schedule.
+    """
+
+    onschedule_datetime: datetime
+    offschedule_datetime: datetime | None
+
+
+@contextmanager
+def subject_schedule_cache() -> Iterator[None]:
+    """Caches schedule intervals read by `get_schedule_interval`
+    for the duration of the block.
+
+    Nested blocks share the outer cache. Entries for a subject are
+    discarded when an onschedule, offschedule or history model
+    instance of the subject is saved or deleted and after a
+    bulk write by BulkSubjectSchedule.
+
+    Usage:
+        with subject_schedule_cache():
+            ...
+
+    See also SubjectScheduleCacheMiddleware.
+    """
+    token = _cache.set({}) if _cache.get() is None else None
+    try:
+        yield
+    finally:
+        if token:
+            _cache.reset(token)
+
+
+def invalidate_subject_schedule_cache(
+    subject_identifier: str | None = None, onschedule_model: str | None = None
+) -> None:
+    """Discards the cached intervals of a subject, or of all
+    subjects if `subject_identifier` is None.
+
+    If `onschedule_model` is given, only the subject's interval for
+    that onschedule model is discarded.
+    """
+    if (cache := _cache.get()) is not None:
+        if subject_identifier is None:
+            cache.clear()
+        elif onschedule_model is None:
+            cache.pop(subject_identifier, None)
+        else:
+            cache.get(subject_identifier, {}).pop(onschedule_model, None)
+
+
+def get_schedule_interval(
+    schedule: Schedule, subject_identifier: str
+) -> ScheduleInterval | None:
+    """Returns the ScheduleInterval of a subject on the schedule
+    or None if the subject is not on the schedule.
+
+    The onschedule and offschedule datetimes are read in one query.
+    The result is cached if called within `subject_schedule_cache`.
+    """
+    cache = _cache.get()
+    if cache is not None:
+        try:
+            return cache[subject_identifier][schedule.onschedule_model]
+        except KeyError:
+            pass
+    offschedule_datetime = Subquery(
+        schedule.offschedule_model_cls.objects.filter(
+            subject_identifier=OuterRef("subject_identifier")
+        ).values("offschedule_datetime")[:1]
+    )
+    row = (
+        schedule.onschedule_model_cls.objects.filter(subject_identifier=subject_identifier)
+        .annotate(offschedule_dt=offschedule_datetime)
+        .values_list("onschedule_datetime", "offschedule_dt")
+        .first()
+    )
+    interval = ScheduleInterval(*row) if row else None
+    if cache is not None:
+        cache.setdefault(subject_identifier, {})[schedule.onschedule_model] = interval
+    return interval
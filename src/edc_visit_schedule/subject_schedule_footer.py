@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, NamedTuple
+from urllib.parse import unquote, urlencode
+
+from django.apps import apps as django_apps
+from django.utils.safestring import mark_safe
+
+if TYPE_CHECKING:
+    from .models import SubjectScheduleHistory
+    from .schedule import Schedule
+    from .visit_schedule import VisitSchedule
+
+__all__ = ["SubjectScheduleFooterData", "SubjectScheduleFooters"]
+
+
+class SubjectScheduleFooterData(NamedTuple):
+    history_obj: SubjectScheduleHistory
+    onschedule_obj: Any
+    offschedule_obj: Any
+
+
+class SubjectScheduleFooters:
+    """Preloads the data for the schedule footers of a subject's
+    dashboard.
+
+    Data is loaded on first access: one query for the subject's
+    SubjectScheduleHistory instances, then one query per onschedule
+    and per offschedule model referenced by those instances.
+
+    Usage:
+        footers = SubjectScheduleFooters(subject_identifier)
+        context = footers.get_context(visit_schedule, schedule, subject_dashboard_url)
+    """
+
+    def __init__(self, subject_identifier: str):
+        self.subject_identifier = subject_identifier
+        self._data: dict[tuple[str, str], SubjectScheduleFooterData] | None = None
+
+    @property
+    def data(self) -> dict[tuple[str, str], SubjectScheduleFooterData]:
+        if self._data is None:
+            self._data = self.load()
+        return self._data
+
+    def load(self) -> dict[tuple[str, str], SubjectScheduleFooterData]:
+        history_model_cls = django_apps.get_model("edc_visit_schedule.subjectschedulehistory")
+        history_objs = list(
+            history_model_cls.objects.filter(subject_identifier=self.subject_identifier)
+        )
+        onschedule_objs = self.get_objs_by_model(
+            [obj.onschedule_model for obj in history_objs]
+        )
+        offschedule_objs = self.get_objs_by_model(
+            [obj.offschedule_model for obj in history_objs if obj.offschedule_datetime]
+        )
+        return {
+            (obj.visit_schedule_name, obj.schedule_name): SubjectScheduleFooterData(
+                history_obj=obj,
+                onschedule_obj=onschedule_objs.get(obj.onschedule_model),
+                offschedule_obj=offschedule_objs.get(obj.offschedule_model),
+            )
+            for obj in history_objs
+        }
+
+    def get_objs_by_model(self, models: list[str]) -> dict[str, Any]:
+        """Returns a dict of {label_lower: model instance} for this
+        subject, one query per model.
+        """
+        objs = {}
+        for model in dict.fromkeys(models):
+            objs[model] = (
+                django_apps.get_model(model)
+                .objects.filter(subject_identifier=self.subject_identifier)
+                .first()
+            )
+        return objs
+
+    def get_context(
+        self, visit_schedule: VisitSchedule, schedule: Schedule, subject_dashboard_url: str
+    ) -> dict:
+        """Returns the context for template
+        `edc_visit_schedule/subject_schedule_footer_row.html`.
+        """
+        context = dict(
+            visit_schedule=visit_schedule,
+            verbose_name=schedule.offschedule_model_cls._meta.verbose_name,
+            schedule=schedule,
+        )
+        data = self.data.get((visit_schedule.name, schedule.name))
+        if not data:
+            # subject was NEVER on this schedule
+            return dict(offschedule_datetime=None, onschedule_datetime=None, href=None)
+        context.update(history_obj=data.history_obj)
+        if not data.history_obj.offschedule_datetime:
+            # subject is still ON this schedule
+            url = schedule.offschedule_model_cls().get_absolute_url()
+            offschedule_datetime = None
+        else:
+            # subject is OFF this schedule
+            url = data.offschedule_obj.get_absolute_url()
+            offschedule_datetime = data.history_obj.offschedule_datetime
+        query = unquote(urlencode(dict(subject_identifier=self.subject_identifier)))
+        href = "&".join([f"{url}?next={subject_dashboard_url},subject_identifier", query])
+        context.update(
+            offschedule_datetime=offschedule_datetime,
+            onschedule_datetime=data.onschedule_obj.onschedule_datetime,
+            href=mark_safe(href),  # nosec B703, B308
+        )
+        return context
@@ -2,11 +2,13 @@ from __future__ import annotations
 
 import sys
 from collections import Counter, defaultdict
-from typing import TYPE_CHECKING
+from functools import update_wrapper
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
 
 from django.apps import apps as django_apps
-from django.core.checks import Error, Warning
-from django.core.exceptions import ObjectDoesNotExist
+from django.core.checks import Error, Tags, Warning, register
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Exists, OuterRef
 
 from .site_visit_schedules import site_visit_schedules
 from .utils import (
@@ -18,9 +20,53 @@ from .utils import (
 from .visit import CrfCollection
 
 if TYPE_CHECKING:
+    from datetime import datetime
+
+    from django.db import models
+    from django.db.models import QuerySet
+
     from .visit import Visit
 
+# fast checks of the registered visit schedules, no table scans
+STRUCTURE_TAG = "structure"
+# checks that scan tables, run on demand
+DATA_TAG = "data"
+
+CHECK_CHUNK_SIZE = 2000
+
+
+class TaggedCheck:
+    """Wraps a system check so that it keeps its tags if registered
+    again without tags, e.g. by `edc_appconfig`.
+
+    Django sets `check.tags` on each call to `register`.
+    """
+
+    def __init__(self, check: Callable, *tags: str):
+        update_wrapper(self, check)
+        self.check = check
+        self._tags = tags
+
+    def __call__(self, app_configs, **kwargs) -> list:
+        return self.check(app_configs, **kwargs)
+
+    @property
+    def tags(self) -> tuple[str, ...]:
+        return self._tags
+
+    @tags.setter
+    def tags(self, tags: tuple[str, ...]) -> None:
+        self._tags = tuple(dict.fromkeys([*self._tags, *tags]))
 
+
+def tagged_check(*tags: str) -> Callable[[Callable], TaggedCheck]:
+    def decorator(check: Callable) -> TaggedCheck:
+        return TaggedCheck(check, *tags)
+
+    return decorator
+
+
+@tagged_check(STRUCTURE_TAG)
 def visit_schedule_check(app_configs, **kwargs):
     errors = []
     if "migrate" not in sys.argv and "makemigrations" not in sys.argv:
@@ -47,63 +93,221 @@ def visit_schedule_check(app_configs, **kwargs):
     return errors
 
 
-def check_subject_schedule_history(app_configs, **kwargs) -> list:
+@tagged_check(DATA_TAG, Tags.database)
+def check_subject_schedule_history(app_configs, databases=None, **kwargs) -> list:
+    """Checks that each SubjectScheduleHistory instance refers to an
+    existing onschedule model instance.
+
+    A "data" check. Scans the history table so, as with other
+    database checks, only runs if `databases` is given, e.g.
+    `manage.py check --database default --tag data`. A plain
+    `manage.py check` does not run it. Schedule
+    `manage.py check --database default --tag data` or management
+    command `visit_schedule_data_checks` instead.
+    """
     errors = []
-    if "migrate" not in sys.argv and "makemigrations" not in sys.argv:
-        subject_schedule_history_cls = django_apps.get_model(
-            "edc_visit_schedule.subjectschedulehistory"
-        )
-        for obj in subject_schedule_history_cls.objects.all():
-            try:
-                obj.onschedule_obj
-            except LookupError as e:
+    if databases and "migrate" not in sys.argv and "makemigrations" not in sys.argv:
+        errors = get_subject_schedule_history_errors()
+    return errors
+
+
+@tagged_check(DATA_TAG, Tags.database)
+def check_onschedule_exists_in_subject_schedule_history(
+    app_configs, databases=None, **kwargs
+) -> list:
+    """Checks that each onschedule model instance has a
+    SubjectScheduleHistory instance.
+
+    A "data" check. See `check_subject_schedule_history`.
+    """
+    errors = []
+    if databases and "migrate" not in sys.argv and "makemigrations" not in sys.argv:
+        errors = get_onschedule_not_in_history_errors()
+    return errors
+
+
+def get_subject_schedule_history_errors(
+    onschedule_models: Iterable[str] | None = None,
+) -> list:
+    """Returns an Error for each SubjectScheduleHistory instance,
+    of the given `onschedule_models` if not None, that does not
+    refer to an existing onschedule model instance.
+
+    One anti-join query per onschedule model referenced in the
+    history, regardless of the number of subjects.
+    """
+    errors = []
+    subject_schedule_history_cls = django_apps.get_model(
+        "edc_visit_schedule.subjectschedulehistory"
+    )
+    history = subject_schedule_history_cls.objects.all()
+    if onschedule_models is not None:
+        history = history.filter(onschedule_model__in=list(onschedule_models))
+    onschedule_models = (
+        history.order_by().values_list("onschedule_model", flat=True).distinct()
+    )
+    for onschedule_model in list(onschedule_models):
+        queryset = history.filter(onschedule_model=onschedule_model)
+        try:
+            onschedule_model_cls = django_apps.get_model(onschedule_model)
+        except LookupError as e:
+            for subject_identifier in get_subject_identifiers(queryset):
                 errors.append(
                     Error(
                         "Invalid onschedule model referenced in SubjectScheduleHistory. "
-                        f"See {obj.onschedule_model} for {obj.subject_identifier} "
+                        f"See {onschedule_model} for {subject_identifier} "
                         f"Got {e}",
                         id="edc_visit_schedule.E005",
                     )
                 )
-            except ObjectDoesNotExist:
+        else:
+            queryset = queryset.filter(
+                ~Exists(
+                    onschedule_model_cls.objects.filter(
+                        subject_identifier=OuterRef("subject_identifier")
+                    )
+                )
+            )
+            for subject_identifier in get_subject_identifiers(queryset):
                 errors.append(
-                    "Invalid onschedule model referenced in SubjectScheduleHistory. "
-                    f"Got {obj.onschedule_model} for {obj.subject_identifier}"
+                    Error(
+                        "Invalid onschedule model referenced in SubjectScheduleHistory. "
+                        f"Got {onschedule_model} for {subject_identifier}",
+                        id="edc_visit_schedule.E005",
+                    )
                 )
     return errors
 
 
-def check_onschedule_exists_in_subject_schedule_history(app_configs, **kwargs) -> list:
+def get_onschedule_not_in_history_errors(
+    onschedule_models: Iterable[str] | None = None,
+) -> list:
+    """Returns an Error for each onschedule model instance, of the
+    given `onschedule_models` if not None, that has no
+    SubjectScheduleHistory instance.
+
+    One anti-join query per onschedule model, regardless of the
+    number of subjects.
+    """
     errors = []
-    if "migrate" not in sys.argv and "makemigrations" not in sys.argv:
-        subject_schedule_history_cls = django_apps.get_model(
-            "edc_visit_schedule.subjectschedulehistory"
-        )
-        for visit_schedule in site_visit_schedules.visit_schedules.values():
-            for schedule in visit_schedule.schedules.values():
-                try:
-                    onschedule_model_cls = getattr(schedule, "onschedule_model_cls")
-                except LookupError:
-                    pass
-                else:
-                    for obj in onschedule_model_cls.objects.all():
-                        try:
-                            subject_schedule_history_cls.objects.get(
-                                subject_identifier=obj.subject_identifier,
-                                onschedule_model=onschedule_model_cls._meta.label_lower,
-                            )
-                        except ObjectDoesNotExist:
-                            errors.append(
-                                Error(
-                                    f"Onschedule instance not found in "
-                                    "SubjectScheduleHistory. "
-                                    f"See {obj.subject_identifier} "
-                                    f"model {onschedule_model_cls._meta.label_lower}."
-                                )
-                            )
+    for label_lower, onschedule_model_cls in get_onschedule_model_classes().items():
+        if onschedule_models is not None and label_lower not in onschedule_models:
+            continue
+        queryset = get_onschedule_not_in_history(onschedule_model_cls)
+        for subject_identifier in get_subject_identifiers(queryset):
+            errors.append(
+                Error(
+                    f"Onschedule instance not found in "
+                    "SubjectScheduleHistory. "
+                    f"See {subject_identifier} "
+                    f"model {label_lower}."
+                )
+            )
     return errors
 
 
+def get_onschedule_not_in_history(onschedule_model_cls: type[models.Model]) -> QuerySet:
+    """Returns a queryset of the onschedule model instances that
+    have no SubjectScheduleHistory instance (anti-join).
+    """
+    subject_schedule_history_cls = django_apps.get_model(
+        "edc_visit_schedule.subjectschedulehistory"
+    )
+    return onschedule_model_cls.objects.filter(
+        ~Exists(
+            subject_schedule_history_cls.objects.filter(
+                subject_identifier=OuterRef("subject_identifier"),
+                onschedule_model=onschedule_model_cls._meta.label_lower,
+            )
+        )
+    )
+
+
+def get_onschedule_model_classes() -> dict[str, type[models.Model]]:
+    """Returns a dict of {label_lower: model_cls} of the onschedule
+    models of the registered schedules.
+    """
+    onschedule_model_classes = {}
+    for visit_schedule in site_visit_schedules.visit_schedules.values():
+        for schedule in visit_schedule.schedules.values():
+            try:
+                onschedule_model_cls = getattr(schedule, "onschedule_model_cls")
+            except LookupError:
+                pass
+            else:
+                onschedule_model_classes[onschedule_model_cls._meta.label_lower] = (
+                    onschedule_model_cls
+                )
+    return onschedule_model_classes
+
+
+def get_data_check_counts() -> dict[str, list[int]]:
+    """Returns a dict of {onschedule_model: [number of onschedule
+    model instances, number of SubjectScheduleHistory instances]}.
+
+    Compared between runs of `visit_schedule_data_checks` to detect
+    deleted instances.
+    """
+    counts = {
+        label_lower: [onschedule_model_cls.objects.count(), 0]
+        for label_lower, onschedule_model_cls in get_onschedule_model_classes().items()
+    }
+    history_counts = (
+        django_apps.get_model("edc_visit_schedule.subjectschedulehistory")
+        .objects.order_by()
+        .values("onschedule_model")
+        .annotate(count=Count("id"))
+        .values_list("onschedule_model", "count")
+    )
+    for onschedule_model, count in history_counts:
+        counts.setdefault(onschedule_model, [0, 0])[1] = count
+    return counts
+
+
+def get_changed_onschedule_models(
+    modified_since: datetime, counts: dict[str, list[int]], previous_counts: dict
+) -> list[str]:
+    """Returns the onschedule models for which onschedule model
+    instances or SubjectScheduleHistory instances were added,
+    modified or deleted since the last run.
+
+    An instance deleted on either side of the anti-join changes the
+    counts (see `get_data_check_counts`). An onschedule model
+    without a `modified` field is always returned.
+    """
+    changed = {label for label, count in counts.items() if previous_counts.get(label) != count}
+    changed.update(
+        django_apps.get_model("edc_visit_schedule.subjectschedulehistory")
+        .objects.filter(modified__gte=modified_since)
+        .order_by()
+        .values_list("onschedule_model", flat=True)
+        .distinct()
+    )
+    for label_lower, onschedule_model_cls in get_onschedule_model_classes().items():
+        if label_lower in changed:
+            continue
+        try:
+            onschedule_model_cls._meta.get_field("modified")
+        except FieldDoesNotExist:
+            changed.add(label_lower)
+        else:
+            if onschedule_model_cls.objects.filter(modified__gte=modified_since).exists():
+                changed.add(label_lower)
+    return sorted(changed)
+
+
+def get_subject_identifiers(queryset: QuerySet) -> Iterator[str]:
+    """Yields the subject identifiers of a queryset, fetched from
+    the database in chunks.
+    """
+    return (
+        queryset.order_by()
+        .values_list("subject_identifier", flat=True)
+        .iterator(chunk_size=CHECK_CHUNK_SIZE)
+    )
+
+
+@tagged_check(STRUCTURE_TAG)
 def check_form_collections(app_configs, **kwargs):
     errors = []
     if "migrate" not in sys.argv and "makemigrations" not in sys.argv:
@@ -208,3 +412,23 @@ def check_multiple_proxies_same_proxy_root(
             f"Proxy root/child models: {dict(proxy_root_to_child_proxies)}",
             id="edc_visit_schedule.E007",
         )
+
+
+structure_checks = [visit_schedule_check, check_form_collections]
+
+data_checks = [
+    check_subject_schedule_history,
+    check_onschedule_exists_in_subject_schedule_history,
+]
+
+
+def register_system_checks() -> None:
+    """Registers the structure checks and the data checks.
+
+    Called from `AppConfig.ready`. Data checks are also tagged
+    `Tags.database` and only run if databases are given, e.g.:
+        python manage.py check --tag structure
+        python manage.py check --database default --tag data
+    """
+    for check in [*structure_checks, *data_checks]:
+        register(check)
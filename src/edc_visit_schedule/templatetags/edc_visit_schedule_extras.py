@@ -1,76 +1,30 @@
-from urllib.parse import unquote, urlencode
-
 from django import template
-from django.core.exceptions import ObjectDoesNotExist
-from django.utils.safestring import mark_safe
 
-from ..models import SubjectScheduleHistory
+from ..subject_schedule_footer import SubjectScheduleFooters
 
 register = template.Library()
 
 
-@register.inclusion_tag("edc_visit_schedule/subject_schedule_footer_row.html")
+def get_subject_schedule_footers(context, subject_identifier) -> SubjectScheduleFooters:
+    """Returns the preloaded footers for this subject from the
+    context, if set by the view, otherwise from the render context
+    so that the data is loaded once per page.
+    """
+    footers = context.get("subject_schedule_footers")
+    if not footers or footers.subject_identifier != subject_identifier:
+        key = (SubjectScheduleFooters, subject_identifier)
+        footers = context.render_context.get(key)
+        if not footers:
+            footers = SubjectScheduleFooters(subject_identifier)
+            context.render_context[key] = footers
+    return footers
+
+
+@register.inclusion_tag(
+    "edc_visit_schedule/subject_schedule_footer_row.html", takes_context=True
+)
 def subject_schedule_footer_row(
-    subject_identifier, visit_schedule, schedule, subject_dashboard_url
+    context, subject_identifier, visit_schedule, schedule, subject_dashboard_url
 ):
-    context = dict(
-        visit_schedule=visit_schedule,
-        verbose_name=schedule.offschedule_model_cls._meta.verbose_name,
-        schedule=schedule,
-    )
-
-    try:
-        history_obj = SubjectScheduleHistory.objects.get(
-            visit_schedule_name=visit_schedule.name,
-            schedule_name=schedule.name,
-            subject_identifier=subject_identifier,
-            # offschedule_datetime__isnull=False,
-        )
-    except ObjectDoesNotExist:
-        history_obj = None
-    context.update(history_obj=history_obj)
-    if not history_obj:
-        # subject was NEVER on this schedule
-        context = dict(
-            offschedule_datetime=None,
-            onschedule_datetime=None,
-            href=None,
-        )
-    elif not history_obj.offschedule_datetime:
-        # subject is still ON this schedule
-        onschedule_model_obj = schedule.onschedule_model_cls.objects.get(
-            subject_identifier=subject_identifier
-        )
-        options = dict(subject_identifier=subject_identifier)
-        query = unquote(urlencode(options))
-        href = (
-            f"{schedule.offschedule_model_cls().get_absolute_url()}?next="
-            f"{subject_dashboard_url},subject_identifier"
-        )
-        href = "&".join([href, query])
-        context.update(
-            offschedule_datetime=None,
-            onschedule_datetime=onschedule_model_obj.onschedule_datetime,
-            href=mark_safe(href),  # nosec B703, B308
-        )
-    elif history_obj.offschedule_datetime:
-        # subject is OFF this schedule (offschedule_model_obj)
-        onschedule_model_obj = schedule.onschedule_model_cls.objects.get(
-            subject_identifier=subject_identifier
-        )
-        offschedule_model_obj = schedule.offschedule_model_cls.objects.get(
-            subject_identifier=subject_identifier
-        )
-        options = dict(subject_identifier=subject_identifier)
-        query = unquote(urlencode(options))
-        href = (
-            f"{offschedule_model_obj.get_absolute_url()}?next="
-            f"{subject_dashboard_url},subject_identifier"
-        )
-        href = "&".join([href, query])
-        context.update(
-            offschedule_datetime=history_obj.offschedule_datetime,
-            onschedule_datetime=onschedule_model_obj.onschedule_datetime,
-            href=mark_safe(href),  # nosec B703, B308
-        )
-    return context
+    footers = get_subject_schedule_footers(context, subject_identifier)
+    return footers.get_context(visit_schedule, schedule, subject_dashboard_url)
@@ -0,0 +1,23 @@
+"""Micro-benchmarks, not run by the test runner.
+
+Run from the repository root with:
+
+    python -m edc_visit_schedule.tests.benchmarks [module ...]
+
+where `module` is, for example, `visit_collection` for
+`bench_visit_collection`.
+"""
+
+import timeit
+from typing import Callable
+
+
+def bench(label: str, func: Callable, number: int = 1000, repeat: int = 5) -> float:
+    """Prints and returns the best time per call, in microseconds."""
+    best = min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1_000_000
+    print(f"  {label:<50}{best:>12.2f} us")
+    return best
+
+
+def compare(label: str, baseline: float, other: float) -> None:
+    print(f"  {label:<50}{baseline / other:>12.1f}x")
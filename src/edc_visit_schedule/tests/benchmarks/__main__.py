@@ -0,0 +1,26 @@
+import os
+import pkgutil
+import sys
+from importlib import import_module
+
+import django
+
+
+def main(names: list[str]) -> None:
+    sys.path.insert(0, os.getcwd())
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.test_settings")
+    django.setup()
+    package = import_module("edc_visit_schedule.tests.benchmarks")
+    names = names or [
+        module.name.removeprefix("bench_")
+        for module in pkgutil.iter_modules(package.__path__)
+        if module.name.startswith("bench_")
+    ]
+    for name in names:
+        module = import_module(f"{package.__name__}.bench_{name}")
+        print(f"{name}:")
+        module.run()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,63 @@
+from dateutil.relativedelta import relativedelta
+
+from edc_visit_schedule.ordered_collection import OrderedCollection
+from edc_visit_schedule.schedule import Schedule
+from edc_visit_schedule.visit import Visit
+from visit_schedule_app.consents import consent_v1
+
+from . import bench, compare
+
+
+def get_visits(visit_count: int) -> list[Visit]:
+    return [
+        Visit(
+            code=f"{i}",
+            timepoint=i,
+            rbase=relativedelta(days=i),
+            rlower=relativedelta(days=0),
+            rupper=relativedelta(days=0),
+        )
+        for i in range(visit_count)
+    ]
+
+
+def get_schedule() -> Schedule:
+    return Schedule(
+        name="schedule",
+        onschedule_model="visit_schedule_app.onschedule",
+        offschedule_model="visit_schedule_app.offschedule",
+        consent_definitions=[consent_v1],
+        appointment_model="edc_appointment.appointment",
+    )
+
+
+def add_visits_by_resorting(visits: list[Visit]) -> None:
+    """Schedule construction before bisect insertion and
+    uniqueness sets, for comparison.
+    """
+    collection = OrderedCollection()
+    collection.key = "code"
+    collection.ordering_attr = "timepoint"
+    for visit in visits:
+        for attr in ["code", "title", "timepoint", "rbase"]:
+            if getattr(visit, attr) in [getattr(v, attr) for v in collection.values()]:
+                raise AssertionError
+        collection[visit.code] = visit
+        collection._sort()
+
+
+def add_visits(visits: list[Visit]) -> None:
+    schedule = get_schedule()
+    for visit in visits:
+        schedule.add_visit(visit=visit)
+
+
+def run() -> None:
+    for visit_count in [100, 1000, 2000]:
+        visits = get_visits(visit_count)
+        print(f"  Schedule construction ({visit_count} visits)")
+        baseline = bench(
+            "re-sort and list scans", lambda: add_visits_by_resorting(visits), number=1
+        )
+        other = bench("Schedule.add_visit", lambda: add_visits(visits), number=1)
+        compare("speedup", baseline, other)
@@ -0,0 +1,51 @@
+from copy import deepcopy
+
+from dateutil.relativedelta import relativedelta
+from edc_utils import get_utcnow
+
+from edc_visit_schedule.schedule import SubjectVisitCollection, VisitCollection
+from edc_visit_schedule.visit import Crf, CrfCollection, Visit
+
+from . import bench, compare
+
+
+def get_visit_collection(visit_count: int = 40, crf_count: int = 25) -> VisitCollection:
+    visits = VisitCollection()
+    for i in range(visit_count):
+        crfs = CrfCollection(
+            *[Crf(show_order=j, model=f"app_label.crf{j}") for j in range(crf_count)]
+        )
+        visit = Visit(
+            code=f"{i}000",
+            timepoint=i,
+            rbase=relativedelta(months=i),
+            rlower=relativedelta(days=0),
+            rupper=relativedelta(days=14),
+            crfs=crfs,
+            crfs_unscheduled=crfs,
+        )
+        visits.update({visit.code: visit})
+    return visits
+
+
+def run() -> None:
+    visits = get_visit_collection()
+    dt = get_utcnow()
+    excluded = ["10000", "20000"]
+
+    def with_deepcopy():
+        subject_visits = deepcopy(visits)
+        for code in excluded:
+            del subject_visits[code]
+        return subject_visits.timepoint_dates(dt=dt)
+
+    def with_view():
+        subject_visits = SubjectVisitCollection(visits)
+        for code in excluded:
+            del subject_visits[code]
+        return subject_visits.timepoint_dates(dt=dt)
+
+    print(f"  visits_for_subject ({len(visits)} visits) + timepoint_dates")
+    baseline = bench("deepcopy(VisitCollection)", with_deepcopy, number=20)
+    other = bench("SubjectVisitCollection", with_view, number=20)
+    compare("speedup", baseline, other)
@@ -0,0 +1,84 @@
+from collections import namedtuple
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from dateutil.relativedelta import relativedelta
+
+from edc_visit_schedule.schedule import VisitCollection
+from edc_visit_schedule.schedule.window import Window
+from edc_visit_schedule.schedule.window_table import compile_window_table
+from edc_visit_schedule.visit import Visit, WindowPeriod
+from edc_visit_schedule.visit.visit import VisitDate
+
+from . import bench, compare
+
+
+def get_window_with_namedtuple(window_period: WindowPeriod, dt: datetime):
+    """WindowPeriod.get_window before the module-level result
+    type, for comparison.
+    """
+    dt_floor = dt.replace(hour=0, minute=0, second=0, microsecond=0).astimezone(
+        ZoneInfo("UTC")
+    )
+    dt_ceil = dt.replace(hour=23, minute=59, second=59, microsecond=999999).astimezone(
+        ZoneInfo("UTC")
+    )
+    window = namedtuple("Window", ["lower", "upper"])
+    return window(dt_floor - window_period.rlower, dt_ceil + window_period.rupper)
+
+
+def get_visits(visit_count: int = 20) -> VisitCollection:
+    visits = VisitCollection()
+    for i in range(visit_count):
+        visit = Visit(
+            code=f"{i}000",
+            timepoint=i,
+            rbase=relativedelta(months=i),
+            rlower=relativedelta(days=7),
+            rupper=relativedelta(days=14),
+            add_window_gap_to_lower=True,
+        )
+        visits.update({visit.code: visit})
+    return visits
+
+
+def run() -> None:
+    dt = datetime(2024, 1, 2, 10, 0, tzinfo=ZoneInfo("UTC"))
+    rlower, rupper = relativedelta(days=7), relativedelta(days=14)
+    window_period = WindowPeriod(rlower=rlower, rupper=rupper, timepoint=1)
+    visit_date = VisitDate(rlower=rlower, rupper=rupper, timepoint=1)
+
+    print("  WindowPeriod / VisitDate")
+    baseline = bench(
+        "get_window (namedtuple per call)",
+        lambda: get_window_with_namedtuple(window_period, dt),
+        number=10000,
+    )
+    other = bench("WindowPeriod.get_window", lambda: window_period.get_window(dt=dt))
+    compare("speedup", baseline, other)
+
+    def set_base():
+        visit_date.base = dt
+
+    bench("VisitDate.base", set_base)
+
+    visits = get_visits()
+    window_table = compile_window_table(visits)
+    baseline_timepoint_datetime = dt
+    timepoint_datetime = dt + relativedelta(months=10)
+
+    def datetime_in_window(visit_code_sequence: int):
+        return Window(
+            visits=visits,
+            dt=timepoint_datetime,
+            timepoint_datetime=timepoint_datetime,
+            visit_code="10000",
+            visit_code_sequence=visit_code_sequence,
+            baseline_timepoint_datetime=baseline_timepoint_datetime,
+            window_table=window_table,
+        ).datetime_in_window
+
+    print(f"  Window ({len(visits)} visits)")
+    bench("compile_window_table", lambda: compile_window_table(visits), number=100)
+    bench("datetime_in_window (scheduled)", lambda: datetime_in_window(0))
+    bench("datetime_in_window (unscheduled)", lambda: datetime_in_window(1))
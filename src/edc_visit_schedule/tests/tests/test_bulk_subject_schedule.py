@@ -0,0 +1,290 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import time_machine
+from dateutil.relativedelta import relativedelta
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from edc_appointment.models import Appointment
+from edc_consent.consent_definition import ConsentDefinition
+from edc_consent.exceptions import NotConsentedError
+from edc_consent.site_consents import site_consents
+from edc_constants.constants import FEMALE, MALE
+from edc_facility.import_holidays import import_holidays
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_registration.utils import RegisteredSubjectDoesNotExist
+from edc_sites.tests import SiteTestCaseMixin
+from edc_utils import get_utcnow
+from edc_visit_tracking.constants import SCHEDULED
+
+from edc_visit_schedule.bulk_subject_schedule import (
+    BulkScheduleResult,
+    BulkSubjectSchedule,
+)
+from edc_visit_schedule.constants import OFF_SCHEDULE, ON_SCHEDULE
+from edc_visit_schedule.exceptions import (
+    InvalidOffscheduleDate,
+    NotOnScheduleError,
+    SubjectScheduleError,
+)
+from edc_visit_schedule.models import SubjectScheduleHistory
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from visit_schedule_app.models import (
+    OffSchedule,
+    OnSchedule,
+    SubjectConsent,
+    SubjectVisit,
+)
+from visit_schedule_app.visit_schedule import visit_schedule
+
+travel_datetime = datetime(2019, 4, 1, 8, 00, tzinfo=ZoneInfo("UTC"))
+
+
+@time_machine.travel(travel_datetime)
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=travel_datetime - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=travel_datetime + relativedelta(years=1),
+    SITE_ID=30,
+)
+class TestBulkSubjectSchedule(SiteTestCaseMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        import_holidays()
+
+    def setUp(self):
+        site_visit_schedules.loaded = False
+        site_visit_schedules._registry = {}
+        site_consents.registry = {}
+        self.consent_v1 = ConsentDefinition(
+            "visit_schedule_app.subjectconsentv1",
+            version="1",
+            start=ResearchProtocolConfig().study_open_datetime,
+            end=ResearchProtocolConfig().study_close_datetime,
+            age_min=18,
+            age_is_adult=18,
+            age_max=64,
+            gender=[MALE, FEMALE],
+        )
+        site_consents.register(self.consent_v1)
+        self.schedule = visit_schedule.schedules["schedule"]
+        self.schedule.consent_definitions = [self.consent_v1]
+        site_visit_schedules.register(visit_schedule)
+        self.subject_identifiers = [f"12345{i}" for i in range(5)]
+        for subject_identifier in self.subject_identifiers:
+            SubjectConsent.objects.create(
+                subject_identifier=subject_identifier,
+                consent_datetime=get_utcnow() - relativedelta(years=1),
+            )
+
+    def test_put_on_schedule(self):
+        result = self.schedule.put_on_schedule_bulk(
+            [(s, get_utcnow()) for s in self.subject_identifiers]
+        )
+        self.assertIsInstance(result, BulkScheduleResult)
+        self.assertEqual(result.failed, {})
+        self.assertEqual(result.succeeded, self.subject_identifiers)
+        for subject_identifier in self.subject_identifiers:
+            with self.subTest(subject_identifier=subject_identifier):
+                obj = OnSchedule.objects.get(subject_identifier=subject_identifier)
+                self.assertEqual(obj.report_datetime, obj.onschedule_datetime)
+                self.assertEqual(obj.history.count(), 1)
+                self.assertEqual(
+                    SubjectScheduleHistory.objects.get(
+                        subject_identifier=subject_identifier, schedule_name="schedule"
+                    ).schedule_status,
+                    ON_SCHEDULE,
+                )
+                self.assertEqual(
+                    Appointment.objects.filter(subject_identifier=subject_identifier).count(),
+                    len(self.schedule.visits),
+                )
+
+    def test_put_on_schedule_matches_single(self):
+        subject_identifier = self.subject_identifiers[0]
+        self.schedule.put_on_schedule(subject_identifier, get_utcnow())
+        expected = list(
+            Appointment.objects.filter(subject_identifier=subject_identifier)
+            .order_by("timepoint")
+            .values_list("visit_code", "appt_datetime")
+        )
+        subject_identifier = self.subject_identifiers[1]
+        self.schedule.put_on_schedule_bulk([(subject_identifier, get_utcnow())])
+        self.assertEqual(
+            list(
+                Appointment.objects.filter(subject_identifier=subject_identifier)
+                .order_by("timepoint")
+                .values_list("visit_code", "appt_datetime")
+            ),
+            expected,
+        )
+
+    def test_put_on_schedule_reports_failures(self):
+        SubjectConsent.objects.create(
+            subject_identifier="999999",
+            consent_datetime=get_utcnow() + relativedelta(days=1),
+            version="2",
+        )
+        items = [(s, get_utcnow()) for s in self.subject_identifiers]
+        items.extend(
+            [
+                (self.subject_identifiers[0], get_utcnow()),
+                ("888888", get_utcnow()),
+                ("999999", get_utcnow()),
+            ]
+        )
+        result = self.schedule.put_on_schedule_bulk(items)
+        self.assertEqual(result.succeeded, self.subject_identifiers[1:])
+        self.assertIsInstance(result.failed[self.subject_identifiers[0]], SubjectScheduleError)
+        self.assertIsInstance(result.failed["888888"], RegisteredSubjectDoesNotExist)
+        self.assertIsInstance(result.failed["999999"], NotConsentedError)
+        self.assertEqual(OnSchedule.objects.count(), 4)
+        self.assertFalse(
+            Appointment.objects.filter(
+                subject_identifier__in=[self.subject_identifiers[0], "888888", "999999"]
+            ).exists()
+        )
+
+    def test_put_on_schedule_validates_onschedule_datetime(self):
+        items = [(s, get_utcnow()) for s in self.subject_identifiers[1:]]
+        items.append((self.subject_identifiers[0], get_utcnow() + relativedelta(days=1)))
+        result = self.schedule.put_on_schedule_bulk(items)
+        self.assertEqual(result.succeeded, self.subject_identifiers[1:])
+        self.assertIsInstance(result.failed[self.subject_identifiers[0]], ValidationError)
+        self.assertFalse(
+            OnSchedule.objects.filter(subject_identifier=self.subject_identifiers[0]).exists()
+        )
+
+    def test_onschedule_model_overrides_save(self):
+        bulk_subject_schedule = BulkSubjectSchedule(
+            visit_schedule=visit_schedule, schedule=self.schedule
+        )
+        self.assertFalse(bulk_subject_schedule.onschedule_model_overrides_save)
+
+    def test_put_on_schedule_already_on_schedule(self):
+        subject_identifier = self.subject_identifiers[0]
+        self.schedule.put_on_schedule(subject_identifier, get_utcnow())
+        appointments = Appointment.objects.filter(subject_identifier=subject_identifier)
+        count = appointments.count()
+        result = self.schedule.put_on_schedule_bulk(
+            [(s, get_utcnow()) for s in self.subject_identifiers]
+        )
+        self.assertEqual(result.failed, {})
+        self.assertEqual(OnSchedule.objects.count(), len(self.subject_identifiers))
+        self.assertEqual(
+            SubjectScheduleHistory.objects.filter(schedule_name="schedule").count(),
+            len(self.subject_identifiers),
+        )
+        self.assertEqual(appointments.count(), count)
+
+    def test_put_on_schedule_in_batches(self):
+        result = self.schedule.put_on_schedule_bulk(
+            [(s, get_utcnow()) for s in self.subject_identifiers], batch_size=2
+        )
+        self.assertEqual(result.failed, {})
+        self.assertEqual(OnSchedule.objects.count(), len(self.subject_identifiers))
+
+    def put_on_schedule(self) -> datetime:
+        """Puts all subjects on schedule a month ago and returns an
+        offschedule datetime after the first appointment.
+        """
+        self.schedule.put_on_schedule_bulk(
+            [(s, get_utcnow() - relativedelta(months=1)) for s in self.subject_identifiers]
+        )
+        appointment = Appointment.objects.filter(
+            subject_identifier=self.subject_identifiers[0], timepoint=0
+        ).get()
+        return appointment.appt_datetime + relativedelta(hours=12)
+
+    @staticmethod
+    def create_subject_visit(subject_identifier: str, timepoint: int) -> None:
+        appointment = Appointment.objects.get(
+            subject_identifier=subject_identifier, timepoint=timepoint
+        )
+        with time_machine.travel(appointment.appt_datetime):
+            SubjectVisit.objects.create(
+                appointment=appointment,
+                report_datetime=appointment.appt_datetime,
+                subject_identifier=subject_identifier,
+                reason=SCHEDULED,
+            )
+
+    def test_take_off_schedule(self):
+        offschedule_datetime = self.put_on_schedule()
+        self.create_subject_visit(self.subject_identifiers[0], 0)
+        result = self.schedule.take_off_schedule_bulk(
+            [(s, offschedule_datetime) for s in self.subject_identifiers]
+        )
+        self.assertEqual(result.failed, {})
+        self.assertEqual(result.succeeded, self.subject_identifiers)
+        for subject_identifier in self.subject_identifiers:
+            with self.subTest(subject_identifier=subject_identifier):
+                obj = OffSchedule.objects.get(subject_identifier=subject_identifier)
+                self.assertEqual(obj.offschedule_datetime, offschedule_datetime)
+                self.assertEqual(obj.report_datetime, offschedule_datetime)
+                history_obj = SubjectScheduleHistory.objects.get(
+                    subject_identifier=subject_identifier, schedule_name="schedule"
+                )
+                self.assertEqual(history_obj.schedule_status, OFF_SCHEDULE)
+                self.assertEqual(history_obj.offschedule_datetime, offschedule_datetime)
+                self.assertEqual(
+                    Appointment.objects.filter(subject_identifier=subject_identifier).count(),
+                    1,
+                )
+
+    def test_take_off_schedule_matches_single(self):
+        offschedule_datetime = self.put_on_schedule()
+        subject_identifier = self.subject_identifiers[0]
+        OffSchedule.objects.create(
+            subject_identifier=subject_identifier,
+            offschedule_datetime=offschedule_datetime,
+        )
+        expected = list(
+            Appointment.objects.filter(subject_identifier=subject_identifier)
+            .order_by("timepoint")
+            .values_list("visit_code", "appt_status")
+        )
+        subject_identifier = self.subject_identifiers[1]
+        self.schedule.take_off_schedule_bulk([(subject_identifier, offschedule_datetime)])
+        self.assertEqual(
+            list(
+                Appointment.objects.filter(subject_identifier=subject_identifier)
+                .order_by("timepoint")
+                .values_list("visit_code", "appt_status")
+            ),
+            expected,
+        )
+
+    def test_take_off_schedule_reports_failures(self):
+        offschedule_datetime = self.put_on_schedule()
+        self.create_subject_visit(self.subject_identifiers[0], 0)
+        self.create_subject_visit(self.subject_identifiers[0], 1)
+        items = [(s, offschedule_datetime) for s in self.subject_identifiers[:3]]
+        items.extend(
+            [
+                (self.subject_identifiers[3], offschedule_datetime - relativedelta(months=2)),
+                ("888888", offschedule_datetime),
+            ]
+        )
+        result = self.schedule.take_off_schedule_bulk(items)
+        self.assertEqual(result.succeeded, self.subject_identifiers[1:3])
+        self.assertIsInstance(
+            result.failed[self.subject_identifiers[0]], InvalidOffscheduleDate
+        )
+        self.assertIsInstance(
+            result.failed[self.subject_identifiers[3]], InvalidOffscheduleDate
+        )
+        self.assertIsInstance(result.failed["888888"], RegisteredSubjectDoesNotExist)
+        self.assertEqual(
+            SubjectScheduleHistory.objects.filter(schedule_status=OFF_SCHEDULE).count(), 2
+        )
+        self.assertEqual(
+            Appointment.objects.filter(subject_identifier=self.subject_identifiers[0]).count(),
+            len(self.schedule.visits),
+        )
+
+    def test_take_off_schedule_not_on_schedule(self):
+        result = self.schedule.take_off_schedule_bulk(
+            [(self.subject_identifiers[0], get_utcnow())]
+        )
+        self.assertIsInstance(result.failed[self.subject_identifiers[0]], NotOnScheduleError)
+        self.assertFalse(OffSchedule.objects.exists())
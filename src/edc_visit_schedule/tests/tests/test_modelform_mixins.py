@@ -0,0 +1,106 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import time_machine
+from dateutil.relativedelta import relativedelta
+from django import forms
+from django.test import TestCase, override_settings
+from edc_consent.consent_definition import ConsentDefinition
+from edc_consent.site_consents import site_consents
+from edc_constants.constants import FEMALE, MALE
+from edc_facility.import_holidays import import_holidays
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_sites.tests import SiteTestCaseMixin
+from edc_utils import get_utcnow
+
+from edc_visit_schedule.modelform_mixins import VisitScheduleNonCrfModelFormMixin
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from visit_schedule_app.models import OffSchedule, OnSchedule, SubjectConsent
+from visit_schedule_app.visit_schedule import visit_schedule
+
+travel_datetime = datetime(2019, 4, 1, 8, 00, tzinfo=ZoneInfo("UTC"))
+
+
+class OnScheduleForm(VisitScheduleNonCrfModelFormMixin, forms.ModelForm):
+    get_by_model_attr = "onschedule_model"
+
+    @property
+    def report_datetime(self):
+        return self.cleaned_data.get("report_datetime")
+
+    def get_subject_identifier(self):
+        return self.instance.subject_identifier
+
+    class Meta:
+        model = OnSchedule
+        fields = ["subject_identifier"]
+
+
+@time_machine.travel(travel_datetime)
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=travel_datetime - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=travel_datetime + relativedelta(years=1),
+    SITE_ID=30,
+)
+class TestVisitScheduleNonCrfModelFormMixin(SiteTestCaseMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        import_holidays()
+
+    def setUp(self):
+        site_visit_schedules.loaded = False
+        site_visit_schedules._registry = {}
+        site_consents.registry = {}
+        consent_v1 = ConsentDefinition(
+            "visit_schedule_app.subjectconsentv1",
+            version="1",
+            start=ResearchProtocolConfig().study_open_datetime,
+            end=ResearchProtocolConfig().study_close_datetime,
+            age_min=18,
+            age_is_adult=18,
+            age_max=64,
+            gender=[MALE, FEMALE],
+        )
+        site_consents.register(consent_v1)
+        schedule = visit_schedule.schedules["schedule"]
+        schedule.consent_definitions = [consent_v1]
+        site_visit_schedules.register(visit_schedule)
+        self.subject_identifier = "111111"
+        self.onschedule_datetime = get_utcnow() - relativedelta(months=2)
+        SubjectConsent.objects.create(
+            subject_identifier=self.subject_identifier,
+            consent_datetime=get_utcnow() - relativedelta(years=1),
+        )
+        schedule.put_on_schedule(self.subject_identifier, self.onschedule_datetime)
+        self.instance = OnSchedule.objects.get(subject_identifier=self.subject_identifier)
+
+    def get_form(self, report_datetime: datetime) -> OnScheduleForm:
+        form = OnScheduleForm(instance=self.instance)
+        form.cleaned_data = dict(report_datetime=report_datetime)
+        return form
+
+    def test_validators_share_one_query(self):
+        form = self.get_form(self.onschedule_datetime + relativedelta(days=1))
+        with self.assertNumQueries(1):
+            form.is_onschedule_or_raise()
+            form.report_datetime_within_schedule_datetimes()
+
+    def test_report_datetime_before_onschedule(self):
+        form = self.get_form(self.onschedule_datetime - relativedelta(days=1))
+        form.is_onschedule_or_raise()
+        with self.assertRaisesMessage(
+            forms.ValidationError, "Expected a datetime on or after"
+        ):
+            form.report_datetime_within_schedule_datetimes()
+
+    def test_report_datetime_after_offschedule(self):
+        offschedule_datetime = self.onschedule_datetime + relativedelta(days=10)
+        OffSchedule.objects.create(
+            subject_identifier=self.subject_identifier,
+            offschedule_datetime=offschedule_datetime,
+        )
+        form = self.get_form(offschedule_datetime + relativedelta(days=1))
+        with self.assertRaisesMessage(forms.ValidationError, "Subject not on schedule"):
+            form.is_onschedule_or_raise()
+        with self.assertRaisesMessage(forms.ValidationError, "See onschedule and offschedule"):
+            form.report_datetime_within_schedule_datetimes()
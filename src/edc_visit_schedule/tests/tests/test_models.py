@@ -16,11 +16,13 @@ from edc_utils import get_utcnow
 from edc_visit_tracking.constants import SCHEDULED
 
 from edc_visit_schedule.constants import OFF_SCHEDULE, ON_SCHEDULE
+from edc_visit_schedule.exceptions import SiteVisitScheduleError
 from edc_visit_schedule.models import SubjectScheduleHistory
 from edc_visit_schedule.site_visit_schedules import (
     RegistryNotLoaded,
     site_visit_schedules,
 )
+from edc_visit_schedule.utils import get_offschedule_models, get_onschedule_models
 from visit_schedule_app.models import (
     BadOffSchedule1,
     CrfOne,
@@ -406,6 +408,84 @@ class TestModels(SiteTestCaseMixin, TestCase):
         )
         self.assertEqual(0, len(onschedules))
 
+    def test_onschedules_for_subjects_manager(self):
+        traveller = time_machine.travel(self.study_open_datetime)
+        traveller.start()
+        subject_identifiers = [f"{self.subject_identifier}{i}" for i in range(3)]
+        for subject_identifier in subject_identifiers:
+            SubjectConsent.objects.create(
+                subject_identifier=subject_identifier, consent_datetime=get_utcnow()
+            )
+            OnSchedule.objects.put_on_schedule(
+                subject_identifier=subject_identifier, onschedule_datetime=get_utcnow()
+            )
+        with self.assertNumQueries(2):
+            onschedules = SubjectScheduleHistory.objects.onschedules_for_subjects(
+                [*subject_identifiers, "unknown"]
+            )
+        self.assertEqual(
+            onschedules,
+            {
+                subject_identifier: [
+                    OnSchedule.objects.get(subject_identifier=subject_identifier)
+                ]
+                for subject_identifier in subject_identifiers
+            },
+        )
+        traveller.stop()
+
+    def test_onschedule_and_offschedule_model_labels(self):
+        traveller = time_machine.travel(self.study_open_datetime)
+        traveller.start()
+        SubjectConsent.objects.create(
+            subject_identifier=self.subject_identifier, consent_datetime=get_utcnow()
+        )
+        OnSchedule.objects.put_on_schedule(
+            subject_identifier=self.subject_identifier, onschedule_datetime=get_utcnow()
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                get_onschedule_models(subject_identifier=self.subject_identifier),
+                ["visit_schedule_app.onschedule"],
+            )
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                get_offschedule_models(subject_identifier=self.subject_identifier),
+                ["visit_schedule_app.offschedule"],
+            )
+        self.assertEqual(
+            get_onschedule_models(
+                subject_identifier=self.subject_identifier,
+                report_datetime=get_utcnow() - relativedelta(days=1),
+            ),
+            [],
+        )
+        traveller.stop()
+
+    def test_onschedule_model_labels_not_registered(self):
+        traveller = time_machine.travel(self.study_open_datetime)
+        traveller.start()
+        SubjectConsent.objects.create(
+            subject_identifier=self.subject_identifier, consent_datetime=get_utcnow()
+        )
+        OnSchedule.objects.put_on_schedule(
+            subject_identifier=self.subject_identifier, onschedule_datetime=get_utcnow()
+        )
+        SubjectScheduleHistory.objects.filter(
+            subject_identifier=self.subject_identifier
+        ).update(onschedule_model="visit_schedule_app.onschedulenotregistered")
+        self.assertRaises(
+            SiteVisitScheduleError,
+            get_onschedule_models,
+            subject_identifier=self.subject_identifier,
+        )
+        self.assertRaises(
+            SiteVisitScheduleError,
+            get_offschedule_models,
+            subject_identifier=self.subject_identifier,
+        )
+        traveller.stop()
+
     def test_natural_key(self):
         traveller = time_machine.travel(self.study_open_datetime)
         traveller.start()
@@ -0,0 +1,163 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import time_machine
+from dateutil.relativedelta import relativedelta
+from django.test import SimpleTestCase, TestCase, override_settings
+from edc_consent.consent_definition import ConsentDefinition
+from edc_consent.site_consents import site_consents
+from edc_constants.constants import FEMALE, MALE
+from edc_facility.import_holidays import import_holidays
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_sites.tests import SiteTestCaseMixin
+from edc_utils import get_utcnow
+
+from edc_visit_schedule.exceptions import NotOnScheduleError, NotOnScheduleForDateError
+from edc_visit_schedule.onschedule_evaluator import OnScheduleEvaluator
+from edc_visit_schedule.schedule import Schedule
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from visit_schedule_app.models import OffSchedule, SubjectConsent
+from visit_schedule_app.visit_schedule import visit_schedule
+
+utc = ZoneInfo("UTC")
+travel_datetime = datetime(2019, 4, 1, 8, 00, tzinfo=utc)
+
+
+class TestOnScheduleEvaluatorIntervals(SimpleTestCase):
+    def setUp(self):
+        consent_v1 = ConsentDefinition(
+            "visit_schedule_app.subjectconsentv1",
+            version="1",
+            start=ResearchProtocolConfig().study_open_datetime,
+            end=ResearchProtocolConfig().study_close_datetime,
+            age_min=18,
+            age_is_adult=18,
+            age_max=64,
+            gender=[MALE, FEMALE],
+        )
+        schedule = Schedule(
+            name="schedule",
+            onschedule_model="visit_schedule_app.onschedule",
+            offschedule_model="visit_schedule_app.offschedule",
+            appointment_model="edc_appointment.appointment",
+            consent_definitions=[consent_v1],
+        )
+        self.onschedule_datetime = datetime(2019, 1, 1, 10, 0, tzinfo=utc)
+        self.offschedule_datetime = datetime(2019, 3, 1, 10, 0, tzinfo=utc)
+        self.evaluator = OnScheduleEvaluator(schedule).set_intervals(
+            [
+                ("3", self.onschedule_datetime, None),
+                ("1", self.onschedule_datetime, self.offschedule_datetime),
+            ]
+        )
+
+    def test_mask(self):
+        items = [
+            ("1", self.onschedule_datetime),
+            ("1", self.offschedule_datetime),
+            ("1", self.offschedule_datetime + relativedelta(minutes=1)),
+            ("1", self.onschedule_datetime - relativedelta(minutes=1)),
+            ("2", self.onschedule_datetime),
+            ("3", self.onschedule_datetime - relativedelta(years=1)),
+        ]
+        self.assertEqual(self.evaluator.mask(items), [True, True, False, False, False, True])
+        self.assertEqual(self.evaluator.mask(iter(items)), self.evaluator.mask(items))
+
+    def test_mask_as_dates(self):
+        self.evaluator.compare_as_datetimes = False
+        items = [
+            ("1", self.onschedule_datetime - relativedelta(hours=1)),
+            ("1", self.offschedule_datetime + relativedelta(hours=1)),
+            ("1", self.offschedule_datetime + relativedelta(days=1)),
+        ]
+        self.assertEqual(self.evaluator.mask(items), [True, True, False])
+
+    def test_violations(self):
+        items = [
+            ("1", self.onschedule_datetime),
+            ("2", self.onschedule_datetime),
+            ("1", self.offschedule_datetime + relativedelta(days=1)),
+        ]
+        violations = list(self.evaluator.violations(items))
+        self.assertEqual([v.index for v in violations], [1, 2])
+        self.assertEqual([v.subject_identifier for v in violations], ["2", "1"])
+        self.assertIsInstance(violations[0].error, NotOnScheduleError)
+        self.assertIsInstance(violations[1].error, NotOnScheduleForDateError)
+
+
+@time_machine.travel(travel_datetime)
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=travel_datetime - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=travel_datetime + relativedelta(years=1),
+    SITE_ID=30,
+)
+class TestOnScheduleEvaluator(SiteTestCaseMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        import_holidays()
+
+    def setUp(self):
+        site_visit_schedules.loaded = False
+        site_visit_schedules._registry = {}
+        site_consents.registry = {}
+        consent_v1 = ConsentDefinition(
+            "visit_schedule_app.subjectconsentv1",
+            version="1",
+            start=ResearchProtocolConfig().study_open_datetime,
+            end=ResearchProtocolConfig().study_close_datetime,
+            age_min=18,
+            age_is_adult=18,
+            age_max=64,
+            gender=[MALE, FEMALE],
+        )
+        site_consents.register(consent_v1)
+        self.schedule = visit_schedule.schedules["schedule"]
+        self.schedule.consent_definitions = [consent_v1]
+        site_visit_schedules.register(visit_schedule)
+        self.onschedule_datetime = get_utcnow() - relativedelta(months=2)
+        self.subject_identifiers = ["111111", "222222"]
+        for subject_identifier in self.subject_identifiers:
+            SubjectConsent.objects.create(
+                subject_identifier=subject_identifier,
+                consent_datetime=get_utcnow() - relativedelta(years=1),
+            )
+            self.schedule.put_on_schedule(subject_identifier, self.onschedule_datetime)
+        OffSchedule.objects.create(
+            subject_identifier="111111",
+            offschedule_datetime=self.onschedule_datetime + relativedelta(days=10),
+        )
+
+    def test_matches_onschedule_or_raise(self):
+        items = [
+            (subject_identifier, self.onschedule_datetime + relativedelta(days=days))
+            for subject_identifier in [*self.subject_identifiers, "333333"]
+            for days in [-1, 0, 5, 10, 11, 30]
+        ]
+        for compare_as_datetimes in [True, False]:
+            with self.subTest(compare_as_datetimes=compare_as_datetimes):
+                evaluator = self.schedule.onschedule_evaluator(
+                    compare_as_datetimes=compare_as_datetimes
+                )
+                with self.assertNumQueries(2):
+                    mask = evaluator.mask(items)
+                expected = []
+                for subject_identifier, report_datetime in items:
+                    try:
+                        self.schedule.subject(subject_identifier).onschedule_or_raise(
+                            report_datetime=report_datetime,
+                            compare_as_datetimes=compare_as_datetimes,
+                        )
+                    except (NotOnScheduleError, NotOnScheduleForDateError):
+                        expected.append(False)
+                    else:
+                        expected.append(True)
+                self.assertEqual(mask, expected)
+
+    def test_subject_identifiers(self):
+        evaluator = self.schedule.onschedule_evaluator(subject_identifiers=["222222"])
+        self.assertEqual(
+            evaluator.mask(
+                [("111111", self.onschedule_datetime), ("222222", self.onschedule_datetime)]
+            ),
+            [False, True],
+        )
@@ -0,0 +1,69 @@
+from django.test import TestCase
+
+from edc_visit_schedule.ordered_collection import OrderedCollection
+
+
+class Item:
+    def __init__(self, name: str, sequence: int):
+        self.name = name
+        self.sequence = sequence
+
+
+class Collection(OrderedCollection):
+    key = "name"
+    ordering_attr = "sequence"
+
+
+class TestOrderedCollection(TestCase):
+    def setUp(self):
+        self.collection = Collection()
+        for name, sequence in [("c", 3), ("a", 1), ("d", 4), ("b", 2)]:
+            self.collection.update({name: Item(name, sequence)})
+
+    def test_ordered_on_update(self):
+        self.assertEqual(list(self.collection), ["a", "b", "c", "d"])
+        self.assertEqual(self.collection.first.name, "a")
+        self.assertEqual(self.collection.last.name, "d")
+
+    def test_next_previous(self):
+        self.assertEqual(self.collection.next("a").name, "b")
+        self.assertEqual(self.collection.next("c").name, "d")
+        self.assertIsNone(self.collection.next("d"))
+        self.assertIsNone(self.collection.next("x"))
+        self.assertEqual(self.collection.previous("b").name, "a")
+        self.assertIsNone(self.collection.previous("a"))
+        self.assertIsNone(self.collection.previous("x"))
+
+    def test_position_and_at(self):
+        self.assertEqual(self.collection.position("a"), 0)
+        self.assertEqual(self.collection.position("d"), 3)
+        self.assertIsNone(self.collection.position("x"))
+        self.assertEqual(self.collection.at(1).name, "b")
+        self.assertEqual(self.collection.at(-1).name, "d")
+        self.assertRaises(IndexError, self.collection.at, 4)
+
+    def test_index_follows_other_mutations(self):
+        self.assertEqual(self.collection.next("a").name, "b")
+        del self.collection["b"]
+        self.assertEqual(self.collection.next("a").name, "c")
+        self.collection.pop("c")
+        self.assertEqual(self.collection.next("a").name, "d")
+        self.assertEqual(self.collection.previous("d").name, "a")
+        self.collection.clear()
+        self.assertIsNone(self.collection.next("a"))
+
+    def test_insert_in_order(self):
+        self.collection.update({"ab": Item("ab", 1)})
+        self.collection.update({"bc": Item("bc", 2.5), "z": Item("z", 0)})
+        self.assertEqual(list(self.collection), ["z", "a", "ab", "b", "bc", "c", "d"])
+        self.assertEqual(
+            [self.collection.position(k) for k in self.collection], list(range(7))
+        )
+        self.assertEqual(self.collection.next("ab").name, "b")
+        self.assertEqual(self.collection.previous("bc").name, "b")
+
+    def test_replace_existing_key_resorts(self):
+        self.collection.update({"a": Item("a", 5)})
+        self.assertEqual(list(self.collection), ["b", "c", "d", "a"])
+        self.assertEqual(self.collection.last.name, "a")
+        self.assertIsNone(self.collection.previous("b"))
@@ -0,0 +1,171 @@
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from importlib import import_module
+from io import StringIO
+from pathlib import Path
+from textwrap import dedent
+
+from django.test import TestCase, override_settings
+
+from edc_visit_schedule.registry_cache import (
+    RegistryCacheError,
+    get_fingerprint_settings,
+    get_registry_cache_path,
+    get_registry_fingerprint,
+    load_registry,
+    registry_cache_enabled,
+    save_registry,
+)
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from visit_schedule_app.visit_schedule import visit_schedule
+
+
+class TestRegistryCache(TestCase):
+    def setUp(self):
+        site_visit_schedules._registry = {}
+        site_visit_schedules.register(visit_schedule)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "visit_schedules.pickle"
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(get_registry_cache_path())
+        self.assertFalse(registry_cache_enabled())
+
+    def test_enabled(self):
+        with override_settings(EDC_VISIT_SCHEDULE_REGISTRY_CACHE=str(self.path)):
+            self.assertEqual(get_registry_cache_path(), self.path)
+            self.assertTrue(registry_cache_enabled())
+
+    def test_fingerprint_is_stable(self):
+        apps = ["visit_schedule_app"]
+        fingerprint = get_registry_fingerprint(apps, "visit_schedules")
+        self.assertEqual(fingerprint, get_registry_fingerprint(apps, "visit_schedules"))
+        with override_settings(SITE_ID=99):
+            self.assertNotEqual(fingerprint, get_registry_fingerprint(apps, "visit_schedules"))
+
+    def test_fingerprint_settings(self):
+        apps = ["visit_schedule_app"]
+        with override_settings(EDC_VISIT_SCHEDULE_REGISTRY_CACHE_SETTINGS=["LANGUAGE_CODE"]):
+            self.assertIn("LANGUAGE_CODE", get_fingerprint_settings())
+            self.assertIn("SITE_ID", get_fingerprint_settings())
+            fingerprint = get_registry_fingerprint(apps, "visit_schedules")
+            with override_settings(LANGUAGE_CODE="fr"):
+                self.assertNotEqual(
+                    fingerprint, get_registry_fingerprint(apps, "visit_schedules")
+                )
+
+    def test_save_and_load(self):
+        save_registry(site_visit_schedules.registry, "abc", self.path)
+        registry = load_registry("abc", self.path)
+        self.assertEqual(list(registry), ["visit_schedule"])
+        schedule = registry["visit_schedule"].schedules.get("schedule")
+        self.assertEqual(list(schedule.visits), ["1000", "2000", "3000", "4000"])
+        self.assertEqual(
+            schedule.consent_definitions,
+            visit_schedule.schedules.get("schedule").consent_definitions,
+        )
+
+    def test_load_fingerprint_mismatch(self):
+        save_registry(site_visit_schedules.registry, "abc", self.path)
+        self.assertIsNone(load_registry("xyz", self.path))
+
+    def test_load_missing_or_corrupt(self):
+        self.assertIsNone(load_registry("abc", self.path))
+        self.path.write_bytes(b"not a pickle")
+        self.assertRaises(RegistryCacheError, load_registry, "abc", self.path)
+
+    def test_load_consent_definitions_are_relinked(self):
+        save_registry(site_visit_schedules.registry, "abc", self.path)
+        registry = load_registry("abc", self.path)
+        for cdef, registered_cdef in zip(
+            registry["visit_schedule"].schedules.get("schedule").consent_definitions,
+            visit_schedule.schedules.get("schedule").consent_definitions,
+        ):
+            self.assertIs(cdef, registered_cdef)
+
+    def test_load_imported_source_changed(self):
+        source = Path(self.tmpdir.name) / "registry_cache_source.py"
+        source.write_text("VALUE = 1\n")
+        sys.path.insert(0, self.tmpdir.name)
+        try:
+            import_module("registry_cache_source")
+            save_registry(site_visit_schedules.registry, "abc", self.path)
+            self.assertIsNotNone(load_registry("abc", self.path))
+            source.write_text("VALUE = 100\n")
+            self.assertIsNone(load_registry("abc", self.path))
+        finally:
+            sys.path.remove(self.tmpdir.name)
+            sys.modules.pop("registry_cache_source", None)
+
+
+class TestRegistryCacheAutodiscover(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "visit_schedules.pickle"
+        app_dir = Path(self.tmpdir.name) / "registry_cache_app"
+        app_dir.mkdir()
+        (app_dir / "__init__.py").write_text("")
+        (app_dir / "visit_schedules.py").write_text(
+            dedent(
+                """
+                from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+                from edc_visit_schedule.visit_schedule import VisitSchedule
+                from visit_schedule_app.visit_schedule import schedule
+
+                visit_schedule = VisitSchedule(
+                    name="cached_visit_schedule",
+                    verbose_name="Cached Visit Schedule",
+                    offstudy_model="visit_schedule_app.subjectoffstudy",
+                    death_report_model="visit_schedule_app.deathreport",
+                )
+                visit_schedule.add_schedule(schedule)
+                site_visit_schedules.register(visit_schedule)
+                """
+            )
+        )
+        sys.path.insert(0, self.tmpdir.name)
+        site_visit_schedules._registry = {}
+
+    def tearDown(self):
+        sys.path.remove(self.tmpdir.name)
+        for name in ["registry_cache_app.visit_schedules", "registry_cache_app"]:
+            sys.modules.pop(name, None)
+        site_visit_schedules._cached_visit_schedules = {}
+        self.tmpdir.cleanup()
+
+    def test_autodiscover_from_cache_then_import_module(self):
+        with override_settings(EDC_VISIT_SCHEDULE_REGISTRY_CACHE=str(self.path)):
+            site_visit_schedules.autodiscover(apps=["registry_cache_app"], verbose=False)
+            self.assertEqual(site_visit_schedules.autodiscover_timing["source"], "modules")
+            self.assertTrue(self.path.exists())
+
+            # as in a new process
+            sys.modules.pop("registry_cache_app.visit_schedules")
+            site_visit_schedules._registry = {}
+            site_visit_schedules.autodiscover(apps=["registry_cache_app"], verbose=False)
+            self.assertEqual(site_visit_schedules.autodiscover_timing["source"], "cache")
+            self.assertIn("cached_visit_schedule", site_visit_schedules.registry)
+
+            # importing the module replaces the cached copy
+            module = import_module("registry_cache_app.visit_schedules")
+            self.assertIs(
+                site_visit_schedules.get_visit_schedule("cached_visit_schedule"),
+                module.visit_schedule,
+            )
+            _, schedule = site_visit_schedules.get_by_onschedule_model(
+                "visit_schedule_app.onschedule"
+            )
+            self.assertIs(schedule, module.schedule)
+
+    def test_autodiscover_unreadable_cache_not_verbose(self):
+        self.path.write_bytes(b"not a pickle")
+        with override_settings(EDC_VISIT_SCHEDULE_REGISTRY_CACHE=str(self.path)):
+            with redirect_stdout(StringIO()) as stdout:
+                site_visit_schedules.autodiscover(apps=["registry_cache_app"], verbose=False)
+            self.assertEqual(stdout.getvalue(), "")
+            self.assertEqual(site_visit_schedules.autodiscover_timing["source"], "modules")
+            self.assertIn("cached_visit_schedule", site_visit_schedules.registry)
@@ -0,0 +1,148 @@
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase
+
+from edc_visit_schedule.exceptions import SiteVisitScheduleError
+from edc_visit_schedule.registry_snapshot import RegistrySnapshot
+from edc_visit_schedule.schedule import Schedule
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from edc_visit_schedule.visit import Visit
+from edc_visit_schedule.visit_schedule import VisitSchedule
+from visit_schedule_app.consents import consent_v1
+from visit_schedule_app.visit_schedule import schedule, visit_schedule, visit_schedule2
+
+
+class TestRegistrySnapshot(TestCase):
+    def setUp(self):
+        site_visit_schedules._registry = {}
+        site_visit_schedules.register(visit_schedule)
+
+    def test_freeze(self):
+        snapshot = site_visit_schedules.freeze()
+        self.assertIsInstance(snapshot, RegistrySnapshot)
+        self.assertIs(site_visit_schedules.snapshot, snapshot)
+
+    def test_snapshot_discarded_on_register(self):
+        snapshot = site_visit_schedules.freeze()
+        site_visit_schedules._registry = {}
+        site_visit_schedules.register(visit_schedule2)
+        self.assertIsNot(site_visit_schedules.snapshot, snapshot)
+        self.assertRaises(
+            SiteVisitScheduleError,
+            site_visit_schedules.snapshot.get_schedule,
+            "visit_schedule",
+            "schedule",
+        )
+        self.assertEqual(
+            site_visit_schedules.snapshot.get_schedule(
+                "visit_schedule2", "schedule2"
+            ).visit_codes,
+            ("4000",),
+        )
+
+    def test_schedule_snapshot(self):
+        schedule_snapshot = site_visit_schedules.snapshot.get_schedule(
+            "visit_schedule", "schedule"
+        )
+        self.assertIs(schedule_snapshot.schedule, schedule)
+        self.assertEqual(schedule_snapshot.visit_codes, ("1000", "2000", "3000", "4000"))
+        self.assertEqual(schedule_snapshot.baseline_visit_code, "1000")
+        self.assertEqual(schedule_snapshot.baseline_visit, schedule.visits.first)
+        self.assertEqual(schedule_snapshot.next_visit("1000").code, "2000")
+        self.assertIsNone(schedule_snapshot.next_visit("4000"))
+        self.assertEqual(schedule_snapshot.previous_visit("2000").code, "1000")
+        self.assertIsNone(schedule_snapshot.previous_visit("1000"))
+        self.assertIsNone(schedule_snapshot.get_visit("9999"))
+
+    def test_baseline_timepoints(self):
+        baseline_timepoints = site_visit_schedules.snapshot.get_baseline_timepoints(
+            "visit_schedule", "schedule"
+        )
+        self.assertEqual(
+            baseline_timepoints.baseline_timepoint, schedule.visits.first.timepoint
+        )
+        self.assertEqual(
+            baseline_timepoints.timepoints, frozenset(schedule.visits.timepoints.values())
+        )
+        self.assertIsNone(
+            site_visit_schedules.snapshot.get_baseline_timepoints("visit_schedule", "blah")
+        )
+
+    def test_snapshot_is_read_only(self):
+        schedule_snapshot = site_visit_schedules.snapshot.get_schedule(
+            "visit_schedule", "schedule"
+        )
+        with self.assertRaises(TypeError):
+            schedule_snapshot.visits_by_code["9999"] = None
+        with self.assertRaises(AttributeError):
+            schedule_snapshot.baseline_visit_code = "2000"
+
+    def test_schedules_for_model(self):
+        snapshot = site_visit_schedules.snapshot
+        self.assertEqual(
+            [s.key for s in snapshot.get_schedules_for_model("visit_schedule_app.crfone")],
+            [("visit_schedule", "schedule")],
+        )
+        self.assertEqual(
+            [s.key for s in snapshot.get_schedules_for_model("visit_schedule_app.onschedule")],
+            [("visit_schedule", "schedule")],
+        )
+        self.assertEqual(snapshot.get_schedules_for_model("visit_schedule_app.blah"), ())
+
+    def test_crf_required_at(self):
+        self.assertEqual(
+            schedule.crf_required_at("visit_schedule_app.crfone"),
+            ["1000", "2000", "3000", "4000"],
+        )
+        self.assertEqual(schedule.crf_required_at("visit_schedule_app.blah"), [])
+
+    def test_add_schedule_to_unregistered_visit_schedule(self):
+        snapshot = site_visit_schedules.freeze()
+        unregistered_visit_schedule = VisitSchedule(
+            name="unregistered",
+            verbose_name="Unregistered",
+            offstudy_model="visit_schedule_app.subjectoffstudy",
+            death_report_model="visit_schedule_app.deathreport",
+        )
+        unregistered_visit_schedule.add_schedule(
+            Schedule(
+                name="unregistered",
+                onschedule_model="visit_schedule_app.onschedulefive",
+                offschedule_model="visit_schedule_app.offschedulefive",
+                consent_definitions=[consent_v1],
+            )
+        )
+        self.assertFalse(site_visit_schedules.is_registered(unregistered_visit_schedule))
+        self.assertTrue(site_visit_schedules.is_registered(visit_schedule))
+        self.assertIs(site_visit_schedules.snapshot, snapshot)
+
+    def test_unregistered_schedule_snapshot(self):
+        unregistered_schedule = Schedule(
+            name="unregistered",
+            onschedule_model="visit_schedule_app.onschedulefive",
+            offschedule_model="visit_schedule_app.offschedulefive",
+            consent_definitions=[consent_v1],
+        )
+        unregistered_schedule.add_visit(
+            Visit(
+                code="1000",
+                timepoint=0,
+                rbase=relativedelta(days=0),
+                rlower=relativedelta(days=0),
+                rupper=relativedelta(days=6),
+            )
+        )
+        snapshot = unregistered_schedule.snapshot
+        self.assertIs(unregistered_schedule.snapshot, snapshot)
+        self.assertIsNone(snapshot.visit_schedule_name)
+        self.assertEqual(snapshot.visit_codes, ("1000",))
+        self.assertIsNone(unregistered_schedule.__getstate__()["_snapshot"])
+        unregistered_schedule.add_visit(
+            Visit(
+                code="2000",
+                timepoint=1,
+                rbase=relativedelta(days=7),
+                rlower=relativedelta(days=0),
+                rupper=relativedelta(days=6),
+            )
+        )
+        self.assertEqual(unregistered_schedule.snapshot.visit_codes, ("1000", "2000"))
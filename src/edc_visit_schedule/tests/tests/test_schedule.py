@@ -110,6 +110,28 @@ class TestSchedule(TestCase):
             except AlreadyRegisteredVisit as e:
                 self.fail(f"Exception unexpectedly raised. Got {e}")
 
+    def test_add_visits_out_of_order(self):
+        schedule = Schedule(
+            name="schedule",
+            onschedule_model="visit_schedule_app.onschedule",
+            offschedule_model="visit_schedule_app.offschedule",
+            consent_definitions=[consent_v1],
+            appointment_model="edc_appointment.appointment",
+        )
+        for i in [0, 3, 1, 4, 2]:
+            schedule.add_visit(
+                visit=Visit(
+                    code=str(i),
+                    timepoint=i,
+                    rbase=relativedelta(days=i),
+                    rlower=relativedelta(days=0),
+                    rupper=relativedelta(days=6),
+                )
+            )
+        self.assertEqual(list(schedule.visits), ["0", "1", "2", "3", "4"])
+        self.assertEqual(schedule.visits.next("1").code, "2")
+        self.assertEqual(schedule.visits.previous("3").code, "2")
+
     def test_add_visits_duplicate_code(self):
         schedule = Schedule(
             name="schedule",
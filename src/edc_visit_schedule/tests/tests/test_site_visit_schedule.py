@@ -1,5 +1,11 @@
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 
+from edc_visit_schedule.bulk_utils import bulk_create
+from edc_visit_schedule.models import VisitSchedule as VisitScheduleModel
+from edc_visit_schedule.models import VisitScheduleFingerprint
 from edc_visit_schedule.schedule import Schedule
 from edc_visit_schedule.site_visit_schedules import (
     AlreadyRegisteredVisitSchedule,
@@ -9,6 +15,7 @@ from edc_visit_schedule.site_visit_schedules import (
 from edc_visit_schedule.visit_schedule import VisitSchedule
 from visit_schedule_app.consents import consent_v1
 from visit_schedule_app.models import OffSchedule, OnSchedule
+from visit_schedule_app.visit_schedule import visit_schedule as app_visit_schedule
 
 
 class TestSiteVisitSchedule(TestCase):
@@ -137,3 +144,166 @@ class TestSiteVisitSchedule1(TestCase):
             "visit_schedule_app.offschedule"
         )
         self.assertEqual(schedule.offschedule_model_cls, OffSchedule)
+
+    def test_get_by_model_after_registry_replaced(self):
+        site_visit_schedules._registry = {}
+        site_visit_schedules.register(self.visit_schedule_two)
+        self.assertRaises(
+            SiteVisitScheduleError,
+            site_visit_schedules.get_by_onschedule_model,
+            "visit_schedule_app.onschedule",
+        )
+        _, schedule = site_visit_schedules.get_by_onschedule_model(
+            "visit_schedule_app.onscheduletwo"
+        )
+        self.assertEqual(schedule, self.schedule_two)
+
+    def test_get_by_model_ambiguous(self):
+        visit_schedule_three = VisitSchedule(
+            name="visit_schedule_three",
+            verbose_name="Visit Schedule Three",
+            offstudy_model="visit_schedule_app.subjectoffstudy",
+            death_report_model="visit_schedule_app.deathreport",
+        )
+        visit_schedule_three.add_schedule(
+            Schedule(
+                name="schedule_three",
+                onschedule_model="visit_schedule_app.onschedulethree",
+                offschedule_model="visit_schedule_app.offschedule",
+                appointment_model="edc_appointment.appointment",
+                consent_definitions=[consent_v1],
+                base_timepoint=1,
+            )
+        )
+        site_visit_schedules.register(visit_schedule_three)
+        with self.assertRaises(SiteVisitScheduleError) as cm:
+            site_visit_schedules.get_by_offschedule_model("visit_schedule_app.offschedule")
+        self.assertIn("ambiguous", str(cm.exception))
+        _, schedule = site_visit_schedules.get_by_onschedule_model(
+            "visit_schedule_app.onschedulethree"
+        )
+        self.assertEqual(schedule.name, "schedule_three")
+
+    def test_get_by_model_after_schedule_added_to_registered_visit_schedule(self):
+        # build the index first
+        site_visit_schedules.get_by_onschedule_model("visit_schedule_app.onschedule")
+        schedule_three = Schedule(
+            name="schedule_three",
+            onschedule_model="visit_schedule_app.onschedulethree",
+            offschedule_model="visit_schedule_app.offschedulethree",
+            appointment_model="edc_appointment.appointment",
+            consent_definitions=[consent_v1],
+            base_timepoint=1,
+        )
+        self.visit_schedule.add_schedule(schedule_three)
+        for visit_schedule, schedule in [
+            site_visit_schedules.get_by_onschedule_model("visit_schedule_app.onschedulethree"),
+            site_visit_schedules.get_by_offschedule_model(
+                "visit_schedule_app.offschedulethree"
+            ),
+        ]:
+            self.assertEqual(visit_schedule, self.visit_schedule)
+            self.assertEqual(schedule, schedule_three)
+
+    def test_get_by_model_invalid_attr(self):
+        self.assertRaises(
+            SiteVisitScheduleError,
+            site_visit_schedules.get_by_model,
+            attr="blah_model",
+            model="visit_schedule_app.onschedule",
+        )
+
+
+class TestToModel(TestCase):
+    def setUp(self):
+        site_visit_schedules._registry = {}
+        site_visit_schedules.register(app_visit_schedule)
+        VisitScheduleModel.objects.all().delete()
+        VisitScheduleModel.history.all().delete()
+        VisitScheduleFingerprint.objects.all().delete()
+
+    def test_to_model(self):
+        result = site_visit_schedules.to_model(VisitScheduleModel)
+        self.assertEqual(result, (4, 0, 0))
+        self.assertEqual(VisitScheduleModel.objects.filter(active=True).count(), 4)
+        self.assertEqual(VisitScheduleModel.history.count(), 4)
+
+    def test_bulk_create_sets_uuid_pk(self):
+        objs = [
+            VisitScheduleModel(
+                visit_schedule_name="visit_schedule",
+                schedule_name="schedule",
+                visit_code=visit_code,
+                visit_name=visit_code,
+                visit_title=f"Visit {visit_code}",
+                timepoint=timepoint,
+            )
+            for timepoint, visit_code in enumerate(["8000", "9000"])
+        ]
+        bulk_create(VisitScheduleModel, objs, batch_size=1)
+        self.assertEqual(
+            sorted(VisitScheduleModel.objects.values_list("pk", flat=True)),
+            sorted(obj.pk for obj in objs),
+        )
+        self.assertEqual(
+            sorted(VisitScheduleModel.history.values_list("id", flat=True)),
+            sorted(obj.pk for obj in objs),
+        )
+
+    def test_to_model_unchanged_reads_once(self):
+        site_visit_schedules.to_model(VisitScheduleModel)
+        # read the model, save the fingerprint
+        with self.assertNumQueries(2):
+            result = site_visit_schedules.to_model(VisitScheduleModel)
+        self.assertEqual(result, (0, 0, 0))
+        self.assertEqual(VisitScheduleModel.history.count(), 4)
+
+    def test_to_model_writes_changes_only(self):
+        site_visit_schedules.to_model(VisitScheduleModel)
+        VisitScheduleModel.objects.filter(visit_code="2000").update(visit_title="blah")
+        VisitScheduleModel.objects.create(
+            visit_schedule_name="visit_schedule",
+            schedule_name="schedule",
+            visit_code="9000",
+            visit_name="9000",
+            visit_title="Visit 9000",
+            timepoint=99,
+            active=True,
+        )
+        history_count = VisitScheduleModel.history.count()
+        result = site_visit_schedules.to_model(VisitScheduleModel)
+        self.assertEqual(result, (0, 1, 1))
+        self.assertEqual(VisitScheduleModel.history.count(), history_count + 2)
+        self.assertEqual(
+            VisitScheduleModel.objects.get(visit_code="2000").visit_title,
+            app_visit_schedule.schedules["schedule"].visits.get("2000").title,
+        )
+        self.assertFalse(VisitScheduleModel.objects.get(visit_code="9000").active)
+
+    def test_fingerprint(self):
+        fingerprint = site_visit_schedules.get_model_fingerprint()
+        self.assertEqual(site_visit_schedules.get_model_fingerprint(), fingerprint)
+        self.assertFalse(site_visit_schedules.is_model_current(VisitScheduleModel))
+        site_visit_schedules.to_model(VisitScheduleModel)
+        self.assertTrue(site_visit_schedules.is_model_current(VisitScheduleModel))
+        visit = app_visit_schedule.schedules["schedule"].visits.get("2000")
+        title = visit.title
+        visit.title = "blah"
+        try:
+            self.assertNotEqual(site_visit_schedules.get_model_fingerprint(), fingerprint)
+            self.assertFalse(site_visit_schedules.is_model_current(VisitScheduleModel))
+        finally:
+            visit.title = title
+
+    def test_populate_visit_schedule_command(self):
+        call_command("populate_visit_schedule", stdout=StringIO())
+        self.assertEqual(VisitScheduleModel.objects.count(), 4)
+        VisitScheduleModel.objects.filter(visit_code="2000").update(visit_title="blah")
+        stdout = StringIO()
+        call_command("populate_visit_schedule", stdout=stdout)
+        self.assertIn("unchanged", stdout.getvalue())
+        self.assertEqual(VisitScheduleModel.objects.get(visit_code="2000").visit_title, "blah")
+        call_command("populate_visit_schedule", force=True, stdout=StringIO())
+        self.assertNotEqual(
+            VisitScheduleModel.objects.get(visit_code="2000").visit_title, "blah"
+        )
@@ -0,0 +1,144 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import time_machine
+from dateutil.relativedelta import relativedelta
+from django import forms
+from django.test import RequestFactory, TestCase, override_settings
+from edc_consent.consent_definition import ConsentDefinition
+from edc_consent.site_consents import site_consents
+from edc_constants.constants import FEMALE, MALE
+from edc_facility.import_holidays import import_holidays
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_sites.tests import SiteTestCaseMixin
+from edc_utils import get_utcnow
+
+from edc_visit_schedule.exceptions import NotOnScheduleForDateError
+from edc_visit_schedule.middleware import SubjectScheduleCacheMiddleware
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from edc_visit_schedule.subject_schedule_cache import (
+    ScheduleInterval,
+    get_schedule_interval,
+    subject_schedule_cache,
+)
+from edc_visit_schedule.utils import (
+    report_datetime_within_onschedule_offschedule_datetimes,
+)
+from visit_schedule_app.models import OffSchedule, SubjectConsent
+from visit_schedule_app.visit_schedule import visit_schedule
+
+travel_datetime = datetime(2019, 4, 1, 8, 00, tzinfo=ZoneInfo("UTC"))
+
+
+@time_machine.travel(travel_datetime)
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=travel_datetime - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=travel_datetime + relativedelta(years=1),
+    SITE_ID=30,
+)
+class TestSubjectScheduleCache(SiteTestCaseMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        import_holidays()
+
+    def setUp(self):
+        site_visit_schedules.loaded = False
+        site_visit_schedules._registry = {}
+        site_consents.registry = {}
+        consent_v1 = ConsentDefinition(
+            "visit_schedule_app.subjectconsentv1",
+            version="1",
+            start=ResearchProtocolConfig().study_open_datetime,
+            end=ResearchProtocolConfig().study_close_datetime,
+            age_min=18,
+            age_is_adult=18,
+            age_max=64,
+            gender=[MALE, FEMALE],
+        )
+        site_consents.register(consent_v1)
+        self.schedule = visit_schedule.schedules["schedule"]
+        self.schedule.consent_definitions = [consent_v1]
+        site_visit_schedules.register(visit_schedule)
+        self.subject_identifier = "111111"
+        self.onschedule_datetime = get_utcnow() - relativedelta(months=2)
+        SubjectConsent.objects.create(
+            subject_identifier=self.subject_identifier,
+            consent_datetime=get_utcnow() - relativedelta(years=1),
+        )
+        self.schedule.put_on_schedule(self.subject_identifier, self.onschedule_datetime)
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            interval = get_schedule_interval(self.schedule, self.subject_identifier)
+        self.assertEqual(interval, ScheduleInterval(self.onschedule_datetime, None))
+        self.assertIsNone(get_schedule_interval(self.schedule, "222222"))
+
+    def test_cached_within_block(self):
+        subject_schedule = self.schedule.subject(self.subject_identifier)
+        report_datetime = self.onschedule_datetime + relativedelta(days=1)
+        with subject_schedule_cache():
+            with self.assertNumQueries(1):
+                subject_schedule.onschedule_or_raise(report_datetime=report_datetime)
+                report_datetime_within_onschedule_offschedule_datetimes(
+                    subject_identifier=self.subject_identifier,
+                    report_datetime=report_datetime,
+                    visit_schedule_name=visit_schedule.name,
+                    schedule_name=self.schedule.name,
+                    exception_cls=forms.ValidationError,
+                )
+                subject_schedule.onschedule_or_raise(report_datetime=report_datetime)
+        with self.assertNumQueries(1):
+            subject_schedule.onschedule_or_raise(report_datetime=report_datetime)
+
+    def test_invalidated_on_offschedule(self):
+        subject_schedule = self.schedule.subject(self.subject_identifier)
+        offschedule_datetime = self.onschedule_datetime + relativedelta(days=10)
+        report_datetime = offschedule_datetime + relativedelta(days=1)
+        with subject_schedule_cache():
+            subject_schedule.onschedule_or_raise(report_datetime=report_datetime)
+            OffSchedule.objects.create(
+                subject_identifier=self.subject_identifier,
+                offschedule_datetime=offschedule_datetime,
+            )
+            self.assertRaises(
+                NotOnScheduleForDateError,
+                subject_schedule.onschedule_or_raise,
+                report_datetime=report_datetime,
+            )
+            OffSchedule.objects.get(subject_identifier=self.subject_identifier).delete()
+            subject_schedule.onschedule_or_raise(report_datetime=report_datetime)
+
+    def test_invalidated_on_bulk_write(self):
+        subject_identifier = "222222"
+        SubjectConsent.objects.create(
+            subject_identifier=subject_identifier,
+            consent_datetime=get_utcnow() - relativedelta(years=1),
+        )
+        offschedule_datetime = self.onschedule_datetime + relativedelta(days=10)
+        with subject_schedule_cache():
+            self.assertIsNone(get_schedule_interval(self.schedule, subject_identifier))
+            result = self.schedule.put_on_schedule_bulk(
+                [(subject_identifier, self.onschedule_datetime)]
+            )
+            self.assertEqual(result.succeeded, [subject_identifier])
+            self.assertEqual(
+                get_schedule_interval(self.schedule, subject_identifier),
+                ScheduleInterval(self.onschedule_datetime, None),
+            )
+            result = self.schedule.take_off_schedule_bulk(
+                [(subject_identifier, offschedule_datetime)]
+            )
+            self.assertEqual(result.succeeded, [subject_identifier])
+            self.assertEqual(
+                get_schedule_interval(self.schedule, subject_identifier),
+                ScheduleInterval(self.onschedule_datetime, offschedule_datetime),
+            )
+
+    def test_middleware(self):
+        def get_response(request):
+            for _ in range(3):
+                get_schedule_interval(self.schedule, self.subject_identifier)
+
+        middleware = SubjectScheduleCacheMiddleware(get_response)
+        with self.assertNumQueries(1):
+            middleware(RequestFactory().get("/"))
@@ -0,0 +1,74 @@
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase
+from edc_utils import get_utcnow
+
+from edc_visit_schedule.schedule import Schedule, SubjectVisitCollection
+from edc_visit_schedule.schedule.visit_collection import VisitCollectionError
+from edc_visit_schedule.visit import Visit
+from visit_schedule_app.consents import consent_v1
+
+
+class TestSubjectVisitCollection(TestCase):
+    def setUp(self):
+        self.schedule = Schedule(
+            name="schedule",
+            onschedule_model="visit_schedule_app.onschedule",
+            offschedule_model="visit_schedule_app.offschedule",
+            consent_definitions=[consent_v1],
+            appointment_model="edc_appointment.appointment",
+        )
+        for i in range(0, 5):
+            self.schedule.add_visit(
+                visit=Visit(
+                    code=str(i),
+                    timepoint=i,
+                    rbase=relativedelta(days=i),
+                    rlower=relativedelta(days=0),
+                    rupper=relativedelta(days=0),
+                )
+            )
+
+    def test_shares_visits(self):
+        visits = SubjectVisitCollection(self.schedule.visits)
+        self.assertEqual(list(visits), ["0", "1", "2", "3", "4"])
+        self.assertEqual(len(visits), 5)
+        for code, visit in visits.items():
+            self.assertIs(visit, self.schedule.visits.get(code))
+        self.assertEqual(visits.first.code, "0")
+        self.assertEqual(visits.last.code, "4")
+
+    def test_delete_excludes_without_changing_schedule(self):
+        visits = SubjectVisitCollection(self.schedule.visits)
+        del visits["2"]
+        del visits["4"]
+        self.assertEqual(list(visits), ["0", "1", "3"])
+        self.assertEqual(len(visits), 3)
+        self.assertNotIn("2", visits)
+        self.assertEqual(visits.excluded, {"2", "4"})
+        self.assertEqual(visits.next("1").code, "3")
+        self.assertEqual(visits.previous("3").code, "1")
+        self.assertIsNone(visits.next("3"))
+        self.assertEqual(visits.last.code, "3")
+        self.assertRaises(VisitCollectionError, visits.get, "2")
+        with self.assertRaises(KeyError):
+            del visits["2"]
+        self.assertEqual(list(self.schedule.visits), ["0", "1", "2", "3", "4"])
+
+    def test_timepoint_dates_does_not_change_visits(self):
+        self.schedule.visits.timepoint_dates(dt=get_utcnow())
+        timepoint_datetime = self.schedule.visits.get("1").timepoint_datetime
+        visits = SubjectVisitCollection(self.schedule.visits)
+        del visits["2"]
+        dt = get_utcnow() - relativedelta(years=1)
+        timepoint_dates = visits.timepoint_dates(dt=dt)
+        self.assertEqual([v.code for v in timepoint_dates], ["0", "1", "3", "4"])
+        self.assertEqual(timepoint_dates[visits.get("3")], dt + relativedelta(days=3))
+        self.assertEqual(self.schedule.visits.get("1").timepoint_datetime, timepoint_datetime)
+
+    def test_timepoints(self):
+        visits = SubjectVisitCollection(self.schedule.visits)
+        del visits["0"]
+        self.assertEqual(
+            {v.code: tp for v, tp in visits.timepoints.items()},
+            {v.code: tp for v, tp in self.schedule.visits.timepoints.items() if v.code != "0"},
+        )
@@ -1,17 +1,43 @@
+from datetime import datetime
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from zoneinfo import ZoneInfo
+
+import time_machine
 from dateutil.relativedelta import relativedelta
 from django.apps import apps as django_apps
-from django.test import TestCase
-
+from django.core.checks.registry import registry
+from django.core.management import CommandError, call_command
+from django.core.management.base import SystemCheckError
+from django.test import TestCase, override_settings
+from edc_consent.consent_definition import ConsentDefinition
+from edc_consent.site_consents import site_consents
+from edc_constants.constants import FEMALE, MALE
+from edc_facility.import_holidays import import_holidays
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_sites.tests import SiteTestCaseMixin
+from edc_utils import get_utcnow
+
+from edc_visit_schedule.models import SubjectScheduleHistory
 from edc_visit_schedule.schedule import Schedule
 from edc_visit_schedule.site_visit_schedules import site_visit_schedules
 from edc_visit_schedule.system_checks import (
+    DATA_TAG,
+    STRUCTURE_TAG,
     check_form_collections,
+    check_onschedule_exists_in_subject_schedule_history,
+    check_subject_schedule_history,
     visit_schedule_check,
 )
 from edc_visit_schedule.visit import CrfCollection, FormsCollectionError, Visit
 from edc_visit_schedule.visit.crf import Crf
 from edc_visit_schedule.visit_schedule import VisitSchedule
 from visit_schedule_app.consents import consent_v1
+from visit_schedule_app.models import OnSchedule, SubjectConsent
+from visit_schedule_app.visit_schedule import visit_schedule as app_visit_schedule
+
+travel_datetime = datetime(2019, 4, 1, 8, 00, tzinfo=ZoneInfo("UTC"))
 
 
 class TestSystemChecks(TestCase):
@@ -1784,3 +1810,184 @@ class TestSystemChecks(TestCase):
             ),
             fc_errors[2].msg,
         )
+
+
+class SubjectScheduleHistoryTestMixin:
+    """Puts subjects 111111, 222222 and 333333 on schedule."""
+
+    @classmethod
+    def setUpTestData(cls):
+        import_holidays()
+
+    def setUp(self):
+        site_visit_schedules.loaded = False
+        site_visit_schedules._registry = {}
+        site_consents.registry = {}
+        consent_definition = ConsentDefinition(
+            "visit_schedule_app.subjectconsentv1",
+            version="1",
+            start=ResearchProtocolConfig().study_open_datetime,
+            end=ResearchProtocolConfig().study_close_datetime,
+            age_min=18,
+            age_is_adult=18,
+            age_max=64,
+            gender=[MALE, FEMALE],
+        )
+        site_consents.register(consent_definition)
+        schedule = app_visit_schedule.schedules["schedule"]
+        schedule.consent_definitions = [consent_definition]
+        site_visit_schedules.register(app_visit_schedule)
+        for subject_identifier in ["111111", "222222", "333333"]:
+            SubjectConsent.objects.create(
+                subject_identifier=subject_identifier,
+                consent_datetime=get_utcnow() - relativedelta(years=1),
+            )
+            schedule.put_on_schedule(
+                subject_identifier, get_utcnow() - relativedelta(months=2)
+            )
+
+
+@time_machine.travel(travel_datetime)
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=travel_datetime - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=travel_datetime + relativedelta(years=1),
+    SITE_ID=30,
+)
+class TestSubjectScheduleHistorySystemChecks(
+    SubjectScheduleHistoryTestMixin, SiteTestCaseMixin, TestCase
+):
+    def test_ok(self):
+        with self.assertNumQueries(2):
+            self.assertEqual(
+                check_subject_schedule_history(app_configs=None, databases=["default"]), []
+            )
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                check_onschedule_exists_in_subject_schedule_history(
+                    app_configs=None, databases=["default"]
+                ),
+                [],
+            )
+
+    def test_data_checks_need_databases(self):
+        SubjectScheduleHistory.objects.filter(subject_identifier="222222").delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(check_subject_schedule_history(app_configs=None), [])
+            self.assertEqual(
+                check_onschedule_exists_in_subject_schedule_history(app_configs=None), []
+            )
+
+    def create_invalid_history(self, subject_identifier: str) -> SubjectScheduleHistory:
+        history = SubjectScheduleHistory.objects.get(subject_identifier="222222")
+        return SubjectScheduleHistory.objects.create(
+            subject_identifier=subject_identifier,
+            visit_schedule_name=history.visit_schedule_name,
+            schedule_name=history.schedule_name,
+            onschedule_model=history.onschedule_model,
+            offschedule_model=history.offschedule_model,
+            onschedule_datetime=history.onschedule_datetime,
+        )
+
+    def test_data_checks_command(self):
+        with TemporaryDirectory() as folder:
+            path = Path(folder) / "checkpoint.json"
+            call_command("visit_schedule_data_checks", checkpoint=path, stdout=StringIO())
+            self.assertTrue(path.exists())
+            obj = self.create_invalid_history("444444")
+            with self.assertRaises(CommandError):
+                call_command("visit_schedule_data_checks", checkpoint=path, stdout=StringIO())
+            # still found, the history count changed since the checkpoint
+            SubjectScheduleHistory.objects.filter(id=obj.id).update(
+                modified=get_utcnow() - relativedelta(days=1)
+            )
+            with self.assertRaises(CommandError):
+                call_command("visit_schedule_data_checks", checkpoint=path, stdout=StringIO())
+            obj.delete()
+            call_command("visit_schedule_data_checks", checkpoint=path, stdout=StringIO())
+            stdout = StringIO()
+            call_command("visit_schedule_data_checks", checkpoint=path, stdout=stdout)
+            self.assertIn("since", stdout.getvalue())
+            self.assertIn(": none.", stdout.getvalue())
+
+    def test_data_checks_command_finds_deleted_history(self):
+        with TemporaryDirectory() as folder:
+            path = Path(folder) / "checkpoint.json"
+            call_command("visit_schedule_data_checks", checkpoint=path, stdout=StringIO())
+            # the onschedule instance is not modified
+            SubjectScheduleHistory.objects.filter(subject_identifier="222222").delete()
+            with self.assertRaises(CommandError):
+                call_command("visit_schedule_data_checks", checkpoint=path, stdout=StringIO())
+
+    def test_check_command_with_data_tag(self):
+        self.assertIn(DATA_TAG, registry.tags_available())
+        self.assertIn(STRUCTURE_TAG, registry.tags_available())
+        call_command("check", tags=[DATA_TAG], databases=["default"], stdout=StringIO())
+        SubjectScheduleHistory.objects.filter(subject_identifier="222222").delete()
+        with self.assertRaises(SystemCheckError) as cm:
+            call_command("check", tags=[DATA_TAG], databases=["default"], stdout=StringIO())
+        self.assertIn("222222", str(cm.exception))
+
+    def test_history_without_onschedule(self):
+        history = SubjectScheduleHistory.objects.get(subject_identifier="222222")
+        SubjectScheduleHistory.objects.create(
+            subject_identifier="444444",
+            visit_schedule_name=history.visit_schedule_name,
+            schedule_name=history.schedule_name,
+            onschedule_model=history.onschedule_model,
+            offschedule_model=history.offschedule_model,
+            onschedule_datetime=history.onschedule_datetime,
+        )
+        SubjectScheduleHistory.objects.create(
+            subject_identifier="555555",
+            visit_schedule_name=history.visit_schedule_name,
+            schedule_name=history.schedule_name,
+            onschedule_model="visit_schedule_app.blah",
+            offschedule_model=history.offschedule_model,
+            onschedule_datetime=history.onschedule_datetime,
+        )
+        errors = check_subject_schedule_history(app_configs=None, databases=["default"])
+        self.assertEqual(len(errors), 2)
+        self.assertEqual(
+            sorted([(e.id, "444444" in e.msg, "555555" in e.msg) for e in errors]),
+            [
+                ("edc_visit_schedule.E005", False, True),
+                ("edc_visit_schedule.E005", True, False),
+            ],
+        )
+
+    def test_onschedule_without_history(self):
+        SubjectScheduleHistory.objects.filter(subject_identifier="222222").delete()
+        errors = check_onschedule_exists_in_subject_schedule_history(
+            app_configs=None, databases=["default"]
+        )
+        self.assertEqual(len(errors), 1)
+        self.assertIn("222222", errors[0].msg)
+
+
+@time_machine.travel(travel_datetime)
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=travel_datetime - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=travel_datetime + relativedelta(years=1),
+    SITE_ID=30,
+)
+class TestFindInvalidOnschedulesCommand(
+    SubjectScheduleHistoryTestMixin, SiteTestCaseMixin, TestCase
+):
+    def test_find_invalid_onschedules_command(self):
+        SubjectScheduleHistory.objects.filter(
+            subject_identifier__in=["111111", "222222"]
+        ).delete()
+        stdout = StringIO()
+        call_command("find_invalid_onschedules", stdout=stdout)
+        self.assertIn(
+            "visit_schedule_app.onschedule for 222222 is invalid.", stdout.getvalue()
+        )
+        self.assertIn("Found 2 invalid instance(s)", stdout.getvalue())
+        self.assertEqual(OnSchedule.objects.count(), 3)
+        stdout = StringIO()
+        call_command("find_invalid_onschedules", delete=True, batch_size=1, stdout=stdout)
+        self.assertIn("visit_schedule_app.onschedule: deleted 1/2.", stdout.getvalue())
+        self.assertIn("visit_schedule_app.onschedule: deleted 2/2.", stdout.getvalue())
+        self.assertEqual(
+            list(OnSchedule.objects.values_list("subject_identifier", flat=True)), ["333333"]
+        )
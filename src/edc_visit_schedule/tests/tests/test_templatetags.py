@@ -0,0 +1,148 @@
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+import time_machine
+from dateutil.relativedelta import relativedelta
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from edc_consent.consent_definition import ConsentDefinition
+from edc_consent.site_consents import site_consents
+from edc_constants.constants import FEMALE, MALE
+from edc_facility.import_holidays import import_holidays
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_sites.tests import SiteTestCaseMixin
+from edc_utils import get_utcnow
+
+from edc_visit_schedule.schedule import Schedule
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from edc_visit_schedule.subject_schedule_footer import SubjectScheduleFooters
+from edc_visit_schedule.visit_schedule import VisitSchedule
+from visit_schedule_app.models import SubjectConsent
+
+TEMPLATE = (
+    "{% load edc_visit_schedule_extras %}"
+    "{% for schedule in schedules %}"
+    "{% subject_schedule_footer_row subject_identifier visit_schedule schedule url %}"
+    "{% endfor %}"
+)
+
+
+travel_datetime = datetime(2019, 4, 1, 8, 00, tzinfo=ZoneInfo("UTC"))
+
+
+@time_machine.travel(travel_datetime)
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=travel_datetime - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=travel_datetime + relativedelta(years=1),
+    SITE_ID=30,
+    ROOT_URLCONF="visit_schedule_app.urls",
+)
+class TestSubjectScheduleFooterRow(SiteTestCaseMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        import_holidays()
+
+    def setUp(self):
+        consent_v1 = ConsentDefinition(
+            "visit_schedule_app.subjectconsentv1",
+            version="1",
+            start=ResearchProtocolConfig().study_open_datetime,
+            end=ResearchProtocolConfig().study_close_datetime,
+            age_min=18,
+            age_is_adult=18,
+            age_max=64,
+            gender=[MALE, FEMALE],
+        )
+        site_consents.registry = {}
+        site_consents.register(consent_v1)
+        self.visit_schedule = VisitSchedule(
+            name="visit_schedule",
+            verbose_name="Visit Schedule",
+            offstudy_model="visit_schedule_app.subjectoffstudy",
+            death_report_model="visit_schedule_app.deathreport",
+        )
+        self.schedule = Schedule(
+            name="schedule",
+            onschedule_model="visit_schedule_app.onschedule",
+            offschedule_model="visit_schedule_app.offschedule",
+            appointment_model="edc_appointment.appointment",
+            consent_definitions=[consent_v1],
+        )
+        self.schedule3 = Schedule(
+            name="schedule_three",
+            onschedule_model="visit_schedule_app.onschedulethree",
+            offschedule_model="visit_schedule_app.offschedulethree",
+            appointment_model="edc_appointment.appointment",
+            consent_definitions=[consent_v1],
+        )
+        self.visit_schedule.add_schedule(self.schedule)
+        self.visit_schedule.add_schedule(self.schedule3)
+        site_visit_schedules._registry = {}
+        site_visit_schedules.register(self.visit_schedule)
+        self.subject_identifier = "12345"
+        SubjectConsent.objects.create(
+            subject_identifier=self.subject_identifier,
+            consent_datetime=get_utcnow() - relativedelta(days=10),
+            dob=date(1995, 1, 1),
+            identity="11111",
+            confirm_identity="11111",
+        )
+        self.onschedule_datetime = get_utcnow() - relativedelta(days=10)
+        self.schedule.put_on_schedule(
+            subject_identifier=self.subject_identifier,
+            onschedule_datetime=self.onschedule_datetime,
+        )
+
+    def get_context(self, **kwargs) -> Context:
+        return Context(
+            dict(
+                subject_identifier=self.subject_identifier,
+                visit_schedule=self.visit_schedule,
+                schedules=[self.schedule, self.schedule3],
+                url="subject_dashboard_url",
+                **kwargs,
+            )
+        )
+
+    def test_footer_context_on_schedule(self):
+        footers = SubjectScheduleFooters(self.subject_identifier)
+        context = footers.get_context(self.visit_schedule, self.schedule, "dashboard_url")
+        self.assertEqual(context["history_obj"].schedule_name, "schedule")
+        self.assertEqual(context["onschedule_datetime"], self.onschedule_datetime)
+        self.assertIsNone(context["offschedule_datetime"])
+        self.assertIn(
+            "?next=dashboard_url,subject_identifier&subject_identifier=12345",
+            context["href"],
+        )
+
+    def test_footer_context_never_on_schedule(self):
+        footers = SubjectScheduleFooters(self.subject_identifier)
+        context = footers.get_context(self.visit_schedule, self.schedule3, "dashboard_url")
+        self.assertIsNone(context.get("history_obj"))
+        self.assertIsNone(context["href"])
+
+    def test_footer_context_off_schedule(self):
+        offschedule_datetime = get_utcnow() - relativedelta(days=1)
+        self.schedule.take_off_schedule(self.subject_identifier, offschedule_datetime)
+        footers = SubjectScheduleFooters(self.subject_identifier)
+        context = footers.get_context(self.visit_schedule, self.schedule, "dashboard_url")
+        self.assertEqual(context["offschedule_datetime"], offschedule_datetime)
+        self.assertEqual(
+            context["href"].split("?")[0],
+            self.schedule.offschedule_model_cls.objects.get(
+                subject_identifier=self.subject_identifier
+            ).get_absolute_url(),
+        )
+
+    def test_footer_rows_load_once_per_page(self):
+        # one query for history and one for the onschedule model
+        with self.assertNumQueries(2):
+            rendered = Template(TEMPLATE).render(self.get_context())
+        self.assertIn("Subject was put on this schedule", rendered)
+        self.assertEqual(rendered.count("panel-footer"), 1)
+
+    def test_footer_rows_use_preloaded_footers(self):
+        footers = SubjectScheduleFooters(self.subject_identifier)
+        footers.data
+        with self.assertNumQueries(0):
+            Template(TEMPLATE).render(self.get_context(subject_schedule_footers=footers))
@@ -3,6 +3,7 @@ from zoneinfo import ZoneInfo
 
 import time_machine
 from dateutil.relativedelta import relativedelta
+from django import forms
 from django.test import TestCase, override_settings
 from edc_appointment.models import Appointment
 from edc_consent.consent_definition import ConsentDefinition
@@ -14,13 +15,28 @@ from edc_sites.tests import SiteTestCaseMixin
 from edc_utils import get_utcnow
 from edc_visit_tracking.constants import SCHEDULED
 
-from edc_visit_schedule.baseline import VisitScheduleBaselineError
+from edc_visit_schedule.baseline import (
+    VisitScheduleBaselineError,
+    annotate_is_baseline,
+    get_baseline_flags,
+)
+from edc_visit_schedule.constants import OFF_SCHEDULE, ON_SCHEDULE
+from edc_visit_schedule.exceptions import OffScheduleError
+from edc_visit_schedule.models import SubjectScheduleHistory
 from edc_visit_schedule.schedule import Schedule
 from edc_visit_schedule.site_visit_schedules import site_visit_schedules
-from edc_visit_schedule.utils import get_duplicates, is_baseline
+from edc_visit_schedule.utils import (
+    get_duplicates,
+    is_baseline,
+    off_all_schedules_or_raise,
+    offstudy_datetime_after_all_offschedule_datetimes,
+)
 from edc_visit_schedule.visit import Visit
 from edc_visit_schedule.visit_schedule import VisitSchedule
-from visit_schedule_app.models import SubjectVisit
+from visit_schedule_app.models import OffSchedule, SubjectConsent, SubjectVisit
+from visit_schedule_app.visit_schedule import visit_schedule as app_visit_schedule
+
+travel_datetime = datetime(2019, 4, 1, 8, 00, tzinfo=ZoneInfo("UTC"))
 
 
 @time_machine.travel(datetime(2019, 4, 1, 8, 00, tzinfo=ZoneInfo("UTC")))
@@ -192,6 +208,52 @@ class TestVisitSchedule4(SiteTestCaseMixin, TestCase):
             )
         self.assertIn("Unknown timepoint", str(cm.exception))
 
+    def test_get_baseline_flags(self):
+        SubjectVisit.objects.create(
+            appointment=self.appointments[0],
+            subject_identifier=self.subject_identifier,
+            report_datetime=self.appointments[0].appt_datetime,
+            reason=SCHEDULED,
+        )
+        subject_visit_1 = SubjectVisit.objects.create(
+            appointment=self.appointments[1],
+            subject_identifier=self.subject_identifier,
+            report_datetime=self.appointments[1].appt_datetime,
+            reason=SCHEDULED,
+        )
+        self.assertEqual(get_baseline_flags(self.appointments), [True, False])
+        self.assertEqual(get_baseline_flags([subject_visit_1]), [False])
+        self.assertEqual(
+            get_baseline_flags(self.appointments),
+            [is_baseline(instance=obj) for obj in self.appointments],
+        )
+        appointment = self.appointments[0]
+        appointment.timepoint = 100
+        with self.assertRaises(VisitScheduleBaselineError) as cm:
+            get_baseline_flags([appointment])
+        self.assertIn("Unknown timepoint", str(cm.exception))
+
+    def test_annotate_is_baseline(self):
+        subject_visit_0 = SubjectVisit.objects.create(
+            appointment=self.appointments[0],
+            subject_identifier=self.subject_identifier,
+            report_datetime=self.appointments[0].appt_datetime,
+            reason=SCHEDULED,
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                [obj.is_baseline for obj in annotate_is_baseline(self.appointments)],
+                [True, False],
+            )
+        self.assertTrue(
+            annotate_is_baseline(
+                SubjectVisit.objects.filter(id=subject_visit_0.id),
+                lookup_prefix="appointment__",
+            )
+            .get()
+            .is_baseline
+        )
+
     def test_get_duplicates_returns_duplicates(self):
         self.assertListEqual(get_duplicates(["one", "one"]), ["one"])
         self.assertListEqual(get_duplicates(["one", "one", "two"]), ["one"])
@@ -221,3 +283,139 @@ class TestVisitSchedule4(SiteTestCaseMixin, TestCase):
 
         self.assertListEqual(get_duplicates([1]), [])
         self.assertListEqual(get_duplicates([1, 2, 3]), [])
+
+
+@time_machine.travel(travel_datetime)
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=travel_datetime - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=travel_datetime + relativedelta(years=1),
+    SITE_ID=30,
+)
+class TestOffAllSchedules(SiteTestCaseMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        import_holidays()
+
+    def setUp(self):
+        site_visit_schedules.loaded = False
+        site_visit_schedules._registry = {}
+        site_consents.registry = {}
+        consent_v1 = ConsentDefinition(
+            "visit_schedule_app.subjectconsentv1",
+            version="1",
+            start=ResearchProtocolConfig().study_open_datetime,
+            end=ResearchProtocolConfig().study_close_datetime,
+            age_min=18,
+            age_is_adult=18,
+            age_max=64,
+            gender=[MALE, FEMALE],
+        )
+        site_consents.register(consent_v1)
+        schedule = app_visit_schedule.schedules["schedule"]
+        schedule.consent_definitions = [consent_v1]
+        site_visit_schedules.register(app_visit_schedule)
+        self.subject_identifier = "111111"
+        self.onschedule_datetime = get_utcnow() - relativedelta(months=2)
+        SubjectConsent.objects.create(
+            subject_identifier=self.subject_identifier,
+            consent_datetime=get_utcnow() - relativedelta(years=1),
+        )
+        schedule.put_on_schedule(self.subject_identifier, self.onschedule_datetime)
+        self.offschedule_datetime = self.onschedule_datetime + relativedelta(days=10)
+
+    def test_off_all_schedules_or_raise(self):
+        for use_history in [True, False]:
+            with self.subTest(use_history=use_history):
+                self.assertRaises(
+                    OffScheduleError,
+                    off_all_schedules_or_raise,
+                    subject_identifier=self.subject_identifier,
+                    use_history=use_history,
+                )
+        OffSchedule.objects.create(
+            subject_identifier=self.subject_identifier,
+            offschedule_datetime=self.offschedule_datetime,
+        )
+        with self.assertNumQueries(1):
+            self.assertTrue(off_all_schedules_or_raise(self.subject_identifier))
+        self.assertTrue(off_all_schedules_or_raise(self.subject_identifier, use_history=False))
+
+    def test_off_all_schedules_or_raise_history_out_of_sync(self):
+        OffSchedule.objects.create(
+            subject_identifier=self.subject_identifier,
+            offschedule_datetime=self.offschedule_datetime,
+        )
+        SubjectScheduleHistory.objects.filter(
+            subject_identifier=self.subject_identifier
+        ).update(schedule_status=ON_SCHEDULE, offschedule_datetime=None)
+        self.assertTrue(off_all_schedules_or_raise(self.subject_identifier))
+
+    def test_off_all_schedules_or_raise_history_missing(self):
+        """Asserts a schedule without a history instance is read
+        as never on-schedule.
+        """
+        SubjectScheduleHistory.objects.filter(
+            subject_identifier=self.subject_identifier
+        ).delete()
+        with self.assertNumQueries(1):
+            self.assertTrue(off_all_schedules_or_raise(self.subject_identifier))
+
+    def test_off_all_schedules_or_raise_history_for_other_models(self):
+        SubjectScheduleHistory.objects.filter(
+            subject_identifier=self.subject_identifier
+        ).update(
+            onschedule_model="visit_schedule_app.onscheduletwo",
+            schedule_status=OFF_SCHEDULE,
+            offschedule_datetime=self.offschedule_datetime,
+        )
+        self.assertRaises(
+            OffScheduleError, off_all_schedules_or_raise, self.subject_identifier
+        )
+
+    def test_off_all_schedules_or_raise_history_off_without_offschedule_datetime(self):
+        SubjectScheduleHistory.objects.filter(
+            subject_identifier=self.subject_identifier
+        ).update(schedule_status=OFF_SCHEDULE, offschedule_datetime=None)
+        self.assertRaises(
+            OffScheduleError, off_all_schedules_or_raise, self.subject_identifier
+        )
+
+    def test_offstudy_datetime_after_all_offschedule_datetimes_history_for_other_models(self):
+        OffSchedule.objects.create(
+            subject_identifier=self.subject_identifier,
+            offschedule_datetime=self.offschedule_datetime,
+        )
+        SubjectScheduleHistory.objects.filter(
+            subject_identifier=self.subject_identifier
+        ).update(offschedule_model="visit_schedule_app.offscheduletwo")
+        self.assertRaises(
+            forms.ValidationError,
+            offstudy_datetime_after_all_offschedule_datetimes,
+            subject_identifier=self.subject_identifier,
+            offstudy_datetime=self.offschedule_datetime - relativedelta(days=1),
+        )
+
+    def test_offstudy_datetime_after_all_offschedule_datetimes(self):
+        OffSchedule.objects.create(
+            subject_identifier=self.subject_identifier,
+            offschedule_datetime=self.offschedule_datetime,
+        )
+        for use_history in [True, False]:
+            with self.subTest(use_history=use_history):
+                self.assertRaises(
+                    forms.ValidationError,
+                    offstudy_datetime_after_all_offschedule_datetimes,
+                    subject_identifier=self.subject_identifier,
+                    offstudy_datetime=self.offschedule_datetime - relativedelta(days=1),
+                    use_history=use_history,
+                )
+                offstudy_datetime_after_all_offschedule_datetimes(
+                    subject_identifier=self.subject_identifier,
+                    offstudy_datetime=self.offschedule_datetime,
+                    use_history=use_history,
+                )
+        with self.assertNumQueries(1):
+            offstudy_datetime_after_all_offschedule_datetimes(
+                subject_identifier=self.subject_identifier,
+                offstudy_datetime=self.offschedule_datetime + relativedelta(days=1),
+            )
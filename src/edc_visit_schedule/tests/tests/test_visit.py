@@ -5,7 +5,7 @@ from arrow import Arrow
 from dateutil.relativedelta import relativedelta
 from django.test import TestCase
 
-from edc_visit_schedule.visit import Visit, VisitCodeError, WindowPeriod
+from edc_visit_schedule.visit import Visit, VisitCodeError, WindowBounds, WindowPeriod
 from edc_visit_schedule.visit.visit import BaseDatetimeNotSet
 
 
@@ -147,6 +147,14 @@ class TestVisit(TestCase):
             ).datetime,
         )
 
+    def test_window_period_result_type(self):
+        wp = WindowPeriod(rlower=relativedelta(days=0), rupper=relativedelta(days=6))
+        dt = Arrow.fromdatetime(datetime(2001, 12, 1), tzinfo="utc").datetime
+        self.assertIsInstance(wp.get_window(dt), WindowBounds)
+        self.assertIs(type(wp.get_window(dt)), type(wp.get_window(dt)))
+        lower, upper = wp.get_window(dt)
+        self.assertEqual(lower, dt)
+
     def test_window_period_weeks(self):
         wp = WindowPeriod(rlower=relativedelta(weeks=1), rupper=relativedelta(weeks=6))
         dt = Arrow.fromdatetime(datetime(2001, 12, 8), tzinfo="utc").datetime
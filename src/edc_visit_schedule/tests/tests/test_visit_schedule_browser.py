@@ -0,0 +1,132 @@
+import json
+
+from django.contrib.auth.models import User
+from django.http import Http404
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.urls import resolve
+
+from edc_visit_schedule.schedule import Schedule
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from edc_visit_schedule.views import VisitScheduleJsonView
+from edc_visit_schedule.visit import Crf, CrfCollection, Visit
+from edc_visit_schedule.visit_schedule_browser import (
+    get_browser_cache,
+    get_schedule_data,
+    get_schedule_fingerprint,
+    render_schedule_fragment,
+)
+from visit_schedule_app.consents import consent_v1
+from visit_schedule_app.visit_schedule import visit_schedule
+
+
+class TestVisitScheduleBrowser(TestCase):
+    def setUp(self):
+        get_browser_cache().clear()
+        site_visit_schedules._registry = {}
+        site_visit_schedules.register(visit_schedule)
+        self.schedule = visit_schedule.schedules.get("schedule")
+
+    def tearDown(self):
+        get_browser_cache().clear()
+
+    def test_schedule_data(self):
+        data = get_schedule_data(visit_schedule, self.schedule)
+        self.assertEqual(data["schedule_verbose_name"], self.schedule.verbose_name)
+        self.assertEqual(
+            [visit["code"] for visit in data["visits"]], ["1000", "2000", "3000", "4000"]
+        )
+        self.assertEqual(
+            data["visits"][0]["crfs"],
+            [
+                dict(
+                    show_order=1,
+                    model="visit_schedule_app.crfone",
+                    verbose_name="crf one",
+                    required=True,
+                )
+            ],
+        )
+        json.dumps(data)
+
+    def test_schedule_data_for_visit_code(self):
+        data = get_schedule_data(visit_schedule, self.schedule, "2000")
+        self.assertEqual([visit["code"] for visit in data["visits"]], ["2000"])
+
+    def test_schedule_data_is_cached(self):
+        data = get_schedule_data(visit_schedule, self.schedule)
+        with self.assertNumQueries(0):
+            self.assertIs(get_schedule_data(visit_schedule, self.schedule), data)
+
+    def test_fingerprint_changes_with_crfs(self):
+        fingerprint = get_schedule_fingerprint(visit_schedule, self.schedule)
+        self.assertEqual(fingerprint, get_schedule_fingerprint(visit_schedule, self.schedule))
+        schedule = Schedule(
+            name="schedule",
+            onschedule_model="visit_schedule_app.onschedule",
+            offschedule_model="visit_schedule_app.offschedule",
+            appointment_model="edc_appointment.appointment",
+            consent_definitions=[consent_v1],
+        )
+        for visit in self.schedule.visits.values():
+            schedule.add_visit(
+                Visit(
+                    code=visit.code,
+                    title=visit.title,
+                    timepoint=visit.timepoint,
+                    rbase=visit.rbase,
+                    rlower=visit.rlower,
+                    rupper=visit.rupper,
+                    crfs=CrfCollection(
+                        Crf(show_order=1, model="visit_schedule_app.crfone"),
+                        Crf(show_order=2, model="visit_schedule_app.crftwo"),
+                    ),
+                )
+            )
+        self.assertNotEqual(fingerprint, get_schedule_fingerprint(visit_schedule, schedule))
+
+    def test_render_schedule_fragment(self):
+        html = render_schedule_fragment(visit_schedule, self.schedule, "1000")
+        self.assertIn("Visit Day 1", html)
+        self.assertNotIn("Visit Day 2", html)
+        self.assertIn("crf one", html)
+
+    def test_urls(self):
+        for url, kwargs in [
+            ("/visit_schedule/", {}),
+            ("/visit_schedule/visit_schedule/", dict(visit_schedule="visit_schedule")),
+            (
+                "/visit_schedule/visit_schedule/schedule/",
+                dict(visit_schedule="visit_schedule", schedule="schedule"),
+            ),
+            (
+                "/visit_schedule/visit_schedule/schedule/1000/",
+                dict(visit_schedule="visit_schedule", schedule="schedule", visit_code="1000"),
+            ),
+        ]:
+            with self.subTest(url=url):
+                match = resolve(url, urlconf="edc_visit_schedule.urls")
+                self.assertEqual(match.url_name, "visit_schedule_url")
+                self.assertEqual(match.kwargs, kwargs)
+        match = resolve(
+            "/visit_schedule/json/visit_schedule/schedule/", urlconf="edc_visit_schedule.urls"
+        )
+        self.assertEqual(match.url_name, "visit_schedule_json_url")
+
+    def test_json_view(self):
+        request = RequestFactory().get("/")
+        request.user = User.objects.create(username="erik")
+        response = VisitScheduleJsonView.as_view()(
+            request, visit_schedule="visit_schedule", schedule="schedule", visit_code="3000"
+        )
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual([visit["code"] for visit in data["visits"]], ["3000"])
+
+    def test_json_view_unknown_schedule(self):
+        request = RequestFactory().get("/")
+        request.user = User.objects.create(username="erik")
+        with self.assertRaises(Http404):
+            VisitScheduleJsonView.as_view()(
+                request, visit_schedule="visit_schedule", schedule="blah"
+            )
@@ -0,0 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase
+
+from edc_visit_schedule.utils import get_lower_datetime, get_upper_datetime
+from edc_visit_schedule.visit import Visit, WindowBounds
+
+
+class TestWindowDates(TestCase):
+    def setUp(self):
+        self.visit = Visit(
+            code="1000",
+            timepoint=1,
+            rbase=relativedelta(months=1),
+            rlower=relativedelta(days=3),
+            rupper=relativedelta(days=7),
+            rupper_late=relativedelta(days=14),
+        )
+        self.dt = datetime(2024, 1, 2, 10, 0, tzinfo=ZoneInfo("UTC"))
+
+    def test_get_window_matches_dates(self):
+        window = self.visit.get_window(self.dt)
+        self.assertIsInstance(window, WindowBounds)
+        self.assertIsNone(self.visit.timepoint_datetime)
+        self.visit.timepoint_datetime = self.dt
+        self.assertEqual(window, (self.visit.dates.lower, self.visit.dates.upper))
+        self.visit.late_dates.base = self.dt
+        self.assertEqual(
+            self.visit.get_late_window(self.dt),
+            (self.visit.late_dates.lower, self.visit.late_dates.upper),
+        )
+
+    def test_get_lower_upper_datetime_do_not_change_visit(self):
+        instance = SimpleNamespace(
+            related_visit=None,
+            visit=self.visit,
+            first=SimpleNamespace(timepoint_datetime=self.dt),
+        )
+        self.assertEqual(get_lower_datetime(instance), self.visit.get_window(self.dt).lower)
+        self.assertEqual(get_upper_datetime(instance), self.visit.get_window(self.dt).upper)
+        self.assertIsNone(self.visit.timepoint_datetime)
+
+    def test_concurrent_windows(self):
+        dts = [self.dt + relativedelta(days=i) for i in range(200)]
+        expected = [self.visit.get_window(dt) for dt in dts]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            windows = list(executor.map(self.visit.get_window, dts))
+        self.assertEqual(windows, expected)
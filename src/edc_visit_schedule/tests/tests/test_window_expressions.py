@@ -0,0 +1,158 @@
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+import time_machine
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase, override_settings
+from edc_appointment.models import Appointment
+from edc_consent.consent_definition import ConsentDefinition
+from edc_consent.site_consents import site_consents
+from edc_constants.constants import FEMALE, MALE
+from edc_facility.import_holidays import import_holidays
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_sites.tests import SiteTestCaseMixin
+from edc_utils import get_utcnow
+
+from edc_visit_schedule.baseline import annotate_is_baseline
+from edc_visit_schedule.model_mixins import VisitScheduleQuerySet
+from edc_visit_schedule.schedule import Schedule
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from edc_visit_schedule.visit import Visit
+from edc_visit_schedule.visit_schedule import VisitSchedule
+from edc_visit_schedule.window_expressions import annotate_window_bounds
+
+travel_datetime = datetime(2019, 4, 1, 8, 00, tzinfo=ZoneInfo("UTC"))
+
+
+@time_machine.travel(travel_datetime)
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=travel_datetime - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=travel_datetime + relativedelta(years=1),
+    SITE_ID=30,
+)
+class TestWindowExpressions(SiteTestCaseMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        import_holidays()
+
+    def setUp(self):
+        self.consent_v1 = ConsentDefinition(
+            "visit_schedule_app.subjectconsentv1",
+            version="1",
+            start=ResearchProtocolConfig().study_open_datetime,
+            end=ResearchProtocolConfig().study_close_datetime,
+            age_min=18,
+            age_is_adult=18,
+            age_max=64,
+            gender=[MALE, FEMALE],
+        )
+        visit_schedule = VisitSchedule(
+            name="visit_schedule",
+            verbose_name="Visit Schedule",
+            offstudy_model="visit_schedule_app.subjectoffstudy",
+            death_report_model="visit_schedule_app.deathreport",
+        )
+        self.schedule = Schedule(
+            name="schedule",
+            onschedule_model="visit_schedule_app.onschedule",
+            offschedule_model="visit_schedule_app.offschedule",
+            appointment_model="edc_appointment.appointment",
+            consent_definitions=[self.consent_v1],
+        )
+        for timepoint, (code, rlower, rupper) in enumerate(
+            [
+                ("1000", relativedelta(days=0), relativedelta(days=6)),
+                ("2000", relativedelta(days=3), relativedelta(months=1)),
+                ("3000", relativedelta(months=1), relativedelta(weeks=1, hours=12)),
+            ]
+        ):
+            self.schedule.add_visit(
+                Visit(
+                    code=code,
+                    timepoint=timepoint,
+                    rbase=relativedelta(months=2 * timepoint),
+                    rlower=rlower,
+                    rupper=rupper,
+                )
+            )
+        visit_schedule.add_schedule(self.schedule)
+        site_visit_schedules._registry = {}
+        site_visit_schedules.register(visit_schedule)
+        site_consents.registry = {}
+        site_consents.register(self.consent_v1)
+        for subject_identifier, days in [("12345", 0), ("12346", 17)]:
+            self.put_on_schedule(
+                subject_identifier, get_utcnow() - relativedelta(months=6, days=days)
+            )
+
+    def put_on_schedule(self, subject_identifier: str, onschedule_datetime: datetime):
+        self.consent_v1.model_cls.objects.create(
+            subject_identifier=subject_identifier,
+            consent_datetime=get_utcnow() - relativedelta(years=1),
+            dob=date(1995, 1, 1),
+            identity=subject_identifier,
+            confirm_identity=subject_identifier,
+            version=self.consent_v1.version,
+        )
+        self.schedule.put_on_schedule(
+            subject_identifier=subject_identifier, onschedule_datetime=onschedule_datetime
+        )
+
+    def test_window_bounds_match_visit(self):
+        appointments = annotate_window_bounds(Appointment.objects.all())
+        self.assertEqual(appointments.count(), 6)
+        for appointment in appointments:
+            with self.subTest(visit_code=appointment.visit_code):
+                window = self.schedule.visits.get(appointment.visit_code).get_window(
+                    appointment.timepoint_datetime
+                )
+                self.assertEqual(appointment.window_lower, window.lower)
+                self.assertEqual(appointment.window_upper, window.upper)
+
+    def test_window_bounds_at_month_end(self):
+        # offsets in months are clamped to the last day of the month,
+        # e.g. 2018-10-31 + 1 month is 2018-11-30
+        self.put_on_schedule("12347", datetime(2018, 8, 31, 8, 0, tzinfo=ZoneInfo("UTC")))
+        appointments = annotate_window_bounds(
+            Appointment.objects.filter(subject_identifier="12347")
+        )
+        self.assertEqual(appointments.count(), 3)
+        for appointment in appointments:
+            with self.subTest(visit_code=appointment.visit_code):
+                window = self.schedule.visits.get(appointment.visit_code).get_window(
+                    appointment.timepoint_datetime
+                )
+                self.assertEqual(appointment.window_lower, window.lower)
+                self.assertEqual(appointment.window_upper, window.upper)
+
+    def test_window_bounds_queries(self):
+        with self.assertNumQueries(1):
+            list(annotate_window_bounds(Appointment.objects.all()))
+
+    def test_filter_on_window_bounds(self):
+        appointment = (
+            Appointment.objects.filter(visit_code="2000")
+            .order_by("timepoint_datetime")
+            .first()
+        )
+        window = self.schedule.visits.get("2000").get_window(appointment.timepoint_datetime)
+        self.assertEqual(
+            annotate_window_bounds(Appointment.objects.all())
+            .filter(window_upper__lte=window.upper)
+            .count(),
+            3,
+        )
+
+    def test_queryset(self):
+        queryset = VisitScheduleQuerySet(model=Appointment)
+        appointments = (
+            queryset.annotate_is_baseline().annotate_window_bounds().order_by("window_lower")
+        )
+        self.assertEqual(
+            [obj.is_baseline for obj in appointments],
+            [obj.visit_code == "1000" for obj in appointments],
+        )
+        self.assertEqual(
+            [obj.pk for obj in appointments],
+            [obj.pk for obj in annotate_is_baseline(appointments)],
+        )
@@ -0,0 +1,131 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase
+
+from edc_visit_schedule.exceptions import (
+    ScheduledVisitWindowError,
+    ScheduleError,
+    UnScheduledVisitWindowError,
+)
+from edc_visit_schedule.schedule import Schedule
+from edc_visit_schedule.visit import Visit
+from visit_schedule_app.consents import consent_v1
+
+
+class TestWindowTable(TestCase):
+    def setUp(self):
+        self.schedule = Schedule(
+            name="schedule",
+            onschedule_model="visit_schedule_app.onschedule",
+            offschedule_model="visit_schedule_app.offschedule",
+            consent_definitions=[consent_v1],
+            appointment_model="edc_appointment.appointment",
+        )
+        for i, add_window_gap_to_lower in [(0, False), (1, True), (2, False)]:
+            self.schedule.add_visit(
+                visit=Visit(
+                    code=f"{i}000",
+                    timepoint=i,
+                    rbase=relativedelta(months=i),
+                    rlower=relativedelta(days=3),
+                    rupper=relativedelta(days=7),
+                    add_window_gap_to_lower=add_window_gap_to_lower,
+                )
+            )
+        self.baseline_datetime = datetime(2024, 1, 2, 10, 0, tzinfo=ZoneInfo("UTC"))
+
+    def test_table(self):
+        table = self.schedule.window_table
+        self.assertEqual(list(table), ["0000", "1000", "2000"])
+        self.assertEqual(table["0000"].next_code, "1000")
+        self.assertIsNone(table["2000"].next_code)
+        self.assertIs(table, self.schedule.window_table)
+
+    def test_table_rebuilt_on_add_visit(self):
+        table = self.schedule.window_table
+        self.schedule.add_visit(
+            visit=Visit(
+                code="3000",
+                timepoint=3,
+                rbase=relativedelta(months=3),
+                rlower=relativedelta(days=3),
+                rupper=relativedelta(days=7),
+            )
+        )
+        self.assertIsNot(table, self.schedule.window_table)
+        self.assertEqual(self.schedule.window_table["2000"].next_code, "3000")
+
+    def test_window_matches_visit_dates(self):
+        for visit in self.schedule.visits.values():
+            timepoint_datetime = self.baseline_datetime + visit.rbase
+            visit.timepoint_datetime = timepoint_datetime
+            self.assertEqual(
+                self.schedule.window_table[visit.code].get_window(timepoint_datetime),
+                (visit.dates.lower, visit.dates.upper),
+            )
+
+    def test_scheduled_in_window(self):
+        timepoint_datetime = self.baseline_datetime + relativedelta(months=1)
+        opts = dict(
+            timepoint_datetime=timepoint_datetime,
+            visit_code="1000",
+            visit_code_sequence=0,
+            baseline_timepoint_datetime=self.baseline_datetime,
+        )
+        self.assertTrue(self.schedule.datetime_in_window(dt=timepoint_datetime, **opts))
+        # gap to next visit is added to the lower bound
+        self.assertTrue(
+            self.schedule.datetime_in_window(
+                dt=timepoint_datetime - relativedelta(days=12), **opts
+            )
+        )
+        self.assertRaises(
+            ScheduledVisitWindowError,
+            self.schedule.datetime_in_window,
+            dt=timepoint_datetime + relativedelta(days=8),
+            **opts,
+        )
+
+    def test_unscheduled_in_window(self):
+        timepoint_datetime = self.baseline_datetime + relativedelta(months=1)
+        opts = dict(
+            timepoint_datetime=timepoint_datetime,
+            visit_code="1000",
+            visit_code_sequence=1,
+            baseline_timepoint_datetime=self.baseline_datetime,
+        )
+        self.assertTrue(
+            self.schedule.datetime_in_window(
+                dt=timepoint_datetime + relativedelta(days=10), **opts
+            )
+        )
+        self.assertRaises(
+            UnScheduledVisitWindowError,
+            self.schedule.datetime_in_window,
+            dt=self.baseline_datetime + relativedelta(months=2),
+            **opts,
+        )
+
+    def test_unknown_visit_code(self):
+        self.assertRaises(
+            ScheduleError,
+            self.schedule.datetime_in_window,
+            dt=self.baseline_datetime,
+            timepoint_datetime=self.baseline_datetime,
+            visit_code="9999",
+            visit_code_sequence=0,
+            baseline_timepoint_datetime=self.baseline_datetime,
+        )
+
+    def test_does_not_set_timepoint_datetime(self):
+        timepoint_datetime = self.baseline_datetime + relativedelta(months=1)
+        self.schedule.datetime_in_window(
+            dt=timepoint_datetime,
+            timepoint_datetime=timepoint_datetime,
+            visit_code="1000",
+            visit_code_sequence=0,
+            baseline_timepoint_datetime=self.baseline_datetime,
+        )
+        self.assertIsNone(self.schedule.visits.get("1000").timepoint_datetime)
@@ -1,30 +1,42 @@
 from django.urls.conf import path, re_path
 
 from .admin_site import edc_visit_schedule_admin
-from .views import HomeView, VisitScheduleView
+from .views import HomeView, VisitScheduleJsonView, VisitScheduleView
 
 app_name = "edc_visit_schedule"
 
 urlpatterns = [
     path("admin/", edc_visit_schedule_admin.urls),
     re_path(
-        r"visit_schedule/(?P<visit_schedule>[0-9A-Za-z_]+)/"
-        "(?P<schedule>^[0-9A-Za-z_]+$)/(?P<visit_code>^[0-9]+$)/",
+        r"^visit_schedule/json/(?P<visit_schedule>[0-9A-Za-z_]+)/"
+        r"(?P<schedule>[0-9A-Za-z_]+)/(?P<visit_code>[0-9A-Za-z_.]+)/$",
+        VisitScheduleJsonView.as_view(),
+        name="visit_schedule_json_url",
+    ),
+    re_path(
+        r"^visit_schedule/json/(?P<visit_schedule>[0-9A-Za-z_]+)/"
+        r"(?P<schedule>[0-9A-Za-z_]+)/$",
+        VisitScheduleJsonView.as_view(),
+        name="visit_schedule_json_url",
+    ),
+    re_path(
+        r"^visit_schedule/(?P<visit_schedule>[0-9A-Za-z_]+)/"
+        r"(?P<schedule>[0-9A-Za-z_]+)/(?P<visit_code>[0-9A-Za-z_.]+)/$",
         VisitScheduleView.as_view(),
         name="visit_schedule_url",
     ),
     re_path(
-        r"visit_schedule/(?P<visit_schedule>[0-9A-Za-z_]+)/(?P<schedule>^[0-9A-Za-z_]+$)/",
+        r"^visit_schedule/(?P<visit_schedule>[0-9A-Za-z_]+)/(?P<schedule>[0-9A-Za-z_]+)/$",
         VisitScheduleView.as_view(),
         name="visit_schedule_url",
     ),
     re_path(
-        r"visit_schedule/(?P<visit_schedule>[0-9A-Za-z_]+)/",
+        r"^visit_schedule/(?P<visit_schedule>[0-9A-Za-z_]+)/$",
         VisitScheduleView.as_view(),
         name="visit_schedule_url",
     ),
     re_path(
-        r"visit_schedule/",
+        r"^visit_schedule/$",
         VisitScheduleView.as_view(),
         name="visit_schedule_url",
     ),
@@ -10,13 +10,14 @@ from django import forms
 from django.apps import apps as django_apps
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
-from django.db import transaction
 from edc_utils import floor_secs, formatted_datetime, to_utc
 from edc_utils.date import to_local
 
 from .baseline import Baseline
+from .constants import OFF_SCHEDULE, ON_SCHEDULE
 from .exceptions import OffScheduleError, OnScheduleError, SiteVisitScheduleError
 from .site_visit_schedules import site_visit_schedules
+from .subject_schedule_cache import ScheduleInterval, get_schedule_interval
 
 if TYPE_CHECKING:
     from django.db import models
@@ -33,19 +34,23 @@ def get_default_max_visit_window_gap():
 
 
 def get_lower_datetime(instance: Appointment) -> datetime:
-    """Returns the datetime of the lower window"""
+    """Returns the datetime of the lower window.
+
+    Does not change the visit object shared through the registry.
+    """
     if instance.related_visit:
         dte = instance.appt_datetime
     else:
-        instance.visit.dates.base = to_utc(instance.first.timepoint_datetime)
-        dte = instance.visit.dates.lower
+        dte = instance.visit.get_window(instance.first.timepoint_datetime).lower
     return dte
 
 
 def get_upper_datetime(instance) -> datetime:
-    """Returns the datetime of the upper window"""
-    instance.visit.dates.base = to_utc(instance.first.timepoint_datetime)
-    return instance.visit.dates.upper
+    """Returns the datetime of the upper window.
+
+    Does not change the visit object shared through the registry.
+    """
+    return instance.visit.get_window(instance.first.timepoint_datetime).upper
 
 
 def is_baseline(
@@ -79,19 +84,13 @@ def get_onschedule_models(
 ) -> list[str]:
     """Returns a list of onschedule models, in label_lower format,
     for this subject and date.
+
+    See `get_schedules_from_history`.
     """
-    onschedule_models = []
-    subject_schedule_history_model_cls = django_apps.get_model(
-        "edc_visit_schedule.SubjectScheduleHistory"
-    )
-    for onschedule_model_obj in subject_schedule_history_model_cls.objects.onschedules(
-        subject_identifier=subject_identifier, report_datetime=report_datetime
-    ):
-        _, schedule = site_visit_schedules.get_by_onschedule_model(
-            onschedule_model=onschedule_model_obj._meta.label_lower
-        )
-        onschedule_models.append(schedule.onschedule_model)
-    return onschedule_models
+    return [
+        schedule.onschedule_model
+        for schedule in get_schedules_from_history(subject_identifier, report_datetime)
+    ]
 
 
 def get_offschedule_models(subject_identifier=None, report_datetime=None) -> list[str]:
@@ -100,21 +99,39 @@ def get_offschedule_models(subject_identifier=None, report_datetime=None) -> lis
 
     Subject status must be ON_SCHEDULE.
 
-    See also, manager method `onschedules`.
+    See `get_schedules_from_history` and manager method `onschedules`.
+    """
+    return [
+        schedule.offschedule_model
+        for schedule in get_schedules_from_history(subject_identifier, report_datetime)
+    ]
+
+
+def get_schedules_from_history(
+    subject_identifier: str, report_datetime: datetime | None
+) -> list[Schedule]:
+    """Returns the registered schedules of the onschedule model
+    labels in the subject's history for this date.
+
+    The labels are read from the history model in one query and
+    looked up in the registry's model index. Raises
+    SiteVisitScheduleError if a label is not registered.
     """
-    offschedule_models = []
     subject_schedule_history_model_cls = django_apps.get_model(
         "edc_visit_schedule.SubjectScheduleHistory"
     )
-    onschedule_models = subject_schedule_history_model_cls.objects.onschedules(
+    schedules = []
+    for (
+        onschedule_model,
+        _,
+    ) in subject_schedule_history_model_cls.objects.onschedule_model_labels(
         subject_identifier=subject_identifier, report_datetime=report_datetime
-    )
-    for onschedule_model_obj in onschedule_models:
+    ):
         _, schedule = site_visit_schedules.get_by_onschedule_model(
-            onschedule_model=onschedule_model_obj._meta.label_lower
+            onschedule_model=onschedule_model
         )
-        offschedule_models.append(schedule.offschedule_model)
-    return offschedule_models
+        schedules.append(schedule)
+    return schedules
 
 
 def off_schedule_or_raise(
@@ -139,66 +156,166 @@ def off_schedule_or_raise(
         )
 
 
-def off_all_schedules_or_raise(subject_identifier: str = None):
-    """Raises an exception if subject is still on any schedule."""
+def get_schedule_history(subject_identifier: str) -> dict[tuple[str, str], tuple]:
+    """Returns a dictionary of {(visit_schedule_name, schedule_name):
+    (schedule_status, offschedule_datetime)} for every registered
+    schedule from one query on the history model.
+
+    A schedule without a history instance is returned as
+    (None, None), that is, the subject was never put on it. A
+    history instance out of sync with the registry, for other
+    onschedule or offschedule models, or with a schedule status
+    that does not agree with its offschedule datetime, is left out.
+    Callers fall back to querying the onschedule and offschedule
+    models for a schedule not included.
+
+    Note: the history model is updated by `SubjectSchedule`. An
+    onschedule model instance created without it, for example by a
+    raw insert, is not seen.
+    """
+    subject_schedule_history_model_cls = django_apps.get_model(
+        "edc_visit_schedule.SubjectScheduleHistory"
+    )
+    schedules = {
+        (visit_schedule.name, schedule.name): schedule
+        for visit_schedule in site_visit_schedules.get_visit_schedules().values()
+        for schedule in visit_schedule.schedules.values()
+    }
+    history = dict.fromkeys(schedules, (None, None))
+    for (
+        visit_schedule_name,
+        schedule_name,
+        onschedule_model,
+        offschedule_model,
+        schedule_status,
+        offschedule_datetime,
+    ) in subject_schedule_history_model_cls.objects.filter(
+        subject_identifier=subject_identifier
+    ).values_list(
+        "visit_schedule_name",
+        "schedule_name",
+        "onschedule_model",
+        "offschedule_model",
+        "schedule_status",
+        "offschedule_datetime",
+    ):
+        key = (visit_schedule_name, schedule_name)
+        if key not in schedules:
+            continue
+        if (
+            schedules[key].onschedule_model == onschedule_model
+            and schedules[key].offschedule_model == offschedule_model
+            and (schedule_status, offschedule_datetime is None)
+            in [(ON_SCHEDULE, True), (OFF_SCHEDULE, False)]
+        ):
+            history[key] = (schedule_status, offschedule_datetime)
+        else:
+            history.pop(key)
+    return history
+
+
+def off_all_schedules_or_raise(subject_identifier: str = None, use_history: bool = None):
+    """Raises an exception if subject is still on any schedule.
+
+    Answers from the history model. A schedule the history model
+    reports as ON_SCHEDULE, or without a history instance in sync,
+    is checked against the onschedule and offschedule models before
+    raising. See `get_schedule_history`. Set `use_history=False` to
+    query the onschedule and offschedule models of every schedule
+    instead.
+    """
+    use_history = True if use_history is None else use_history
+    history = get_schedule_history(subject_identifier) if use_history else None
     for visit_schedule in site_visit_schedules.get_visit_schedules().values():
         for schedule in visit_schedule.schedules.values():
-            try:
-                with transaction.atomic():
-                    schedule.onschedule_model_cls.objects.get(
-                        subject_identifier=subject_identifier
-                    )
-            except ObjectDoesNotExist:
-                pass
-            else:
-                try:
-                    with transaction.atomic():
-                        schedule.offschedule_model_cls.objects.get(
-                            subject_identifier=subject_identifier
-                        )
-                except ObjectDoesNotExist:
-                    model_name = schedule.offschedule_model_cls()._meta.verbose_name.title()
-                    raise OffScheduleError(
-                        f"Subject cannot be taken off study. Subject is still on a "
-                        f"schedule. Got schedule '{visit_schedule.name}.{schedule.name}. "
-                        f"Complete the offschedule form `{model_name}` first. "
-                        f"Subject identifier='{subject_identifier}', "
-                    )
+            if history is not None and (visit_schedule.name, schedule.name) in history:
+                schedule_status, _ = history[(visit_schedule.name, schedule.name)]
+                if schedule_status != ON_SCHEDULE:
+                    continue
+            off_schedule_for_schedule_or_raise(subject_identifier, visit_schedule, schedule)
     return True
 
 
+def off_schedule_for_schedule_or_raise(
+    subject_identifier: str, visit_schedule: VisitSchedule, schedule: Schedule
+) -> None:
+    """Raises an exception if subject is on the schedule and has
+    not been taken off.
+    """
+    try:
+        schedule.onschedule_model_cls.objects.get(subject_identifier=subject_identifier)
+    except ObjectDoesNotExist:
+        pass
+    else:
+        try:
+            schedule.offschedule_model_cls.objects.get(subject_identifier=subject_identifier)
+        except ObjectDoesNotExist:
+            model_name = schedule.offschedule_model_cls()._meta.verbose_name.title()
+            raise OffScheduleError(
+                f"Subject cannot be taken off study. Subject is still on a "
+                f"schedule. Got schedule '{visit_schedule.name}.{schedule.name}. "
+                f"Complete the offschedule form `{model_name}` first. "
+                f"Subject identifier='{subject_identifier}', "
+            )
+
+
 def offstudy_datetime_after_all_offschedule_datetimes(
     subject_identifier: str = None,
     offstudy_datetime: datetime = None,
     exception_cls=None,
+    use_history: bool = None,
 ) -> None:
+    """Raises an exception if the offstudy datetime is before the
+    offschedule datetime of any schedule.
+
+    Answers from the history model. A schedule the history model
+    reports as taken off after the offstudy datetime, or without a
+    history instance in sync, is checked against the onschedule and
+    offschedule models before raising. See `get_schedule_history`.
+    Set `use_history=False` to query the onschedule and offschedule
+    models of every schedule instead.
+    """
     exception_cls = exception_cls or forms.ValidationError
+    use_history = True if use_history is None else use_history
+    history = get_schedule_history(subject_identifier) if use_history else None
     for visit_schedule in site_visit_schedules.get_visit_schedules().values():
         for schedule in visit_schedule.schedules.values():
-            try:
-                schedule.onschedule_model_cls.objects.get(
-                    subject_identifier=subject_identifier
-                )
-            except ObjectDoesNotExist:
-                pass
-            else:
-                try:
-                    offschedule_obj = schedule.offschedule_model_cls.objects.get(
-                        subject_identifier=subject_identifier,
-                        offschedule_datetime__gt=offstudy_datetime,
-                    )
-                except ObjectDoesNotExist:
-                    pass
-                else:
-                    offschedule_datetime = formatted_datetime(
-                        offschedule_obj.offschedule_datetime
-                    )
-                    raise exception_cls(
-                        "`Offstudy` datetime cannot be before any `offschedule` datetime. "
-                        f"Got {subject_identifier} went off schedule "
-                        f"`{visit_schedule.name}.{schedule.name}` on "
-                        f"{offschedule_datetime}."
-                    )
+            if history is not None and (visit_schedule.name, schedule.name) in history:
+                _, offschedule_datetime = history[(visit_schedule.name, schedule.name)]
+                if not offschedule_datetime or offschedule_datetime <= offstudy_datetime:
+                    continue
+            offstudy_datetime_after_offschedule_datetime_or_raise(
+                subject_identifier, offstudy_datetime, visit_schedule, schedule, exception_cls
+            )
+
+
+def offstudy_datetime_after_offschedule_datetime_or_raise(
+    subject_identifier: str,
+    offstudy_datetime: datetime,
+    visit_schedule: VisitSchedule,
+    schedule: Schedule,
+    exception_cls,
+) -> None:
+    try:
+        schedule.onschedule_model_cls.objects.get(subject_identifier=subject_identifier)
+    except ObjectDoesNotExist:
+        pass
+    else:
+        try:
+            offschedule_obj = schedule.offschedule_model_cls.objects.get(
+                subject_identifier=subject_identifier,
+                offschedule_datetime__gt=offstudy_datetime,
+            )
+        except ObjectDoesNotExist:
+            pass
+        else:
+            offschedule_datetime = formatted_datetime(offschedule_obj.offschedule_datetime)
+            raise exception_cls(
+                "`Offstudy` datetime cannot be before any `offschedule` datetime. "
+                f"Got {subject_identifier} went off schedule "
+                f"`{visit_schedule.name}.{schedule.name}` on "
+                f"{offschedule_datetime}."
+            )
 
 
 def report_datetime_within_onschedule_offschedule_datetimes(
@@ -207,46 +324,43 @@ def report_datetime_within_onschedule_offschedule_datetimes(
     visit_schedule_name: str = None,
     schedule_name: str = None,
     exception_cls=None,
+    interval: ScheduleInterval | None = None,
 ):
+    """Raises if the report datetime is before the onschedule
+    datetime or after the offschedule datetime.
+
+    Pass `interval` if already fetched by the caller.
+    """
     exception_cls = exception_cls or forms.ValidationError
-    visit_schedule = site_visit_schedules.get_visit_schedule(visit_schedule_name)
-    schedule = visit_schedule.schedules.get(schedule_name)
-    try:
-        onschedule_obj = schedule.onschedule_model_cls.objects.get(
-            subject_identifier=subject_identifier
-        )
-    except ObjectDoesNotExist:
+    if not interval:
+        visit_schedule = site_visit_schedules.get_visit_schedule(visit_schedule_name)
+        schedule = visit_schedule.schedules.get(schedule_name)
+        interval = get_schedule_interval(schedule, subject_identifier)
+    if not interval:
         raise OnScheduleError(
             f"Subject is not on schedule. {visit_schedule_name}.{schedule_name}. "
             f"Got {subject_identifier}"
         )
-    try:
-        offschedule_obj = schedule.offschedule_model_cls.objects.get(
-            subject_identifier=subject_identifier,
-            offschedule_datetime__lte=report_datetime,
-        )
-    except ObjectDoesNotExist:
-        offschedule_obj = None
-        offschedule_datetime = report_datetime
-    else:
-        offschedule_datetime = offschedule_obj.offschedule_datetime
+    onschedule_datetime, offschedule_datetime = interval
+    if offschedule_datetime and offschedule_datetime > report_datetime:
+        # not yet off schedule as of the report datetime
+        offschedule_datetime = None
     if not (
-        floor_secs(onschedule_obj.onschedule_datetime)
+        floor_secs(onschedule_datetime)
         <= floor_secs(report_datetime)
-        <= floor_secs(offschedule_datetime)
+        <= floor_secs(offschedule_datetime or report_datetime)
     ):
-        onschedule_datetime = formatted_datetime(onschedule_obj.onschedule_datetime)
-        if offschedule_obj:
-            offschedule_datetime = formatted_datetime(offschedule_obj.offschedule_datetime)
+        if offschedule_datetime:
             error_msg = (
                 "Invalid report datetime. Expected a datetime between "
-                f"{onschedule_datetime} and {offschedule_datetime}. "
+                f"{formatted_datetime(onschedule_datetime)} and "
+                f"{formatted_datetime(offschedule_datetime)}. "
                 "See onschedule and offschedule."
             )
         else:
             error_msg = (
                 "Invalid report datetime. Expected a datetime on or after "
-                f"{onschedule_datetime}. See onschedule."
+                f"{formatted_datetime(onschedule_datetime)}. See onschedule."
             )
         raise exception_cls(error_msg)
 
@@ -6,6 +6,7 @@ from django.core.exceptions import ObjectDoesNotExist
 from edc_utils import get_utcnow
 
 from .site_visit_schedules import site_visit_schedules
+from .subject_schedule_footer import SubjectScheduleFooters
 
 if TYPE_CHECKING:
     from .model_mixins import OnScheduleModelMixin
@@ -49,5 +50,6 @@ class VisitScheduleViewMixin:
             onschedule_models=self.onschedule_models,
             current_schedule=self.current_schedule,
             current_visit_schedule=self.current_visit_schedule,
+            subject_schedule_footers=SubjectScheduleFooters(self.subject_identifier),
         )
         return super().get_context_data(**kwargs)
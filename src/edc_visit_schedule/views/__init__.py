@@ -1,2 +1,3 @@
 from .home_view import HomeView
+from .visit_schedule_json_view import VisitScheduleJsonView
 from .visit_schedule_view import VisitScheduleView
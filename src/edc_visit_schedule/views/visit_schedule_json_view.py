@@ -0,0 +1,21 @@
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404, JsonResponse
+from django.views.generic.base import View
+
+from ..visit_schedule_browser import get_schedule_data
+from .visit_schedule_view import VisitScheduleSelectionMixin
+
+
+class VisitScheduleJsonView(LoginRequiredMixin, VisitScheduleSelectionMixin, View):
+    """Returns the visits and CRFs of a schedule, or of one visit,
+    as JSON. Used by the visit schedule page to load a schedule on
+    expand.
+    """
+
+    def get(self, request, *args, **kwargs):
+        visit_schedule = self.get_selected_visit_schedule()
+        schedule = self.get_selected_schedule(visit_schedule)
+        if not schedule:
+            raise Http404("Expected a schedule.")
+        visit_code = self.get_selected_visit_code(schedule)
+        return JsonResponse(get_schedule_data(visit_schedule, schedule, visit_code))
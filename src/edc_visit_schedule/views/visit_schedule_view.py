@@ -1,28 +1,88 @@
-from typing import Any
+from __future__ import annotations
 
+from typing import TYPE_CHECKING, Any
+
+from django.http import Http404
 from django.views.generic.base import TemplateView
 from edc_dashboard.view_mixins import EdcViewMixin
 from edc_navbar.view_mixin import NavbarViewMixin
 
 from ..site_visit_schedules import SiteVisitScheduleError, site_visit_schedules
+from ..visit_schedule_browser import render_schedule_fragment
+
+if TYPE_CHECKING:
+    from ..schedule import Schedule
+    from ..visit_schedule import VisitSchedule
+
+
+class VisitScheduleSelectionMixin:
+    """Resolves the `visit_schedule`, `schedule` and `visit_code`
+    URL kwargs.
+
+    An unknown schedule or visit code raises Http404.
+    """
+
+    def get_selected_visit_schedule(self) -> VisitSchedule | None:
+        if not self.kwargs.get("visit_schedule"):
+            return None
+        try:
+            return site_visit_schedules.get_visit_schedule(
+                visit_schedule_name=self.kwargs.get("visit_schedule")
+            )
+        except SiteVisitScheduleError:
+            return None
+
+    def get_selected_schedule(self, visit_schedule: VisitSchedule | None) -> Schedule | None:
+        if not self.kwargs.get("schedule"):
+            return None
+        schedule = (
+            visit_schedule.schedules.get(self.kwargs["schedule"]) if visit_schedule else None
+        )
+        if not schedule:
+            raise Http404(f"Unknown schedule. Got {self.kwargs['schedule']}.")
+        return schedule
+
+    def get_selected_visit_code(self, schedule: Schedule | None) -> str | None:
+        visit_code = self.kwargs.get("visit_code")
+        if visit_code and (not schedule or not schedule.visits.get(visit_code)):
+            raise Http404(f"Unknown visit code. Got {visit_code}.")
+        return visit_code
+
 
+class VisitScheduleView(
+    VisitScheduleSelectionMixin, EdcViewMixin, NavbarViewMixin, TemplateView
+):
+    """Lists the visit schedules and their schedules.
+
+    Visits and CRFs are only rendered for the schedule, or visit,
+    selected in the URL. Otherwise they are loaded on expand from
+    `VisitScheduleJsonView`.
+    """
 
-class VisitScheduleView(EdcViewMixin, NavbarViewMixin, TemplateView):
     template_name = "edc_visit_schedule/visit_schedule.html"
     navbar_name = "edc_visit_schedule"
     navbar_selected_item = "visit_schedule"
 
     def get_context_data(self, **kwargs) -> dict[str, Any]:
-        try:
-            selected_visit_schedule = site_visit_schedules.get_visit_schedule(
-                visit_schedule_name=self.kwargs.get("visit_schedule")
+        selected_visit_schedule = self.get_selected_visit_schedule()
+        selected_schedule = self.get_selected_schedule(selected_visit_schedule)
+        selected_visit_code = self.get_selected_visit_code(selected_schedule)
+        if selected_visit_schedule:
+            visit_schedules = {selected_visit_schedule.name: selected_visit_schedule}
+        else:
+            visit_schedules = site_visit_schedules.registry
+        schedule_fragment = None
+        if selected_schedule:
+            schedule_fragment = render_schedule_fragment(
+                selected_visit_schedule, selected_schedule, selected_visit_code
             )
-        except SiteVisitScheduleError:
-            selected_visit_schedule = None
         kwargs.update(
             {
-                "visit_schedules": site_visit_schedules.registry,
+                "visit_schedules": visit_schedules,
                 "selected_visit_schedule": selected_visit_schedule,
+                "selected_schedule": selected_schedule,
+                "selected_visit_code": selected_visit_code,
+                "schedule_fragment": schedule_fragment,
             }
         )
         return super().get_context_data(**kwargs)
@@ -4,4 +4,4 @@ from .forms_collection import FormsCollection, FormsCollectionError
 from .requisition import Requisition
 from .requisition_collection import RequisitionCollection
 from .visit import Visit, VisitCodeError, VisitDateError
-from .window_period import WindowPeriod
+from .window_period import WindowBounds, WindowPeriod
@@ -11,7 +11,7 @@ from edc_utils import get_utcnow, to_utc
 from .crf_collection import CrfCollection
 from .forms_collection import FormsCollection
 from .requisition_collection import RequisitionCollection
-from .window_period import WindowPeriod
+from .window_period import WindowBounds, WindowPeriod
 
 if TYPE_CHECKING:
     from datetime import datetime
@@ -65,6 +65,10 @@ class VisitDate:
             base_timepoint=base_timepoint,
         )
 
+    @property
+    def window_period(self) -> WindowPeriod:
+        return self._window_period
+
     @property
     def base(self) -> datetime:
         return self._base
@@ -287,6 +291,24 @@ class Visit:
             return get_facility(name=self.facility_name)
         return None
 
+    def get_window(self, timepoint_datetime: datetime) -> WindowBounds:
+        """Returns the lower and upper datetimes of the window
+        period relative to `timepoint_datetime`.
+
+        Unlike setting `timepoint_datetime` and reading `dates`,
+        does not change this instance; safe to call on visits
+        shared through the registry.
+        """
+        return self.dates.window_period.get_window(dt=to_utc(timepoint_datetime))
+
+    def get_late_window(self, timepoint_datetime: datetime) -> WindowBounds:
+        """Returns the lower and upper datetimes of the late window
+        period relative to `timepoint_datetime`.
+
+        See also `get_window`.
+        """
+        return self.late_dates.window_period.get_window(dt=to_utc(timepoint_datetime))
+
     @property
     def timepoint_datetime(self) -> datetime:
         return self.dates.base
@@ -1,14 +1,22 @@
 from __future__ import annotations
 
-from collections import namedtuple
 from datetime import datetime
 from decimal import Decimal
-from typing import Tuple
+from typing import NamedTuple
 from zoneinfo import ZoneInfo
 
 from dateutil.relativedelta import relativedelta
 from edc_utils import to_utc
 
+utc = ZoneInfo("UTC")
+
+
+class WindowBounds(NamedTuple):
+    """The lower and upper datetimes of a window period in UTC."""
+
+    lower: datetime
+    upper: datetime
+
 
 class WindowPeriod:
     def __init__(
@@ -29,22 +37,17 @@ class WindowPeriod:
         if self.timepoint == base_timepoint:
             self.no_floor = True
 
-    def get_window(self, dt=None) -> Tuple[datetime, datetime]:
+    def get_window(self, dt=None) -> WindowBounds:
         """Returns a tuple of the lower and upper datetimes in UTC."""
 
         dt_floor = (
             to_utc(dt)
             if self.no_floor
-            else dt.replace(hour=0, minute=0, second=0, microsecond=0).astimezone(
-                ZoneInfo("UTC")
-            )
+            else dt.replace(hour=0, minute=0, second=0, microsecond=0).astimezone(utc)
         )
         dt_ceil = (
             to_utc(dt)
             if self.no_ceil
-            else dt.replace(hour=23, minute=59, second=59, microsecond=999999).astimezone(
-                ZoneInfo("UTC")
-            )
+            else dt.replace(hour=23, minute=59, second=59, microsecond=999999).astimezone(utc)
         )
-        window = namedtuple("Window", ["lower", "upper"])
-        return window(dt_floor - self.rlower, dt_ceil + self.rupper)
+        return WindowBounds(dt_floor - self.rlower, dt_ceil + self.rupper)
@@ -7,6 +7,7 @@ from edc_offstudy.utils import get_offstudy_model
 from edc_visit_tracking.constants import MISSED_VISIT, SCHEDULED, UNSCHEDULED
 from edc_visit_tracking.utils import get_related_visit_model
 
+from ..site_visit_schedules import site_visit_schedules
 from .schedules_collection import SchedulesCollection
 
 
@@ -108,6 +109,9 @@ class VisitSchedule:
             )
         self.schedules.update({schedule.name: schedule})
         self._all_post_consent_models = None
+        if site_visit_schedules.is_registered(self):
+            site_visit_schedules.discard_snapshot()
+            site_visit_schedules.discard_model_index()
         return schedule
 
     @property
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import render_to_string
+from django.utils.translation import get_language
+
+if TYPE_CHECKING:
+    from django.core.cache.backends.base import BaseCache
+
+    from .schedule import Schedule
+    from .visit_schedule import VisitSchedule
+
+__all__ = [
+    "get_browser_cache",
+    "get_schedule_data",
+    "get_schedule_fingerprint",
+    "render_schedule_fragment",
+]
+
+CACHE_KEY_PREFIX = "edc_visit_schedule.browser"
+
+fragment_template_name = "edc_visit_schedule/visit_schedule_fragment.html"
+
+
+def get_browser_cache() -> BaseCache:
+    """Returns the cache for the visit schedule browser.
+
+    Set `settings.EDC_VISIT_SCHEDULE_BROWSER_CACHE` to use a cache
+    other than "default".
+    """
+    return caches[getattr(settings, "EDC_VISIT_SCHEDULE_BROWSER_CACHE", "default")]
+
+
+def get_schedule_fingerprint(visit_schedule: VisitSchedule, schedule: Schedule) -> str:
+    """Returns a hash of the parts of a schedule shown in the
+    browser.
+
+    Changes if a visit or CRF of the schedule changes. Does not look
+    up CRF model classes.
+    """
+    content = [
+        visit_schedule.name,
+        visit_schedule.verbose_name,
+        schedule.name,
+        schedule.verbose_name,
+    ]
+    for visit in schedule.visits.values():
+        content.append([visit.code, visit.title, visit.timepoint])
+        content.extend([crf.show_order, crf.model, crf.required] for crf in visit.crfs)
+    return hashlib.sha256(json.dumps(content, default=str).encode()).hexdigest()
+
+
+def get_cache_key(
+    fragment: str, visit_schedule: VisitSchedule, schedule: Schedule, visit_code: str | None
+) -> str:
+    return ":".join(
+        [
+            CACHE_KEY_PREFIX,
+            fragment,
+            visit_schedule.name,
+            schedule.name,
+            visit_code or "",
+            get_language() or "",
+            get_schedule_fingerprint(visit_schedule, schedule),
+        ]
+    )
+
+
+def build_schedule_data(
+    visit_schedule: VisitSchedule, schedule: Schedule, visit_code: str | None = None
+) -> dict:
+    visits = [
+        dict(
+            code=visit.code,
+            title=visit.title,
+            timepoint=str(visit.timepoint),
+            crfs=[
+                dict(
+                    show_order=crf.show_order,
+                    model=crf.model,
+                    verbose_name=str(crf.verbose_name),
+                    required=crf.required,
+                )
+                for crf in visit.crfs
+            ],
+        )
+        for visit in schedule.visits.values()
+        if not visit_code or visit.code == visit_code
+    ]
+    return dict(
+        visit_schedule=visit_schedule.name,
+        visit_schedule_verbose_name=str(visit_schedule.verbose_name),
+        schedule=schedule.name,
+        schedule_verbose_name=str(schedule.verbose_name),
+        visits=visits,
+    )
+
+
+def get_schedule_data(
+    visit_schedule: VisitSchedule, schedule: Schedule, visit_code: str | None = None
+) -> dict:
+    """Returns the visits and CRFs of a schedule, or of one visit
+    if `visit_code`, as a JSON serializable dict.
+
+    Cached under the schedule fingerprint.
+    """
+    cache = get_browser_cache()
+    key = get_cache_key("data", visit_schedule, schedule, visit_code)
+    if (data := cache.get(key)) is None:
+        data = build_schedule_data(visit_schedule, schedule, visit_code)
+        cache.set(key, data, timeout=None)
+    return data
+
+
+def render_schedule_fragment(
+    visit_schedule: VisitSchedule, schedule: Schedule, visit_code: str | None = None
+) -> str:
+    """Returns the rendered HTML of the visits and CRFs of a
+    schedule, or of one visit if `visit_code`.
+
+    Cached under the schedule fingerprint.
+    """
+    cache = get_browser_cache()
+    key = get_cache_key("html", visit_schedule, schedule, visit_code)
+    if (html := cache.get(key)) is None:
+        html = render_to_string(
+            fragment_template_name,
+            dict(schedule_data=get_schedule_data(visit_schedule, schedule, visit_code)),
+        )
+        cache.set(key, html, timeout=None)
+    return html
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import TYPE_CHECKING, Iterator
+from zoneinfo import ZoneInfo
+
+from dateutil.relativedelta import relativedelta
+from django.db import NotSupportedError
+from django.db.models import Case, DateTimeField, F, Func, Q, Value, When
+from django.db.models.functions import TruncDay
+
+from .exceptions import WindowExpressionsError
+from .site_visit_schedules import site_visit_schedules
+
+if TYPE_CHECKING:
+    from django.db.models import Expression, QuerySet
+
+    from .visit import WindowPeriod
+
+__all__ = ["AddMonths", "WindowExpressions", "annotate_window_bounds"]
+
+utc = ZoneInfo("UTC")
+
+END_OF_DAY = timedelta(days=1, microseconds=-1)
+
+ABSOLUTE_ATTRS = ["year", "month", "day", "weekday", "hour", "minute", "second", "microsecond"]
+
+
+def to_timedelta(rdelta: relativedelta) -> timedelta:
+    return timedelta(
+        days=rdelta.days,
+        hours=rdelta.hours,
+        minutes=rdelta.minutes,
+        seconds=rdelta.seconds,
+        microseconds=rdelta.microseconds,
+    )
+
+
+class AddMonths(Func):
+    """Adds a number of months, which may be negative, to a
+    datetime expression in SQL.
+
+    As with relativedelta, the day is clamped to the last day of
+    the resulting month, e.g. 31 Jan + 1 month is 28 Feb.
+    """
+
+    output_field = DateTimeField()
+
+    def __init__(self, expression, months: int, **extra):
+        self.months = int(months)
+        super().__init__(expression, **extra)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        raise NotSupportedError(f"AddMonths is not supported on {connection.vendor}.")
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        # month arithmetic on timestamptz uses the connection time zone, UTC
+        sql, params = compiler.compile(self.source_expressions[0])
+        return f"({sql} + interval '{self.months} months')", params
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+        return f"DATE_ADD({sql}, INTERVAL {self.months} MONTH)", params
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # SQLite carries an overflowing day into the next month
+        # instead of clamping it, e.g. 31 Jan + 1 month is 3 Mar.
+        # Only the date part is passed to the date functions, which
+        # would otherwise round the microseconds.
+        sql, params = compiler.compile(self.source_expressions[0])
+        day = f"substr({sql}, 1, 10)"
+        months = f"'{self.months:+d} months'"
+        sql = (
+            f"(CASE WHEN strftime('%%d', {day}, {months}) = strftime('%%d', {day}) "
+            f"THEN date({day}, {months}) "
+            f"ELSE date({day}, 'start of month', '{self.months + 1:+d} months', '-1 day') "
+            f"END || substr({sql}, 11))"
+        )
+        return sql, (*params, *params, *params, *params, *params)
+
+
+class WindowExpressions:
+    """Builds `Case` expressions for the lower and upper bounds of the
+    window period of each row of a queryset of appointments or
+    visits, as `Visit.get_window` would return for the row's
+    timepoint datetime.
+
+    One `When` is built per schedule and window offset from the
+    registry snapshot.
+
+    The years and months of a window offset are added with
+    `AddMonths`, then the remaining days and time as a duration, in
+    the same order as relativedelta.
+    """
+
+    def __init__(
+        self,
+        lookup_prefix: str | None = None,
+        timepoint_datetime_field: str | None = None,
+    ):
+        self.lookup_prefix = lookup_prefix or ""
+        self.field = f"{self.lookup_prefix}{timepoint_datetime_field or 'timepoint_datetime'}"
+
+    @staticmethod
+    def get_window_periods() -> Iterator[tuple[tuple[str, str], str, WindowPeriod]]:
+        """Yields (visit_schedule_name, schedule_name), visit_code and
+        window period for each registered visit.
+        """
+        for schedule_snapshot in site_visit_schedules.snapshot.schedules.values():
+            for visit in schedule_snapshot.visits_by_code.values():
+                yield schedule_snapshot.key, visit.code, visit.dates.window_period
+
+    @property
+    def lower(self) -> Case:
+        return self.get_case(lower=True)
+
+    @property
+    def upper(self) -> Case:
+        return self.get_case(lower=False)
+
+    def get_q(self, key: tuple[str, str], visit_codes: list[str]) -> Q:
+        visit_schedule_name, schedule_name = key
+        return Q(
+            **{
+                f"{self.lookup_prefix}visit_schedule_name": visit_schedule_name,
+                f"{self.lookup_prefix}schedule_name": schedule_name,
+                f"{self.lookup_prefix}visit_code__in": visit_codes,
+            }
+        )
+
+    def get_case(self, lower: bool) -> Case:
+        # group visits with the same offsets into one `When`
+        groups: dict[tuple, list[str]] = {}
+        for key, visit_code, period in self.get_window_periods():
+            opts = (
+                (bool(period.no_floor), period.rlower or relativedelta())
+                if lower
+                else (bool(period.no_ceil), period.rupper or relativedelta())
+            )
+            groups.setdefault((key, *opts), []).append(visit_code)
+        cases = [
+            When(self.get_q(key, visit_codes), then=self.get_bound(exact, rdelta, lower))
+            for (key, exact, rdelta), visit_codes in groups.items()
+        ]
+        return Case(*cases, default=Value(None), output_field=DateTimeField())
+
+    def get_bound(self, exact: bool, rdelta: relativedelta, lower: bool) -> Expression:
+        """Returns the expression for one bound, as in
+        `WindowPeriod.get_window`.
+        """
+        if rdelta.leapdays or any(
+            getattr(rdelta, attr) is not None for attr in ABSOLUTE_ATTRS
+        ):
+            raise WindowExpressionsError(
+                f"Window offset cannot be expressed in SQL. Got {rdelta}."
+            )
+        if exact:
+            base = F(self.field)
+        elif lower:
+            base = TruncDay(self.field, tzinfo=utc)
+        else:
+            base = TruncDay(self.field, tzinfo=utc) + Value(END_OF_DAY)
+        if months := rdelta.years * 12 + rdelta.months:
+            base = AddMonths(base, -months if lower else months)
+        offset = Value(to_timedelta(rdelta))
+        return base - offset if lower else base + offset
+
+
+def annotate_window_bounds(
+    queryset: QuerySet,
+    lookup_prefix: str | None = None,
+    timepoint_datetime_field: str | None = None,
+) -> QuerySet:
+    """Returns the queryset annotated with `window_lower` and
+    `window_upper`, computed in SQL.
+
+    Set `lookup_prefix` to reach the appointment fields from
+    another model, e.g. "appointment__" for a visit model.
+    """
+    expressions = WindowExpressions(
+        lookup_prefix=lookup_prefix, timepoint_datetime_field=timepoint_datetime_field
+    )
+    return queryset.annotate(window_lower=expressions.lower, window_upper=expressions.upper)
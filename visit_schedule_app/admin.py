@@ -1,9 +1,14 @@
 from django.contrib import admin
 
 from .admin_site import visit_schedule_app_admin
-from .models import CrfOne
+from .models import CrfOne, OffSchedule, OffScheduleThree
 
 
 @admin.register(CrfOne, site=visit_schedule_app_admin)
 class CrfOneAdmin(admin.ModelAdmin):
     pass
+
+
+@admin.register(OffSchedule, OffScheduleThree, site=visit_schedule_app_admin)
+class OffScheduleAdmin(admin.ModelAdmin):
+    pass